@@ -0,0 +1,265 @@
+"""Batch Game Module
+
+Solves the count game of many pitcher/batter matchups at once. Every step of
+StochasticGame.run_backward_induction is done for all matchups together with array
+operations over the matchup axis, and the matrix games are solved with
+matrix_game.solve_many_breakpoint_games.
+"""
+from typing import List
+
+import numpy as np
+
+from matrix_game import solve_many_breakpoint_games
+from state import Count
+from state_action_enums import BatActs, Outcomes
+from stochastic_game import StochasticGame
+from trans_tensor import TransitionTensor, BATACT_INDEX, COUNT_INDEX, OUTCOMES, PITCHES, ZONES
+
+
+class BatchStochasticGame:
+    """Class used to represent the games of many matchups
+
+    Attributes
+    ----------
+    states : List[Count]
+        the list of states that define our game
+    probs : np.ndarray
+        (matchups, pitches, zones, counts, batacts, outcomes) stacked TransitionTensor
+        probabilities
+    zone_mask : np.ndarray
+        (pitches, zones) union of the zone masks of all matchups
+    valid : np.ndarray
+        (matchups, actions) true for the actions a matchup allows
+    max_pitch_pct : float
+        the maximum percent of the time a pitcher is allowed to perform an action
+    actions : list
+        the (pitch, zone) of every pitcher action, the action axis of the arrays
+
+    Methods
+    -------
+    from_tensors(states, trans_tensors, max_pitch_pct)
+        stacks a list of TransitionTensor objects
+    solve(max_loop_iters)
+        solves every matchup, returns state values and policy weights
+    solve_self_loop(state_ind, base, loop, weights, max_loop_iters)
+        solves a state whose q_vals depend on its own value for every matchup
+    get_policies(weights)
+        converts policy weights to a policy dict per matchup
+    """
+
+    def __init__(self, states: List[Count], probs: np.ndarray, zone_masks: np.ndarray,
+                 max_pitch_pct: float = 0.7) -> None:
+        """Instantiates BatchStochasticGame object
+
+        Parameters
+        ----------
+        states : List[Count]
+            the list of states that define our game
+        probs : np.ndarray
+            (matchups, pitches, zones, counts, batacts, outcomes) transition probabilities
+        zone_masks : np.ndarray
+            (matchups, pitches, zones) zone mask of every matchup
+        max_pitch_pct : float
+            the maximum percent of the time a pitcher is allowed to perform an action
+        """
+        self.states = states
+        self.probs = probs
+        self.max_pitch_pct = max_pitch_pct
+        self.zone_mask = zone_masks.any(axis=0)
+        self.valid = zone_masks[:, self.zone_mask]
+        self.actions = [(PITCHES[p_ind], ZONES[z_ind])
+                        for p_ind, z_ind in zip(*np.nonzero(self.zone_mask))]
+
+    @classmethod
+    def from_tensors(cls, states: List[Count], trans_tensors: List[TransitionTensor],
+                     max_pitch_pct: float = 0.7) -> "BatchStochasticGame":
+        """Stacks the transition tensors of many matchups
+
+        Parameters
+        ----------
+        states : List[Count]
+            the list of states that define our game
+        trans_tensors : List[TransitionTensor]
+            the transition tensor of every matchup
+        max_pitch_pct : float
+            the maximum percent of the time a pitcher is allowed to perform an action
+
+        Returns
+        -------
+        BatchStochasticGame
+            the games of all matchups
+        """
+        probs = np.stack([tensor.probs for tensor in trans_tensors])
+        zone_masks = np.stack([tensor.zone_mask for tensor in trans_tensors])
+        return cls(states, probs, zone_masks, max_pitch_pct)
+
+    def solve(self, max_loop_iters: int = 100) -> (np.ndarray, np.ndarray):
+        """Solves the game of every matchup by backward induction
+
+        Parameters
+        ----------
+        max_loop_iters : int
+            the maximum number of matrix games solved for one self loop state
+
+        Returns
+        -------
+        (np.ndarray, np.ndarray)
+            (matchups, states) state values,
+            (matchups, states, actions) probability of every pitcher action
+        """
+        swing = BATACT_INDEX[BatActs.SWING.value]
+        take = BATACT_INDEX[BatActs.TAKE.value]
+        state_index = {state.state_name: i for i, state in enumerate(self.states)}
+        n_matchups = self.probs.shape[0]
+
+        state_vals = np.zeros((n_matchups, len(self.states)))
+        weights = np.zeros((n_matchups, len(self.states), len(self.actions)))
+
+        for i in StochasticGame.get_solve_order(self.states):
+            state = self.states[i]
+
+            # (matchups, actions, batacts, outcomes)
+            probs = self.probs[:, :, :, COUNT_INDEX[state.state_name]][:, self.zone_mask]
+
+            # value of every outcome, the self loop is kept apart
+            outcome_vals = np.zeros((n_matchups, len(OUTCOMES)))
+            loop = np.zeros(probs.shape[:3])
+            for o_ind, res in enumerate(OUTCOMES):
+                nxt_state = state.get_successor(res)
+                if nxt_state == Outcomes.HIT.value:
+                    outcome_vals[:, o_ind] = 1
+                elif nxt_state == state.state_name:
+                    loop += probs[..., o_ind]
+                elif nxt_state != Outcomes.OUT.value:
+                    outcome_vals[:, o_ind] = state_vals[:, state_index[nxt_state]]
+            base = (probs @ outcome_vals[:, np.newaxis, :, np.newaxis])[..., 0]
+
+            state_vals[:, i], weights[:, i] = solve_many_breakpoint_games(
+                base[..., swing], base[..., take], self.max_pitch_pct, self.valid
+            )
+            if loop.any():
+                state_vals[:, i], weights[:, i] = self.solve_self_loop(
+                    i, base, loop, weights[:, i], max_loop_iters
+                )
+
+        return state_vals, weights
+
+    def solve_self_loop(self, state_ind: int, base: np.ndarray, loop: np.ndarray,
+                        weights: np.ndarray,
+                        max_loop_iters: int = 100) -> (np.ndarray, np.ndarray):
+        """Solves a state whose q_vals depend on its own value, q = base + loop * value
+
+        The batched form of StochasticGame.solve_self_loop, matchups drop out of the
+        iteration once their value stops decreasing.
+
+        Parameters
+        ----------
+        state_ind : int
+            index of the state in self.states
+        base : np.ndarray
+            (matchups, actions, batacts) q_vals without the self loop
+        loop : np.ndarray
+            (matchups, actions, batacts) probability of staying in the state
+        weights : np.ndarray
+            (matchups, actions) starting pitcher mixes
+        max_loop_iters : int
+            the maximum number of matrix games to solve
+
+        Returns
+        -------
+        (np.ndarray, np.ndarray)
+            (matchups,) state values, (matchups, actions) probability of every action
+        """
+        swing = BATACT_INDEX[BatActs.SWING.value]
+        take = BATACT_INDEX[BatActs.TAKE.value]
+
+        denom = 1 - (weights[:, np.newaxis, :] @ loop)[:, 0]
+        values = np.max((weights[:, np.newaxis, :] @ base)[:, 0] / denom, axis=1)
+        active = np.arange(len(values))
+        for _ in range(max_loop_iters):
+            q_vals = ((base[active] - values[active, np.newaxis, np.newaxis]
+                       * (1 - loop[active])) / denom[active, np.newaxis, :])
+            _, new_weights = solve_many_breakpoint_games(
+                q_vals[..., swing], q_vals[..., take], self.max_pitch_pct,
+                self.valid[active]
+            )
+            new_denom = 1 - (new_weights[:, np.newaxis, :] @ loop[active])[:, 0]
+            new_values = np.max(
+                (new_weights[:, np.newaxis, :] @ base[active])[:, 0] / new_denom, axis=1
+            )
+
+            improved = new_values < values[active]
+            active = active[improved]
+            values[active] = new_values[improved]
+            weights[active] = new_weights[improved]
+            denom[active] = new_denom[improved]
+            if len(active) == 0:
+                return values, weights
+
+        raise RuntimeError(
+            f"count {self.states[state_ind].state_name} did not converge in "
+            f"{max_loop_iters} solves for {len(active)} matchups"
+        )
+
+    def get_policies(self, weights: np.ndarray) -> List[dict]:
+        """Converts policy weights to the policy dict of every matchup
+
+        Parameters
+        ----------
+        weights : np.ndarray
+            (matchups, states, actions) probability of every pitcher action
+
+        Returns
+        -------
+        List[dict]
+            policy[state][pitch][zone] = probability for every matchup, positive
+            probabilities only as in StochasticGame
+        """
+        policies = [
+            {state.state_name: {pitch: {} for pitch, _ in self.actions} for state in self.states}
+            for _ in range(weights.shape[0])
+        ]
+        for n_ind, s_ind, a_ind in zip(*np.nonzero(weights > 0)):
+            pitch, zone = self.actions[a_ind]
+            policies[n_ind][self.states[s_ind].state_name][pitch][zone] = float(
+                weights[n_ind, s_ind, a_ind]
+            )
+        return policies
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return (
+            f"BatchStochasticGame({self.states}, {self.probs.shape}, {self.zone_mask}, "
+            f"{self.max_pitch_pct})"
+        )
+
+    def __str__(self):
+        """Prints the number of matchups and actions"""
+        return (
+            f"BatchStochasticGame: {self.probs.shape[0]} matchups, "
+            f"{len(self.actions)} actions"
+        )
+
+
+def solve_many(states: List[Count], trans_tensors: List[TransitionTensor],
+               max_pitch_pct: float = 0.7) -> (np.ndarray, List[dict]):
+    """Solves the games of many matchups at once
+
+    Parameters
+    ----------
+    states : List[Count]
+        the list of states that define our game
+    trans_tensors : List[TransitionTensor]
+        the transition tensor of every matchup
+    max_pitch_pct : float
+        the maximum percent of the time a pitcher is allowed to perform an action
+
+    Returns
+    -------
+    (np.ndarray, List[dict])
+        (matchups, states) state values in the order of states,
+        the policy dict of every matchup
+    """
+    game = BatchStochasticGame.from_tensors(states, trans_tensors, max_pitch_pct)
+    state_vals, weights = game.solve()
+    return state_vals, game.get_policies(weights)
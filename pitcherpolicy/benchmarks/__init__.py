@@ -0,0 +1 @@
+"""making this folder a module"""
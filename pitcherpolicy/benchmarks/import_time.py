@@ -0,0 +1,48 @@
+"""Cold start benchmark, seconds to import each module in a fresh interpreter
+
+Run from the pitcherpolicy folder: python -m benchmarks.import_time
+"""
+import subprocess
+import sys
+
+# modules a zone lookup, a matchup solve and a sweep start from
+MODULES = ["pitches.zones", "pitches.pitch", "pitch_zone_config", "matchup", "sweep"]
+
+# imports that must only happen inside the functions that use them
+HEAVY_MODULES = ["tensorflow", "keras", "matplotlib"]
+
+
+def import_time(module: str, repeats: int = 3) -> (float, list):
+    """Returns the best import time of a module and the heavy modules it loaded
+
+    Parameters
+    ----------
+    module : str
+        the module to import
+    repeats : int
+        the number of fresh interpreters to time it in
+
+    Returns
+    -------
+    (float, list)
+        best seconds to import module, the HEAVY_MODULES found in sys.modules after
+    """
+    script = (
+        "import sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "elapsed = time.perf_counter() - start\n"
+        f"print(elapsed, *[name for name in {HEAVY_MODULES} if name in sys.modules])\n"
+    )
+    best, loaded = float("inf"), []
+    for _ in range(repeats):
+        output = subprocess.run([sys.executable, "-c", script], capture_output=True,
+                                text=True, check=True).stdout.split()
+        best, loaded = min(best, float(output[0])), output[1:]
+    return best, loaded
+
+
+if __name__ == "__main__":
+    for name in MODULES:
+        seconds, heavy = import_time(name)
+        print(f"{name}: {seconds * 1000:.0f}ms" + (f", loads {', '.join(heavy)}" if heavy else ""))
@@ -0,0 +1,40 @@
+"""Microbenchmark of zone lookups per second, scalar scan vs compiled ZoneIndex
+
+Run from the pitcherpolicy folder: python -m benchmarks.zone_lookup
+"""
+import time
+
+import numpy as np
+
+from pitch_zone_config import gen_pitches
+
+
+def lookups_per_sec(lookup, n_points: int, repeats: int = 3) -> float:
+    """Returns the best lookups per second of lookup() over a few repeats"""
+    best = np.inf
+    for _ in range(repeats):
+        start = time.perf_counter()
+        lookup()
+        best = min(best, time.perf_counter() - start)
+    return n_points / best
+
+
+if __name__ == "__main__":
+    rng = np.random.default_rng(0)
+    x_coords = rng.normal(0, 1.5, 1_000_000)
+    y_coords = rng.normal(0, 1.5, 1_000_000)
+    n_scalar = 20_000
+
+    for p_name, pitch in gen_pitches().items():
+        zones = pitch.zones
+        zones.get_zone_index()
+
+        before = lookups_per_sec(
+            lambda: [zones.return_zone(x, y)
+                     for x, y in zip(x_coords[:n_scalar], y_coords[:n_scalar])],
+            n_scalar)
+        after = lookups_per_sec(
+            lambda: zones.return_zones(x_coords, y_coords), len(x_coords))
+
+        print(f"{p_name}: return_zone {before:,.0f}/s, "
+              f"return_zones {after:,.0f}/s ({after / before:,.0f}x)")
@@ -0,0 +1,103 @@
+"""Game Solution Module"""
+from typing import List
+
+import numpy as np
+
+
+class GameSolution:
+    """Class used to represent the solution of a StochasticGame
+
+    Unpacks like the (state_vals, policy) tuple the solvers used to return, so
+    `state_vals, policy = game.solve_game()` and `state_vals[name][-1]` keep working.
+
+    Attributes
+    ----------
+    state_names : List[str]
+        the name of every state, the order of the value arrays
+    values : np.ndarray
+        the final value of every state
+    prev_values : np.ndarray
+        the values of the sweep before the last, None if the solver has no sweeps
+    policy : dict
+        the optimal pitcher actions to minimize batter OBP,
+        policy[state][pitch][zone] = probability (positive probabilities only)
+    iterations : int
+        the number of sweeps over the states needed to reach the solution
+    residual : float
+        max-norm difference between values and prev_values, 0 for exact solvers
+    history : List[np.ndarray]
+        the values after every sweep, None unless the solver was asked to keep them
+
+    Methods
+    -------
+    get_state_vals()
+        returns dict[state] = list of values, the last one being the final value
+    """
+
+    def __init__(self, state_names: List[str], values: np.ndarray, policy: dict,
+                 prev_values: np.ndarray = None, iterations: int = 0,
+                 history: List[np.ndarray] = None) -> None:
+        """Instantiates GameSolution object
+
+        Parameters
+        ----------
+        state_names : List[str]
+            the name of every state, the order of the value arrays
+        values : np.ndarray
+            the final value of every state
+        policy : dict
+            policy[state][pitch][zone] = probability
+        prev_values : np.ndarray
+            the values of the sweep before the last
+        iterations : int
+            the number of sweeps needed to reach the solution
+        history : List[np.ndarray]
+            the values after every sweep
+        """
+        self.state_names = state_names
+        self.values = values
+        self.policy = policy
+        self.prev_values = prev_values
+        self.iterations = iterations
+        self.history = history
+
+        self.residual = 0.0
+        if prev_values is not None:
+            self.residual = float(np.max(np.abs(values - prev_values)))
+
+    def get_state_vals(self) -> dict:
+        """Returns the values of every state as lists
+
+        Returns
+        -------
+        dict
+            dict[state] = the history of values if kept, otherwise the previous and the
+            final value (just the final value for exact solvers)
+        """
+        if self.history is not None:
+            sweeps = self.history
+        elif self.prev_values is not None:
+            sweeps = [self.prev_values, self.values]
+        else:
+            sweeps = [self.values]
+        return {
+            name: [float(vals[i]) for vals in sweeps]
+            for i, name in enumerate(self.state_names)
+        }
+
+    def __iter__(self):
+        """Unpacks to (state_vals, policy)"""
+        return iter((self.get_state_vals(), self.policy))
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return (
+            f"GameSolution({self.state_names}, {repr(self.values)}, {self.policy}, "
+            f"{repr(self.prev_values)}, {self.iterations}, {self.history})"
+        )
+
+    def __str__(self):
+        """Prints the value of every state"""
+        return ", ".join(
+            f"{name}: {val:.5f}" for name, val in zip(self.state_names, self.values)
+        )
@@ -0,0 +1,176 @@
+"""Matchup Module
+
+The steps that turn a pitcher and a batter tensor into a solved game, as run by the
+main block of pitcherpolicy.py.
+"""
+import inspect
+from typing import Dict, List
+
+import numpy as np
+
+from game_solution import GameSolution
+from pitch_zone_config import gen_swing_trans_matrix, gen_trans_prob_tensor
+from pitches.pitch import Pitch
+from player_cache import PlayerCache
+from state import Count
+from stochastic_game import StochasticGame
+from trans_tensor import TransitionTensor
+
+
+def gen_matchup_mats(models: dict, pitcher: np.ndarray, batter: np.ndarray,
+                     pitches: Dict[str, Pitch], p_take_threshold: float = .2,
+                     acc_method: str = "simulation", player_cache: PlayerCache = None,
+                     batter_id: int = None) -> (dict, dict):
+    """Runs the models of a matchup, every step of gen_matchup_tensor that needs one
+
+    Parameters
+    ----------
+    models : dict
+        the "take", "transition" and "error" keras models
+    pitcher : np.ndarray
+        the pitcher tensor
+    batter : np.ndarray
+        the batter tensor
+    pitches : Dict[str, Pitch]
+        the pitches a pitcher may throw
+    p_take_threshold : float
+        swing probability under which a ball zone is a take zone
+    acc_method : str
+        the accuracy matrix method, "simulation" or "analytic" among others, see
+        gen_acc_mat
+    player_cache : PlayerCache
+        memo of the accuracy and swing probabilities of each player, a new one over
+        models and pitches if None
+    batter_id : int
+        the batter id, lets player_cache read the batter from its take table
+
+    Returns
+    -------
+    (dict, dict)
+        the swing transition matrix and the accuracy matrix, see gen_trans_prob_tensor
+    """
+    if player_cache is None:
+        player_cache = PlayerCache(models, pitches)
+    acc_mat = player_cache.get_acc_mat(pitcher, acc_method)
+    take_mat = player_cache.get_take_mat(batter, p_take_threshold, batter_id)
+    swing_trans_mat = gen_swing_trans_matrix(
+        models["transition"], pitcher, batter, take_mat, pitches)
+    return swing_trans_mat, acc_mat
+
+
+def gen_matchup_tensor(models: dict, pitcher: np.ndarray, batter: np.ndarray,
+                       pitches: Dict[str, Pitch], p_take_threshold: float = .2,
+                       acc_method: str = "simulation",
+                       player_cache: PlayerCache = None,
+                       batter_id: int = None) -> TransitionTensor:
+    """Generates the transition probabilities of a matchup
+
+    Parameters
+    ----------
+    models : dict
+        the "take", "transition" and "error" keras models
+    pitcher : np.ndarray
+        the pitcher tensor
+    batter : np.ndarray
+        the batter tensor
+    pitches : Dict[str, Pitch]
+        the pitches a pitcher may throw
+    p_take_threshold : float
+        swing probability under which a ball zone is a take zone
+    acc_method : str
+        the accuracy matrix method, "simulation" or "analytic" among others, see
+        gen_acc_mat
+    player_cache : PlayerCache
+        memo of the accuracy and swing probabilities of each player, a new one over
+        models and pitches if None
+    batter_id : int
+        the batter id, lets player_cache read the batter from its take table
+
+    Returns
+    -------
+    TransitionTensor
+        probs[pitch][zone][count][batact][outcome] = transition probability
+    """
+    swing_trans_mat, acc_mat = gen_matchup_mats(models, pitcher, batter, pitches,
+                                                p_take_threshold, acc_method,
+                                                player_cache, batter_id)
+    return gen_trans_prob_tensor(swing_trans_mat, acc_mat)
+
+
+def solve_matchup(models: dict, pitcher: np.ndarray, batter: np.ndarray,
+                  pitches: Dict[str, Pitch], counts: List[Count],
+                  p_take_threshold: float = .2, acc_method: str = "simulation",
+                  method: str = "value_iteration", lp_backend: str = "glop",
+                  max_pitch_pct: float = 0.7, theta: float = 0.001,
+                  player_cache: PlayerCache = None, batter_id: int = None) -> GameSolution:
+    """Solves the game of a matchup
+
+    Parameters
+    ----------
+    models : dict
+        the "take", "transition" and "error" keras models
+    pitcher : np.ndarray
+        the pitcher tensor
+    batter : np.ndarray
+        the batter tensor
+    pitches : Dict[str, Pitch]
+        the pitches a pitcher may throw
+    counts : List[Count]
+        the list of states that define our game
+    p_take_threshold : float
+        swing probability under which a ball zone is a take zone
+    acc_method : str
+        the accuracy matrix method, "simulation" or "analytic" among others, see
+        gen_acc_mat
+    method : str
+        "value_iteration", "gauss_seidel" or "backward_induction"
+    lp_backend : str
+        "glop" or "breakpoint", see StochasticGame
+    max_pitch_pct : float
+        the maximum percent of the time a pitcher is allowed to perform an action
+    theta : float
+        the stopping threshold of the value iteration methods
+    player_cache : PlayerCache
+        memo of the accuracy and swing probabilities of each player, see
+        gen_matchup_tensor
+    batter_id : int
+        the batter id, see gen_matchup_tensor
+
+    Returns
+    -------
+    GameSolution
+        the solution, unpacks to (state_vals, policy)
+    """
+    trans_tensor = gen_matchup_tensor(models, pitcher, batter, pitches, p_take_threshold,
+                                      acc_method, player_cache, batter_id)
+    game = StochasticGame(counts, trans_tensor, max_pitch_pct, lp_backend)
+    return game.solve(method, theta)
+
+
+def get_solve_params(**solve_kwargs) -> dict:
+    """Returns every parameter of solve_matchup after the players and config
+
+    Parameters
+    ----------
+    solve_kwargs
+        keyword arguments that would be passed to solve_matchup
+
+    Returns
+    -------
+    dict
+        p_take_threshold, acc_method, method, lp_backend, max_pitch_pct and theta,
+        the defaults of solve_matchup filled in
+    """
+    # the player cache only saves work and the id only finds the batter in it, neither
+    # changes the solution
+    params = {
+        name: param.default
+        for name, param in inspect.signature(solve_matchup).parameters.items()
+        if param.default is not inspect.Parameter.empty
+        and name not in ("player_cache", "batter_id")
+    }
+    unknown = set(solve_kwargs) - set(params)
+    if unknown:
+        raise ValueError(f"unknown solve_matchup parameters: {sorted(unknown)}")
+    params.update(solve_kwargs)
+    return params
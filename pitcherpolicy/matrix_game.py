@@ -0,0 +1,373 @@
+"""Matrix Game Module
+
+Solvers for the linear program of a single count state:
+
+    min v  subject to
+        v >= sum_i x_i * swing_q_i
+        v >= sum_i x_i * take_q_i
+        sum_i x_i = 1,  0 <= x_i <= max_pitch_pct
+
+solve_glop_game is the reference GLOP formulation, GlopMatrixGame keeps the model to
+solve it again with new q_vals. solve_breakpoint_game solves the same program exactly
+without an LP solver: by LP duality the value is max over lam in [0, 1] of g(lam),
+g(lam) = min_x x . (lam * swing_q + (1 - lam) * take_q), and g is concave and
+piecewise linear. For a fixed lam the inner minimum fills the
+cheapest actions up to max_pitch_pct (a sort), so g only bends where two actions swap
+order, and the maximum is found with a binary search over those breakpoints. Actions
+that are dominated by too many others to ever be filled are dropped first, which keeps
+the number of breakpoints small.
+"""
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+
+class GlopMatrixGame:
+    """Class used to represent a GLOP model of the linear program that is solved repeatedly
+
+    The variables and constraints are built once, each solve only updates the swing and
+    take coefficients in place. GLOP keeps the basis of the previous solve when the model
+    only had coefficient changes, so a re-solve starts from it (during value iteration
+    the optimal basis rarely changes between sweeps).
+
+    Attributes
+    ----------
+    n_actions : int
+        the number of pitcher actions
+    max_pitch_pct : float
+        the maximum percent of the time a pitcher is allowed to perform an action
+    solver : pywraplp.Solver
+        the GLOP solver holding the model
+    status : int
+        pywraplp status of the last solve, None before the first solve
+    iterations : int
+        simplex iterations of the last solve
+    n_solves : int
+        the number of solves so far
+    total_iterations : int
+        simplex iterations summed over all solves
+
+    Methods
+    -------
+    solve(swing_q, take_q)
+        updates the coefficients and solves the linear program
+    """
+
+    def __init__(self, n_actions: int, max_pitch_pct: float = 0.7) -> None:
+        """Instantiates GlopMatrixGame object
+
+        Parameters
+        ----------
+        n_actions : int
+            the number of pitcher actions
+        max_pitch_pct : float
+            the maximum percent of the time a pitcher is allowed to perform an action
+        """
+        self.n_actions = n_actions
+        self.max_pitch_pct = max_pitch_pct
+        self.status = None
+        self.iterations = 0
+        self.n_solves = 0
+        self.total_iterations = 0
+
+        self.solver = pywraplp.Solver(
+            "SolveSimpleSystem", pywraplp.Solver.GLOP_LINEAR_PROGRAMMING
+        )
+
+        # defining state value
+        self.state_val = self.solver.NumVar(0, self.solver.infinity(), "state_val")
+
+        # defining pitcher actions
+        self.p_actions = [self.solver.NumVar(0, max_pitch_pct, f"x{i}")
+                          for i in range(n_actions)]
+
+        # Constraint 1: state_val - sum(i = 0...n) { policy(i) * q(i,swing) } >= 0
+        self.swing_constraint = self.solver.Constraint(0, self.solver.infinity())
+        self.swing_constraint.SetCoefficient(self.state_val, 1)
+
+        # Constraint 2: state_val - sum(i = 0...n) { policy(i) * q(i, take) } >= 0
+        self.take_constraint = self.solver.Constraint(0, self.solver.infinity())
+        self.take_constraint.SetCoefficient(self.state_val, 1)
+
+        # Constraint 3: sum(x_optimal) = 1
+        constraint3 = self.solver.Constraint(1, 1)
+        for p_action in self.p_actions:
+            constraint3.SetCoefficient(p_action, 1)
+
+        # Objective Function: minimize state_val
+        objective = self.solver.Objective()
+        objective.SetCoefficient(self.state_val, 1)
+        objective.SetMinimization()
+
+    def solve(self, swing_q: np.ndarray, take_q: np.ndarray) -> (float, np.ndarray):
+        """Updates the swing and take coefficients and solves the linear program
+
+        Parameters
+        ----------
+        swing_q : np.ndarray
+            q_val of every pitcher action if the batter swings
+        take_q : np.ndarray
+            q_val of every pitcher action if the batter takes
+
+        Returns
+        -------
+        (float, np.ndarray)
+            state value, probability of every pitcher action
+        """
+        if len(swing_q) != self.n_actions or len(take_q) != self.n_actions:
+            raise ValueError(f"expected q_vals of {self.n_actions} actions")
+
+        for p_action, swing_val, take_val in zip(self.p_actions, swing_q, take_q):
+            self.swing_constraint.SetCoefficient(p_action, -1 * float(swing_val))
+            self.take_constraint.SetCoefficient(p_action, -1 * float(take_val))
+
+        self.status = self.solver.Solve()
+        self.iterations = self.solver.iterations()
+        self.n_solves += 1
+        self.total_iterations += self.iterations
+        if self.status != pywraplp.Solver.OPTIMAL:
+            raise RuntimeError(f"GLOP did not find an optimal solution, status {self.status}")
+
+        weights = np.array([p_action.solution_value() for p_action in self.p_actions])
+        return self.state_val.solution_value(), weights
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"GlopMatrixGame({self.n_actions}, {self.max_pitch_pct})"
+
+    def __str__(self):
+        """Prints the size of the model and the solve statistics"""
+        return (
+            f"GlopMatrixGame: {self.n_actions} actions, {self.n_solves} solves, "
+            f"{self.total_iterations} iterations"
+        )
+
+
+def solve_glop_game(swing_q: np.ndarray, take_q: np.ndarray,
+                    max_pitch_pct: float = 0.7) -> (float, np.ndarray):
+    """Solves the linear program with a new GLOP model
+
+    Parameters
+    ----------
+    swing_q : np.ndarray
+        q_val of every pitcher action if the batter swings
+    take_q : np.ndarray
+        q_val of every pitcher action if the batter takes
+    max_pitch_pct : float
+        the maximum percent of the time a pitcher is allowed to perform an action
+
+    Returns
+    -------
+    (float, np.ndarray)
+        state value, probability of every pitcher action
+    """
+    return GlopMatrixGame(len(swing_q), max_pitch_pct).solve(swing_q, take_q)
+
+
+def solve_breakpoint_game(swing_q: np.ndarray, take_q: np.ndarray,
+                          max_pitch_pct: float = 0.7) -> (float, np.ndarray):
+    """Solves the linear program exactly with a breakpoint search over the batter's mix
+
+    Parameters
+    ----------
+    swing_q : np.ndarray
+        q_val of every pitcher action if the batter swings
+    take_q : np.ndarray
+        q_val of every pitcher action if the batter takes
+    max_pitch_pct : float
+        the maximum percent of the time a pitcher is allowed to perform an action
+
+    Returns
+    -------
+    (float, np.ndarray)
+        state value, probability of every pitcher action
+    """
+    swing_q = np.asarray(swing_q, dtype=float)
+    take_q = np.asarray(take_q, dtype=float)
+    if max_pitch_pct * len(swing_q) < 1:
+        raise ValueError(
+            f"{len(swing_q)} actions capped at {max_pitch_pct} cannot sum to 1"
+        )
+
+    fill = np.clip(1 - max_pitch_pct * np.arange(len(swing_q)), 0, max_pitch_pct)
+    n_filled = np.count_nonzero(fill)
+
+    # an action with n_filled other actions at least as good against both batter actions
+    # (ties broken by index) never gets weight, dropping them leaves a handful of actions
+    no_worse = (swing_q[:, np.newaxis] <= swing_q) & (take_q[:, np.newaxis] <= take_q)
+    better = (swing_q[:, np.newaxis] < swing_q) | (take_q[:, np.newaxis] < take_q)
+    earlier = np.tri(len(swing_q), k=-1, dtype=bool).T
+    dominated_by = (no_worse & (better | earlier)).sum(axis=0)
+    kept = np.flatnonzero(dominated_by <= n_filled)
+    swing_k = swing_q[kept]
+    take_k = take_q[kept]
+    fill = fill[:len(kept)]
+
+    # cost of action i when the batter swings with probability lam: take_q + lam * diff
+    diff = swing_k - take_k
+
+    # lam at which two actions cost the same, the only places g can bend
+    rows, cols = np.triu_indices(len(diff), k=1)
+    denom = diff[rows] - diff[cols]
+    with np.errstate(divide="ignore", invalid="ignore"):
+        lams = (take_k[cols] - take_k[rows]) / denom
+    lams = lams[(denom != 0) & (lams > 0) & (lams < 1)]
+    lams = np.unique(np.concatenate([[0.0, 1.0], lams]))
+
+    def slope(seg: int) -> (float, np.ndarray):
+        """Slope of g on the segment (lams[seg], lams[seg + 1]) and its minimizer"""
+        lam = (lams[seg] + lams[seg + 1]) / 2
+        weights = np.zeros(len(kept))
+        weights[np.argsort(take_k + lam * diff, kind="stable")] = fill
+        return weights @ diff, weights
+
+    # g is concave so the slopes decrease, find the first segment with slope <= 0
+    low, high = 0, len(lams) - 1
+    while low < high:
+        mid = (low + high) // 2
+        if slope(mid)[0] <= 0:
+            high = mid
+        else:
+            low = mid + 1
+
+    if low == 0:
+        # the take constraint binds alone (lam = 0)
+        weights = slope(0)[1]
+    elif low == len(lams) - 1:
+        # the swing constraint binds alone (lam = 1)
+        weights = slope(low - 1)[1]
+    else:
+        # lams[low] is the maximum of g, mix the minimizers on either side of it so
+        # the pitcher leaves the batter indifferent between swinging and taking
+        left_slope, left_weights = slope(low - 1)
+        right_slope, right_weights = slope(low)
+        mix = -right_slope / (left_slope - right_slope)
+        weights = mix * left_weights + (1 - mix) * right_weights
+
+    all_weights = np.zeros(len(swing_q))
+    all_weights[kept] = weights
+    weights = all_weights
+    value = max(weights @ swing_q, weights @ take_q)
+    return float(value), weights
+
+
+def fill_cheapest_many(costs: np.ndarray, n_filled: int) -> np.ndarray:
+    """Returns the cheapest actions of every row, the ones filled by the inner minimum of g
+
+    Parameters
+    ----------
+    costs : np.ndarray
+        (games, actions) cost of every pitcher action, inf for actions not allowed
+    n_filled : int
+        the number of actions that get a positive probability
+
+    Returns
+    -------
+    np.ndarray
+        (games, n_filled) index of the cheapest, second cheapest, ... action of every row
+    """
+    costs = costs.copy()
+    rows = np.arange(costs.shape[0])
+    cheapest = np.empty((costs.shape[0], n_filled), dtype=int)
+    # only a few actions get weight (2 when max_pitch_pct is 0.7), argmin beats a sort
+    for rank in range(n_filled):
+        cheapest[:, rank] = np.argmin(costs, axis=1)
+        costs[rows, cheapest[:, rank]] = np.inf
+    return cheapest
+
+
+def solve_many_breakpoint_games(swing_q: np.ndarray, take_q: np.ndarray,
+                                max_pitch_pct: float = 0.7, valid: np.ndarray = None,
+                                max_iters: int = 100) -> (np.ndarray, np.ndarray):
+    """Solves a batch of linear programs at once
+
+    Maximizes every g with a cutting plane search over lam: the two lines of g at the
+    ends of the bracket meet at the next lam to try, and g is evaluated there with
+    fill_cheapest_many. The search stops once g at that lam is on both lines (a
+    breakpoint of g was found), which takes a few steps. As in solve_breakpoint_game
+    the two vertices of the bracket are mixed so the batter is indifferent.
+
+    Parameters
+    ----------
+    swing_q : np.ndarray
+        (games, actions) q_val of every pitcher action if the batter swings
+    take_q : np.ndarray
+        (games, actions) q_val of every pitcher action if the batter takes
+    max_pitch_pct : float
+        the maximum percent of the time a pitcher is allowed to perform an action
+    valid : np.ndarray
+        (games, actions) boolean array of the actions each game allows, all if None
+    max_iters : int
+        the maximum number of cutting plane steps
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray)
+        (games,) state values, (games, actions) probability of every pitcher action
+    """
+    swing_q = np.asarray(swing_q, dtype=float)
+    take_q = np.asarray(take_q, dtype=float)
+    if valid is None:
+        valid = np.ones(swing_q.shape, dtype=bool)
+    if np.any(max_pitch_pct * valid.sum(axis=1) < 1):
+        raise ValueError(f"some games have too few actions capped at {max_pitch_pct}")
+
+    fill = np.clip(1 - max_pitch_pct * np.arange(swing_q.shape[1]), 0, max_pitch_pct)
+    fill = fill[fill > 0]
+    diff = swing_q - take_q
+    # actions that are not allowed cost inf so they are never filled
+    take_costs = np.where(valid, take_q, np.inf)
+
+    def vertex(lam: np.ndarray, rows: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray):
+        """Filled actions of rows at lam, with their take cost and slope"""
+        cheapest = fill_cheapest_many(take_costs[rows] + lam[:, np.newaxis] * diff[rows],
+                                      len(fill))
+        return (cheapest, take_q[rows[:, np.newaxis], cheapest] @ fill,
+                diff[rows[:, np.newaxis], cheapest] @ fill)
+
+    all_rows = np.arange(swing_q.shape[0])
+    left, left_take, left_slope = vertex(np.zeros(len(all_rows)), all_rows)
+    right, right_take, right_slope = vertex(np.ones(len(all_rows)), all_rows)
+
+    # g is maximal at lam = 0 (slope <= 0) or lam = 1 (slope >= 0) for some games
+    active = np.flatnonzero((left_slope > 0) & (right_slope < 0))
+    for _ in range(max_iters):
+        if len(active) == 0:
+            break
+
+        # where the lines of the two vertices meet
+        lam = ((right_take[active] - left_take[active])
+               / (left_slope[active] - right_slope[active]))
+        cheapest, take_cost, slope = vertex(lam, active)
+        on_lines = take_cost + lam * slope >= (
+            left_take[active] + lam * left_slope[active] - 1e-14
+        )
+
+        # a vertex with slope 0 solves the game by itself
+        flat = ~on_lines & (slope == 0)
+        for vert, vert_take, vert_slope, rows in [
+            (left, left_take, left_slope, ~on_lines & (slope >= 0)),
+            (right, right_take, right_slope, ~on_lines & (slope <= 0)),
+        ]:
+            vert[active[rows]] = cheapest[rows]
+            vert_take[active[rows]] = take_cost[rows]
+            vert_slope[active[rows]] = slope[rows]
+        active = active[~on_lines & ~flat]
+
+    if len(active) > 0:
+        raise RuntimeError(f"{len(active)} games did not converge in {max_iters} steps")
+
+    # mix the vertices so the slope is 0, a single vertex where the slope is already 0
+    # or g is maximal at an end
+    with np.errstate(divide="ignore", invalid="ignore"):
+        mix = np.where(left_slope > right_slope,
+                       -right_slope / (left_slope - right_slope), 1.0)
+    mix = np.where(left_slope <= 0, 1.0, np.where(right_slope >= 0, 0.0, mix))
+
+    weights = np.zeros(swing_q.shape)
+    rows = all_rows[:, np.newaxis]
+    np.add.at(weights, (rows, left), mix[:, np.newaxis] * fill)
+    np.add.at(weights, (rows, right), (1 - mix[:, np.newaxis]) * fill)
+
+    take_vals = mix * left_take + (1 - mix) * right_take
+    values = np.maximum(take_vals, take_vals + mix * left_slope + (1 - mix) * right_slope)
+    return values, weights
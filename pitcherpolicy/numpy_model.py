@@ -0,0 +1,538 @@
+"""NumPy Model Module
+
+Runs the forward pass of the keras models in models/ with NumPy, from the architecture
+and weights stored in their h5 files. Only the layers those models use are supported:
+InputLayer, Conv2D and MaxPooling2D (channels last, "same" padding), Flatten,
+Concatenate and Dense. Loading a model this way needs h5py, never tensorflow, and
+predict skips the per-call setup of keras, which dominates at these batch sizes.
+"""
+import json
+import threading
+from typing import List, Union
+
+import h5py
+import numpy as np
+
+
+def softmax(x: np.ndarray) -> np.ndarray:
+    """Returns the softmax of the last axis"""
+    exp = np.exp(x - x.max(axis=-1, keepdims=True))
+    return exp / exp.sum(axis=-1, keepdims=True)
+
+
+ACTIVATIONS = {
+    "linear": lambda x: x,
+    "relu": lambda x: np.maximum(x, 0),
+    "sigmoid": lambda x: 1 / (1 + np.exp(-x)),
+    "softmax": softmax,
+}
+
+
+def get_same_padding(size: int, kernel: int, stride: int) -> (int, int):
+    """Returns the padding of one axis under tensorflow's "same" rule
+
+    Parameters
+    ----------
+    size : int
+        length of the axis
+    kernel : int
+        kernel or pool length along the axis
+    stride : int
+        stride along the axis
+
+    Returns
+    -------
+    (int, int)
+        padding before and after, the extra cell of an odd total goes after
+    """
+    out_size = -(-size // stride)
+    total = max((out_size - 1) * stride + kernel - size, 0)
+    return total // 2, total - total // 2
+
+
+def conv2d(x: np.ndarray, kernel: np.ndarray, bias: np.ndarray, strides=(1, 1)) -> np.ndarray:
+    """Applies a channels last 2D convolution with "same" padding
+
+    Parameters
+    ----------
+    x : np.ndarray
+        (batch, height, width, in channels) input
+    kernel : np.ndarray
+        (kernel height, kernel width, in channels, out channels) weights
+    bias : np.ndarray
+        (out channels,) bias
+    strides : tuple
+        (height, width) strides
+
+    Returns
+    -------
+    np.ndarray
+        (batch, out height, out width, out channels) output
+    """
+    k_h, k_w = kernel.shape[:2]
+    s_h, s_w = strides
+    pad_h = get_same_padding(x.shape[1], k_h, s_h)
+    pad_w = get_same_padding(x.shape[2], k_w, s_w)
+    x = np.pad(x, ((0, 0), pad_h, pad_w, (0, 0)))
+    out_h = (x.shape[1] - k_h) // s_h + 1
+    out_w = (x.shape[2] - k_w) // s_w + 1
+
+    # one matmul per kernel cell, the images are too small for an im2col copy to pay off
+    out = np.zeros((x.shape[0], out_h, out_w, kernel.shape[3]), dtype=x.dtype)
+    for i in range(k_h):
+        for j in range(k_w):
+            out += x[:, i:i + s_h * out_h:s_h, j:j + s_w * out_w:s_w] @ kernel[i, j]
+    return out + bias
+
+
+def max_pool2d(x: np.ndarray, pool_size=(2, 2), strides=(2, 2)) -> np.ndarray:
+    """Applies a channels last 2D max pool with "same" padding
+
+    Parameters
+    ----------
+    x : np.ndarray
+        (batch, height, width, channels) input
+    pool_size : tuple
+        (height, width) of the pool window
+    strides : tuple
+        (height, width) strides
+
+    Returns
+    -------
+    np.ndarray
+        (batch, out height, out width, channels) output
+    """
+    p_h, p_w = pool_size
+    s_h, s_w = strides
+    pad_h = get_same_padding(x.shape[1], p_h, s_h)
+    pad_w = get_same_padding(x.shape[2], p_w, s_w)
+    x = np.pad(x, ((0, 0), pad_h, pad_w, (0, 0)), constant_values=-np.inf)
+    out_h = (x.shape[1] - p_h) // s_h + 1
+    out_w = (x.shape[2] - p_w) // s_w + 1
+
+    out = np.full((x.shape[0], out_h, out_w, x.shape[3]), -np.inf, dtype=x.dtype)
+    for i in range(p_h):
+        for j in range(p_w):
+            np.maximum(out, x[:, i:i + s_h * out_h:s_h, j:j + s_w * out_w:s_w], out=out)
+    return out
+
+
+class NumpyModel:
+    """Class used to represent a keras functional model evaluated with NumPy
+
+    Attributes
+    ----------
+    layers : List[dict]
+        the class name, config, inbound layer names and weights of every layer, in the
+        order of the model config (inputs come before the layers that use them)
+    input_names : List[str]
+        the input layers, in the order predict takes them
+    output_names : List[str]
+        the output layers, in the order predict returns them
+    dtype : np.dtype
+        the dtype the forward pass is computed in, the dtype of the weights
+
+    Methods
+    -------
+    from_h5(path)
+        loads the architecture and weights of a keras h5 file
+    predict(inputs, **kwargs)
+        returns the model outputs for a batch, like keras.Model.predict
+    run(values, layer_names)
+        runs layers on the outputs computed so far
+    get_ancestors(name)
+        returns the layers the output of a layer depends on
+    get_weights()
+        returns every weight array, in layer order
+    """
+
+    def __init__(self, layers: List[dict], input_names: List[str],
+                 output_names: List[str]) -> None:
+        """Instantiates NumpyModel object
+
+        Parameters
+        ----------
+        layers : List[dict]
+            dicts of "class_name", "name", "config", "inbound" and "weights"
+        input_names : List[str]
+            the input layers, in the order predict takes them
+        output_names : List[str]
+            the output layers, in the order predict returns them
+        """
+        self.layers = layers
+        self.input_names = input_names
+        self.output_names = output_names
+
+        weights = self.get_weights()
+        self.dtype = weights[0].dtype if weights else np.dtype(np.float32)
+
+    @classmethod
+    def from_h5(cls, path) -> "NumpyModel":
+        """Loads the architecture and weights of a keras h5 file
+
+        Parameters
+        ----------
+        path : str or Path
+            the h5 file saved by keras
+
+        Returns
+        -------
+        NumpyModel
+            the model
+        """
+        with h5py.File(path, "r") as f:
+            config = json.loads(f.attrs["model_config"])["config"]
+            model_weights = f["model_weights"]
+
+            layers = []
+            for layer in config["layers"]:
+                name = layer["name"]
+                weights = {}
+                if name in model_weights:
+                    group = model_weights[name]
+                    for weight_name in group.attrs["weight_names"]:
+                        weight_name = getattr(weight_name, "decode", lambda: weight_name)()
+                        # "dense/kernel:0" -> "kernel"
+                        key = weight_name.split("/")[-1].split(":")[0]
+                        weights[key] = group[weight_name][()]
+
+                inbound = [node[0] for nodes in layer.get("inbound_nodes", []) for node in nodes]
+                layers.append({
+                    "class_name": layer["class_name"],
+                    "name": name,
+                    "config": layer["config"],
+                    "inbound": inbound,
+                    "weights": weights,
+                })
+
+        input_names = [node[0] for node in config["input_layers"]]
+        output_names = [node[0] for node in config["output_layers"]]
+        return cls(layers, input_names, output_names)
+
+    def call_layer(self, layer: dict, inputs: List[np.ndarray]) -> np.ndarray:
+        """Returns the output of one layer
+
+        Parameters
+        ----------
+        layer : dict
+            the layer, as stored in self.layers
+        inputs : List[np.ndarray]
+            the outputs of its inbound layers
+
+        Returns
+        -------
+        np.ndarray
+            the layer output
+        """
+        class_name, config, weights = layer["class_name"], layer["config"], layer["weights"]
+        if class_name == "Conv2D":
+            out = conv2d(inputs[0], weights["kernel"], weights["bias"], config["strides"])
+            return ACTIVATIONS[config["activation"]](out)
+        if class_name == "MaxPooling2D":
+            return max_pool2d(inputs[0], config["pool_size"], config["strides"])
+        if class_name == "Flatten":
+            return inputs[0].reshape(len(inputs[0]), -1)
+        if class_name == "Concatenate":
+            return np.concatenate(inputs, axis=config["axis"])
+        if class_name == "Dense":
+            out = inputs[0] @ weights["kernel"]
+            if "bias" in weights:
+                out = out + weights["bias"]
+            return ACTIVATIONS[config["activation"]](out)
+        raise ValueError(f"unsupported layer {class_name} ({layer['name']})")
+
+    def predict(self, inputs: Union[np.ndarray, List[np.ndarray]],
+                **kwargs) -> Union[np.ndarray, List[np.ndarray]]:
+        """Returns the model outputs for a batch, like keras.Model.predict
+
+        Parameters
+        ----------
+        inputs : Union[np.ndarray, List[np.ndarray]]
+            one array per input layer, in the order of input_names
+        kwargs
+            keras predict arguments (verbose, batch_size, ...), ignored
+
+        Returns
+        -------
+        Union[np.ndarray, List[np.ndarray]]
+            the output, or a list of outputs for a model with several
+        """
+        return self.get_outputs(self.run(self.read_inputs(inputs)))
+
+    def read_inputs(self, inputs: Union[np.ndarray, List[np.ndarray]]) -> dict:
+        """Returns the inputs of predict by input layer name, in the model dtype
+
+        Parameters
+        ----------
+        inputs : Union[np.ndarray, List[np.ndarray]]
+            one array per input layer, in the order of input_names
+
+        Returns
+        -------
+        dict
+            dict[input name] = (rows, ...) array
+        """
+        if not isinstance(inputs, (list, tuple)):
+            inputs = [inputs]
+        if len(inputs) != len(self.input_names):
+            raise ValueError(
+                f"model takes {len(self.input_names)} inputs, got {len(inputs)}"
+            )
+
+        return {name: self.cast_input(x) for name, x in zip(self.input_names, inputs)}
+
+    def cast_input(self, x: np.ndarray) -> np.ndarray:
+        """Returns an input array in the model dtype, a 1d array as a column"""
+        x = np.asarray(x, dtype=self.dtype)
+        # keras reads a 1d array as a batch of scalars
+        return x.reshape(-1, 1) if x.ndim == 1 else x
+
+    def run(self, values: dict, layer_names=None) -> dict:
+        """Runs layers in model order on the outputs computed so far
+
+        Parameters
+        ----------
+        values : dict
+            dict[layer name] = output, at least every input of the layers to run
+        layer_names : set
+            the layers to run, every layer but the inputs if None
+
+        Returns
+        -------
+        dict
+            values with the output of every layer run added
+        """
+        for layer in self.layers:
+            if layer["class_name"] == "InputLayer" or (
+                    layer_names is not None and layer["name"] not in layer_names):
+                continue
+            values[layer["name"]] = self.call_layer(
+                layer, [values[name] for name in layer["inbound"]]
+            )
+        return values
+
+    def get_outputs(self, values: dict) -> Union[np.ndarray, List[np.ndarray]]:
+        """Returns the model outputs from the outputs of every layer, as predict does"""
+        if len(self.output_names) == 1:
+            return values[self.output_names[0]]
+        return [values[name] for name in self.output_names]
+
+    def get_layer(self, name: str) -> dict:
+        """Returns the layer of a name, as stored in self.layers"""
+        for layer in self.layers:
+            if layer["name"] == name:
+                return layer
+        raise KeyError(name)
+
+    def get_ancestors(self, name: str) -> set:
+        """Returns the names of a layer and of every layer its output depends on"""
+        ancestors = {name}
+        for inbound in self.get_layer(name)["inbound"]:
+            ancestors |= self.get_ancestors(inbound)
+        return ancestors
+
+    def get_weights(self) -> List[np.ndarray]:
+        """Returns every weight array, in layer order
+
+        Returns
+        -------
+        List[np.ndarray]
+            kernel then bias of every layer with weights
+        """
+        return [weights for layer in self.layers for weights in layer["weights"].values()]
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"NumpyModel({self.layers}, {self.input_names}, {self.output_names})"
+
+    def __str__(self):
+        """Prints the inputs, layers and outputs"""
+        return (
+            f"NumpyModel: inputs {self.input_names}, {len(self.layers)} layers, "
+            f"outputs {self.output_names}"
+        )
+
+
+class SplitModel:
+    """Class used to represent a NumpyModel split at the layer merging its input branches
+
+    The layers between an input and the merge only see that input, so their output, the
+    embedding of an input row, is computed once per distinct row and cached. predict
+    encodes the rows it has not seen yet and runs the layers from the merge on. In a
+    matchup batch every row holds the same pitcher and batter and one of a few dozen
+    pitch encodings, so the encoders run a handful of times per player instead of once
+    per row. The embeddings are never evicted, one per distinct row: a league sweep
+    keeps one per pitcher or batter and per pitch encoding, a few thousand rows.
+    Encoding is thread-safe, and threads missing the same row wait for the one encoding
+    it instead of running the branch again.
+
+    Attributes
+    ----------
+    model : NumpyModel
+        the full model
+    merge_name : str
+        the layer merging the branches
+    branches : dict
+        dict[input name] = the layer of its branch feeding the merge (the input itself
+        when it feeds the merge directly)
+    branch_layers : dict
+        dict[input name] = names of the layers of its branch
+    head_layers : set
+        names of the merge and of the layers after it
+    embeddings : dict
+        dict[input name][row bytes] = embedding of the row
+    hits : int
+        the number of rows whose embedding was cached
+    misses : int
+        the number of rows encoded
+    lock : threading.Lock
+        guards embeddings, the counters and key_locks
+    key_locks : dict
+        key_locks[(input name, row bytes)] = lock held while the row is encoded
+
+    Methods
+    -------
+    encode(input_name, x)
+        returns the embeddings of the rows of one input
+    predict(inputs, **kwargs)
+        returns the model outputs for a batch, like keras.Model.predict
+    get_weights()
+        returns every weight array of the model
+    """
+
+    def __init__(self, model: NumpyModel, merge_name: str = "concat") -> None:
+        """Instantiates SplitModel object
+
+        Parameters
+        ----------
+        model : NumpyModel
+            the full model
+        merge_name : str
+            the layer merging the branches, every input must reach it through layers
+            that see no other input
+        """
+        self.model = model
+        self.merge_name = merge_name
+        self.branches = {}
+        self.branch_layers = {}
+        for inbound in model.get_layer(merge_name)["inbound"]:
+            ancestors = model.get_ancestors(inbound)
+            inputs = [name for name in model.input_names if name in ancestors]
+            if len(inputs) != 1:
+                raise ValueError(f"{inbound} does not depend on exactly one input: {inputs}")
+            self.branches[inputs[0]] = inbound
+            self.branch_layers[inputs[0]] = ancestors
+        if set(self.branches) != set(model.input_names):
+            raise ValueError(f"inputs {set(model.input_names) - set(self.branches)} do not "
+                             f"reach {merge_name} through a branch of their own")
+
+        branch_names = set().union(*self.branch_layers.values())
+        self.head_layers = {layer["name"] for layer in model.layers} - branch_names
+        self.embeddings = {name: {} for name in model.input_names}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+    def encode(self, input_name: str, x: np.ndarray) -> np.ndarray:
+        """Returns the embeddings of the rows of one input
+
+        Parameters
+        ----------
+        input_name : str
+            the input layer
+        x : np.ndarray
+            (rows, ...) input
+
+        Returns
+        -------
+        np.ndarray
+            (rows, features) branch outputs, a broadcast view when every row is the same
+        """
+        x = np.asarray(x)
+        # a player tensor broadcast over the rows holds a single row
+        if x.ndim > 1 and len(x) > 1 and x.strides[0] == 0:
+            embedding = self.encode(input_name, x[:1])
+            return np.broadcast_to(embedding, (len(x),) + embedding.shape[1:])
+
+        x = self.model.cast_input(x)
+        branch = self.branches[input_name]
+        if branch == input_name:
+            return x
+
+        cache = self.embeddings[input_name]
+        keys = [row.tobytes() for row in x]
+        missing = {}
+        with self.lock:
+            for i, key in enumerate(keys):
+                if key not in cache and key not in missing:
+                    missing[key] = i
+            # taken in sorted order, so two threads missing the same rows never deadlock
+            key_locks = [self.key_locks.setdefault((input_name, key), threading.Lock())
+                         for key in sorted(missing)]
+
+        for key_lock in key_locks:
+            key_lock.acquire()
+        try:
+            # another thread may have encoded some of the rows while this one waited
+            with self.lock:
+                missing = {key: i for key, i in missing.items() if key not in cache}
+            if missing:
+                rows = list(missing.values())
+                values = self.model.run({input_name: x[rows]},
+                                        self.branch_layers[input_name])
+                with self.lock:
+                    for key, embedding in zip(missing, values[branch]):
+                        cache[key] = embedding
+        finally:
+            for key_lock in key_locks:
+                key_lock.release()
+
+        with self.lock:
+            self.misses += len(missing)
+            self.hits += len(keys) - len(missing)
+            embeddings = [cache[key] for key in keys]
+        return np.stack(embeddings)
+
+    def predict(self, inputs: Union[np.ndarray, List[np.ndarray]],
+                **kwargs) -> Union[np.ndarray, List[np.ndarray]]:
+        """Returns the model outputs for a batch, like keras.Model.predict
+
+        Parameters
+        ----------
+        inputs : Union[np.ndarray, List[np.ndarray]]
+            one array per input layer, in the order of model.input_names
+        kwargs
+            keras predict arguments (verbose, batch_size, ...), ignored
+
+        Returns
+        -------
+        Union[np.ndarray, List[np.ndarray]]
+            the output, or a list of outputs for a model with several
+        """
+        if not isinstance(inputs, (list, tuple)):
+            inputs = [inputs]
+        if len(inputs) != len(self.model.input_names):
+            raise ValueError(
+                f"model takes {len(self.model.input_names)} inputs, got {len(inputs)}"
+            )
+        values = {
+            self.branches[name]: self.encode(name, x)
+            for name, x in zip(self.model.input_names, inputs)
+        }
+        return self.model.get_outputs(self.model.run(values, self.head_layers))
+
+    def get_weights(self) -> List[np.ndarray]:
+        """Returns every weight array of the model, in layer order"""
+        return self.model.get_weights()
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"SplitModel({repr(self.model)}, {repr(self.merge_name)})"
+
+    def __str__(self):
+        """Prints the branches and the cache counters"""
+        return (
+            f"SplitModel: {self.branches} merged at {self.merge_name}, "
+            f"{self.hits} cached rows, {self.misses} encoded rows"
+        )
@@ -0,0 +1,306 @@
+"""Pipeline Module
+
+Runs items through a chain of stages, each on its own threads, connected by bounded
+queues. While one stage works on item k the stage before it can already work on item
+k + 1, and a full queue blocks the stage feeding it, so a slow stage never lets work
+pile up in memory. NumPy, h5py and the LP solver release the GIL in their heavy calls,
+which is where the stages overlap.
+
+Every stage records how long its workers were busy, starved (waiting on an empty input
+queue) and blocked (waiting on a full output queue), so the bottleneck is the stage
+whose workers are busy while the others are starved or blocked.
+"""
+import queue
+import threading
+import time
+from typing import Any, Callable, Iterable, Iterator, List, Tuple
+
+# marks the end of the items on a queue
+_DONE = object()
+
+
+class _Failure:
+    """An exception raised for an item, passed down the stages in place of its result"""
+
+    def __init__(self, error: BaseException) -> None:
+        self.error = error
+
+
+class Stage:
+    """Class used to represent one stage of a Pipeline
+
+    Attributes
+    ----------
+    name : str
+        the name of the stage in the stats
+    func : Callable[[Any], Any]
+        turns the output of the stage before into the input of the stage after
+    workers : int
+        the number of threads running func
+    items : int
+        the number of items processed
+    busy : float
+        seconds the workers spent in func, summed over workers
+    starved : float
+        seconds the workers waited for an input, summed over workers
+    blocked : float
+        seconds the workers waited for room in the next queue, summed over workers
+
+    Methods
+    -------
+    get_stats(elapsed)
+        returns the counters and the utilization of the stage
+    """
+
+    def __init__(self, name: str, func: Callable[[Any], Any], workers: int = 1) -> None:
+        """Instantiates Stage object
+
+        Parameters
+        ----------
+        name : str
+            the name of the stage in the stats
+        func : Callable[[Any], Any]
+            turns the output of the stage before into the input of the stage after
+        workers : int
+            the number of threads running func
+        """
+        if workers < 1:
+            raise ValueError(f"stage {name} needs at least one worker, got {workers}")
+        self.name = name
+        self.func = func
+        self.workers = workers
+        self.items = 0
+        self.busy = 0.0
+        self.starved = 0.0
+        self.blocked = 0.0
+        self.lock = threading.Lock()
+
+    def add_times(self, busy: float, starved: float, blocked: float) -> None:
+        """Adds the times of one item to the counters"""
+        with self.lock:
+            self.items += 1
+            self.busy += busy
+            self.starved += starved
+            self.blocked += blocked
+
+    def get_stats(self, elapsed: float) -> dict:
+        """Returns the counters and the utilization of the stage
+
+        Parameters
+        ----------
+        elapsed : float
+            seconds the pipeline ran
+
+        Returns
+        -------
+        dict
+            items, workers, busy, starved and blocked seconds, and utilization, the
+            fraction of the worker time spent busy
+        """
+        capacity = elapsed * self.workers
+        return {
+            "items": self.items,
+            "workers": self.workers,
+            "busy": self.busy,
+            "starved": self.starved,
+            "blocked": self.blocked,
+            "utilization": self.busy / capacity if capacity > 0 else 0.0,
+        }
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"Stage({repr(self.name)}, {self.func}, {self.workers})"
+
+    def __str__(self):
+        """Prints the name and the counters"""
+        return (
+            f"Stage {self.name}: {self.workers} workers, {self.items} items, "
+            f"{self.busy:.2f}s busy, {self.starved:.2f}s starved, {self.blocked:.2f}s blocked"
+        )
+
+
+class Pipeline:
+    """Class used to represent stages connected by bounded queues
+
+    Attributes
+    ----------
+    stages : List[Stage]
+        the stages, in order
+    queue_size : int
+        the most items waiting between two stages
+    elapsed : float
+        seconds the last run took
+
+    Methods
+    -------
+    imap(items)
+        runs every item through every stage, yields the results in item order
+    run(items)
+        runs every item through every stage, returns the results in item order
+    get_stats()
+        returns the stats of every stage of the last run
+    format_stats()
+        returns the stats as a table, one line per stage
+    """
+
+    def __init__(self, stages: List[Stage], queue_size: int = 4) -> None:
+        """Instantiates Pipeline object
+
+        Parameters
+        ----------
+        stages : List[Stage]
+            the stages, in order
+        queue_size : int
+            the most items waiting between two stages
+        """
+        if queue_size < 1:
+            raise ValueError(f"queue_size must be at least 1, got {queue_size}")
+        self.stages = stages
+        self.queue_size = queue_size
+        self.elapsed = 0.0
+
+    def run_worker(self, stage: Stage, inbox: queue.Queue, outbox: queue.Queue,
+                   consumers: int, finished: List[int], lock: threading.Lock) -> None:
+        """Runs items of one stage until the end marker, then passes the marker on
+
+        Parameters
+        ----------
+        stage : Stage
+            the stage of the worker
+        inbox : queue.Queue
+            (index, item) inputs of the stage
+        outbox : queue.Queue
+            (index, result) outputs of the stage
+        consumers : int
+            the number of threads reading outbox, each stops at its own end marker
+        finished : List[int]
+            the number of workers of the stage done, shared by its workers
+        lock : threading.Lock
+            guards finished
+        """
+        while True:
+            start = time.perf_counter()
+            entry = inbox.get()
+            got = time.perf_counter()
+            if entry is _DONE:
+                break
+
+            index, item = entry
+            if not isinstance(item, _Failure):
+                try:
+                    item = stage.func(item)
+                except Exception as err:
+                    item = _Failure(err)
+            done = time.perf_counter()
+            outbox.put((index, item))
+            stage.add_times(done - got, got - start, time.perf_counter() - done)
+
+        # the last worker of a stage tells every worker of the next one to stop
+        with lock:
+            finished[0] += 1
+            last = finished[0] == stage.workers
+        if last:
+            for _ in range(consumers):
+                outbox.put(_DONE)
+
+    def imap(self, items: Iterable[Any]) -> Iterator[Any]:
+        """Runs every item through every stage, yielding results as they finish
+
+        Parameters
+        ----------
+        items : Iterable[Any]
+            the inputs of the first stage
+
+        Yields
+        ------
+        Any
+            the output of the last stage of every item, in item order, the exception
+            of an item that failed is raised when its turn comes
+        """
+        items = list(items)
+        for stage in self.stages:
+            stage.items, stage.busy, stage.starved, stage.blocked = 0, 0.0, 0.0, 0.0
+
+        # the last queue is unbounded, so the stages always run to the end even if the
+        # results stop being read
+        queues = [queue.Queue(self.queue_size) for _ in self.stages] + [queue.Queue()]
+        threads = []
+        # the workers of the next stage read the outbox of a stage, imap reads the last
+        consumers = [stage.workers for stage in self.stages[1:]] + [1]
+        for stage, inbox, outbox, readers in zip(self.stages, queues, queues[1:],
+                                                 consumers):
+            finished, lock = [0], threading.Lock()
+            for _ in range(stage.workers):
+                threads.append(threading.Thread(
+                    target=self.run_worker,
+                    args=(stage, inbox, outbox, readers, finished, lock), daemon=True,
+                ))
+
+        def feed() -> None:
+            for entry in enumerate(items):
+                queues[0].put(entry)
+            for _ in range(self.stages[0].workers):
+                queues[0].put(_DONE)
+
+        threads.append(threading.Thread(target=feed, daemon=True))
+        start = time.perf_counter()
+        for thread in threads:
+            thread.start()
+
+        # items finish out of order with several workers in a stage
+        pending = {}
+        for index in range(len(items)):
+            while index not in pending:
+                entry = queues[-1].get()
+                if entry is not _DONE:
+                    pending[entry[0]] = entry[1]
+            result = pending.pop(index)
+            self.elapsed = time.perf_counter() - start
+            if isinstance(result, _Failure):
+                raise result.error
+            yield result
+
+    def run(self, items: Iterable[Any]) -> List[Any]:
+        """Runs every item through every stage
+
+        Parameters
+        ----------
+        items : Iterable[Any]
+            the inputs of the first stage
+
+        Returns
+        -------
+        List[Any]
+            the output of the last stage of every item, in item order
+        """
+        return list(self.imap(items))
+
+    def get_stats(self) -> List[Tuple[str, dict]]:
+        """Returns the stats of every stage of the last run
+
+        Returns
+        -------
+        List[Tuple[str, dict]]
+            (stage name, Stage.get_stats) of every stage, in order
+        """
+        return [(stage.name, stage.get_stats(self.elapsed)) for stage in self.stages]
+
+    def format_stats(self) -> str:
+        """Returns the stats of the last run as a table, one line per stage"""
+        lines = [f"{'stage':<12}{'workers':>8}{'items':>7}{'busy':>9}{'starved':>9}"
+                 f"{'blocked':>9}{'util':>7}"]
+        for name, stats in self.get_stats():
+            lines.append(
+                f"{name:<12}{stats['workers']:>8}{stats['items']:>7}{stats['busy']:>8.2f}s"
+                f"{stats['starved']:>8.2f}s{stats['blocked']:>8.2f}s"
+                f"{stats['utilization']:>7.0%}"
+            )
+        return "\n".join(lines)
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"Pipeline({self.stages}, {self.queue_size})"
+
+    def __str__(self):
+        """Prints the stages"""
+        return "Pipeline: " + " -> ".join(f"{stage.name} x{stage.workers}" for stage in self.stages)
@@ -0,0 +1,212 @@
+"""Pitch Encoding Module
+
+The keras models take a pitch as a 5x5x6 one-hot array of its zone and pitch type.
+There are only 17 zones and 6 pitch types, so every encoding is built once, into the
+read-only PITCH_MATRICES table. A BatchLayout is the fixed row order of a model batch,
+(pitch, zone, count) for every row, so building a batch is a gather from the table and
+a broadcast of the player tensors.
+"""
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from pitches.pitch import Pitch
+
+# channel order of the pitch encoding the models were trained on
+PITCH_TYPES = ["FF", "FT", "CU", "CH", "FC", "SL"]
+PITCH_TYPE_INDEX = {pitch_type: i for i, pitch_type in enumerate(PITCH_TYPES)}
+
+# (x, y) cells of every zone in the 5x5 grid
+ZONE_INDEX_MAP = {
+    0: (1, 1),
+    1: (2, 1),
+    2: (3, 1),
+    3: (1, 2),
+    4: (2, 2),
+    5: (3, 2),
+    6: (1, 3),
+    7: (2, 3),
+    8: (3, 3),
+    9: (0, 0),
+    10: (np.s_[1:4], 0),
+    11: (4, 0),
+    12: (0, np.s_[1:4]),
+    13: (4, np.s_[1:4]),
+    14: (0, 4),
+    15: (np.s_[1:4], 4),
+    16: (4, 4),
+}
+
+# the take model is trained on the non-obvious ball zones
+TAKE_ZONES = [f"{zone}a" for zone in range(9, 17)]
+
+# obvious ball zones, always a ball, never sent to the transition model
+OBVIOUS_BALL_ZONES = [f"{zone}b" for zone in range(9, 17)]
+
+
+def gen_pitch_matrices() -> np.ndarray:
+    """Generates the one-hot encoding of every pitch type and zone
+
+    Returns
+    -------
+    np.ndarray
+        (pitch types, zones, 5, 5, 6) read-only array, [p_ind, zone] is the encoding
+        of PITCH_TYPES[p_ind] thrown to zone
+    """
+    matrices = np.zeros((len(PITCH_TYPES), len(ZONE_INDEX_MAP), 5, 5, len(PITCH_TYPES)))
+    for p_ind in range(len(PITCH_TYPES)):
+        for zone, (x_ind, y_ind) in ZONE_INDEX_MAP.items():
+            matrices[p_ind, zone, x_ind, y_ind, p_ind] = 1
+    matrices.setflags(write=False)
+    return matrices
+
+
+PITCH_MATRICES = gen_pitch_matrices()
+
+
+class BatchLayout:
+    """Class used to represent the row order of a model batch
+
+    Attributes
+    ----------
+    keys : List[Tuple[str, str, str]]
+        the (pitch type, zone name, count) of every row
+    pitch_tensors : np.ndarray
+        (rows, 5, 5, 6) read-only pitch encoding of every row
+    s_counts : np.ndarray
+        (rows,) strike count of every row
+    b_counts : np.ndarray
+        (rows,) ball count of every row
+
+    Methods
+    -------
+    get_inputs(player_tensors, rows)
+        returns the model inputs of the selected rows
+    """
+
+    def __init__(self, keys: List[Tuple[str, str, str]]) -> None:
+        """Instantiates BatchLayout object
+
+        Parameters
+        ----------
+        keys : List[Tuple[str, str, str]]
+            the (pitch type, zone name, count) of every row, counts as "balls strikes"
+        """
+        self.keys = keys
+        p_inds = np.array([PITCH_TYPE_INDEX[pitch] for pitch, _, _ in keys], dtype=int)
+        zones = np.array([int(zone[:-1]) for _, zone, _ in keys], dtype=int)
+        self.pitch_tensors = PITCH_MATRICES[p_inds, zones]
+        self.pitch_tensors.setflags(write=False)
+        self.b_counts = np.array([int(count[0]) for _, _, count in keys], dtype=int)
+        self.s_counts = np.array([int(count[1]) for _, _, count in keys], dtype=int)
+        for counts in (self.s_counts, self.b_counts):
+            counts.setflags(write=False)
+
+    def get_inputs(self, player_tensors: List[np.ndarray],
+                   rows: np.ndarray = None) -> List[np.ndarray]:
+        """Returns the model inputs of the selected rows
+
+        Parameters
+        ----------
+        player_tensors : List[np.ndarray]
+            the pitcher and/or batter tensors, in the order the model takes them
+        rows : np.ndarray
+            boolean mask or indices of the rows to keep, None for every row
+
+        Returns
+        -------
+        List[np.ndarray]
+            every player tensor broadcast over the rows, then the strike counts, the
+            ball counts and the pitch encodings
+        """
+        pitch_tensors, s_counts, b_counts = self.pitch_tensors, self.s_counts, self.b_counts
+        if rows is not None:
+            pitch_tensors, s_counts, b_counts = (
+                pitch_tensors[rows], s_counts[rows], b_counts[rows]
+            )
+        n_rows = len(s_counts)
+        broadcast = [np.broadcast_to(tensor, (n_rows,) + np.shape(tensor))
+                     for tensor in player_tensors]
+        return broadcast + [s_counts, b_counts, pitch_tensors]
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"BatchLayout({self.keys})"
+
+    def __str__(self):
+        """Prints the number of rows"""
+        return f"BatchLayout: {len(self.keys)} rows"
+
+
+def gen_count_keys() -> List[str]:
+    """Returns the count keys in the order of the model batches
+
+    Returns
+    -------
+    List[str]
+        "balls strikes" keys, strikes in the outer loop and balls in the inner one
+    """
+    return [f"{b_count}{s_count}" for s_count in range(3) for b_count in range(4)]
+
+
+@lru_cache(maxsize=None)
+def _get_layout(pitch_zones: Tuple[Tuple[str, Tuple[str, ...]], ...]) -> BatchLayout:
+    """Returns the layout of (pitch, zones) pairs, built once per distinct pairs"""
+    counts = gen_count_keys()
+    return BatchLayout([(pitch, zone, count)
+                        for pitch, zones in pitch_zones
+                        for zone in zones
+                        for count in counts])
+
+
+def get_take_layout(pitches: Dict[str, Pitch]) -> BatchLayout:
+    """Returns the rows of the take model batch, the non-obvious ball zones of every pitch
+
+    Parameters
+    ----------
+    pitches : Dict[str, Pitch]
+        the pitches a pitcher may throw
+
+    Returns
+    -------
+    BatchLayout
+        the shared layout of the take model batch
+    """
+    return _get_layout(tuple((pitch, tuple(TAKE_ZONES)) for pitch in pitches))
+
+
+def get_swing_zones(pitch: Pitch) -> List[str]:
+    """Returns every zone of a pitch in the order of the swing transition matrix
+
+    Parameters
+    ----------
+    pitch : Pitch
+        the pitch
+
+    Returns
+    -------
+    List[str]
+        strike zones, ball zones, then the obvious ball zones
+    """
+    return ([zone.name for zone in pitch.zones.strike_zones + pitch.zones.ball_zones]
+            + OBVIOUS_BALL_ZONES)
+
+
+def get_swing_layout(pitches: Dict[str, Pitch]) -> BatchLayout:
+    """Returns the rows of the transition model batch before the take zones are dropped
+
+    Parameters
+    ----------
+    pitches : Dict[str, Pitch]
+        the pitches a pitcher may throw
+
+    Returns
+    -------
+    BatchLayout
+        the shared layout of every strike and non-obvious ball zone of every pitch
+    """
+    return _get_layout(tuple(
+        (p_name, tuple(zone for zone in get_swing_zones(pitch) if zone[-1] != "b"))
+        for p_name, pitch in pitches.items()
+    ))
@@ -1,11 +1,15 @@
 """Module that defines our Pitch classes"""
-from re import T
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict
 from pathlib import Path
 import numpy as np
 
-from tensorflow.keras import models
 
+from pitch_encoding import (
+    PITCH_MATRICES, PITCH_TYPE_INDEX, TAKE_ZONES, gen_count_keys, get_swing_layout,
+    get_swing_zones, get_take_layout
+)
+from pitches.accuracy_field import gen_gaussian_kernel
 from pitches.zone import Zone
 from pitches.pitch_zone_enums import BallZoneNames, PitchNames, StrikeZoneNames
 from pitches.obvious_zones import ObviousZones
@@ -15,6 +19,11 @@ from pitches.error_dist import NormalErrorDistribution
 
 from state_action_enums import Outcomes, CountStates, BatActs
 from state import Count
+from tensor_store import tensor_digest
+from trans_tensor import (
+    TransitionTensor, PITCHES, ZONES, COUNTS, OUTCOMES, OBVIOUS_ZONES, STRIKE_ZONES,
+    PITCH_INDEX, ZONE_INDEX, COUNT_INDEX, BATACT_INDEX, OUTCOME_INDEX
+)
 
 # defining the absolute path to our swing_trans matrix
 REL_PATH = "../data_cleaning/combining_data/swing_transitions.json"
@@ -157,6 +166,24 @@ norm_err_dist = {
     PitchNames.CHANGEUP.value: NormalErrorDistribution(0.15, 0.25),
 }
 
+# trials per intended zone of the simulation methods of gen_acc_mat, halton sampling is
+# as accurate as 1000 random trials with fewer than 400
+ACC_TRIALS = {"simulation": 1000, "antithetic": 1000, "halton": 400}
+
+# confidence interval half-width of every cell of the "adaptive" method of gen_acc_mat,
+# about 400 to 1600 halton trials a zone and a worst cell error near half that of 1000
+# random trials
+ACC_TOLERANCE = 0.02
+
+# pixels per standard deviation of the narrower error axis of the "fft" method of
+# gen_acc_mat, the error of the method depends on the pixel width relative to the
+# kernel; 12 stays within 5e-4 of the analytic matrix
+ACC_PIXELS_PER_SIGMA = 12
+
+# narrowest pixel of the "fft" method of gen_acc_mat in feet, the grid of an error that
+# is narrow on one axis and wide on the other would otherwise not fit in memory
+ACC_MIN_RESOLUTION = 0.01
+
 
 def gen_pitches() -> Dict[str, Pitch]:
     """Instantiates all of our Pitch objects
@@ -244,6 +271,56 @@ def gen_counts() -> List[Count]:
     """
     return [Count(Outcomes, int(c.value[0]), int(c.value[1])) for c in CountStates]
 
+def gen_swing_probs(model, batter_tensor, pitches) -> dict:
+    """Generates the probability the batter swings in every non-obvious ball zone
+
+    Parameters
+    ----------
+    model : keras.Model
+        the take model
+    batter_tensor : np.ndarray
+        the batter tensor
+    pitches : Pitches
+        pitches object representing all pitches
+
+    Returns
+    -------
+    dict
+        swing_probs[pitch_type][zone][count] = probability the batter swings
+    """
+
+    layout = get_take_layout(pitches)
+    predictions = model.predict(layout.get_inputs([batter_tensor]))
+
+    swing_probs = {pitch_type: {zone: {} for zone in TAKE_ZONES} for pitch_type in pitches}
+    for (pitch_type, zone, count), prediction in zip(layout.keys, predictions):
+        swing_probs[pitch_type][zone][count] = float(prediction[0])
+
+    return swing_probs
+
+def calc_take_mat(swing_probs: dict, p_take_threshold: float = .2) -> dict:
+    """Thresholds swing probabilities into a take matrix
+
+    Parameters
+    ----------
+    swing_probs : dict
+        swing_probs[pitch_type][zone][count] = probability the batter swings
+    p_take_threshold : float
+        threshold at which a zone can be considered a taking zone based on the batters probability to swing
+
+    Returns
+    -------
+    dict
+        take_mat[pitch_type][zone][count] = True if the zone is a take zone
+    """
+    return {
+        pitch_type: {
+            zone: {count: swing_prob < p_take_threshold for count, swing_prob in counts.items()}
+            for zone, counts in zones.items()
+        }
+        for pitch_type, zones in swing_probs.items()
+    }
+
 def gen_take_mat(model, batter_tensor, pitches, p_take_threshold=.2):
     """Generates a take matrix for all non-obvious zones
 
@@ -262,63 +339,7 @@ def gen_take_mat(model, batter_tensor, pitches, p_take_threshold=.2):
     dict
         One-hot encoded dictionary for if a given non-obvious zone can be considered a take "
     """
-
-    batch_batter_tensor = []
-    batch_s_count_tensor = []
-    batch_b_count_tensor = []
-    batch_pitch_tensor = []
-
-    #model trained on non-obvious zones
-
-
-    for pitch_type in pitches:
-        for zone in range(9,17):
-            pitch_tensor = get_pitch_matrix(zone, pitch_type)
-            for s_count in range(3):
-                for b_count in range(4):
-                        batch_pitch_tensor.append(pitch_tensor)
-                        batch_batter_tensor.append(batter_tensor)
-                        batch_s_count_tensor.append(s_count)
-                        batch_b_count_tensor.append(b_count)
-
-
-    batch_pitch_tensor = np.array(batch_pitch_tensor)
-    batch_batter_tensor = np.array(batch_batter_tensor)
-    batch_s_count_tensor = np.array(batch_s_count_tensor)
-    batch_b_count_tensor = np.array(batch_b_count_tensor)  
-
-    predictions = model.predict(
-    [
-        batch_batter_tensor,
-        batch_s_count_tensor,
-        batch_b_count_tensor,
-        batch_pitch_tensor,
-    ]
-    )
-
-    prediction_index = 0
-    take_mat = {}
-
-    for pitch_type in pitches:
-        take_mat[pitch_type] = {}
-       
-        for zone in range(9,17):
-            zone_key = str(zone)+"a"
-            pitch_tensor = get_pitch_matrix(zone, pitch_type)
-            take_mat[pitch_type][zone_key] = {}
-          
-            for s_count in range(3):
-                for b_count in range(4):
-                    count_key = str(b_count)+str(s_count)
-                    swing_prob = predictions[prediction_index][0]
-                    prediction_index+=1
-
-                    if swing_prob<p_take_threshold:
-                        take_mat[pitch_type][zone_key][count_key] = True
-                    else:
-                        take_mat[pitch_type][zone_key][count_key] = False
-  
-    return take_mat
+    return calc_take_mat(gen_swing_probs(model, batter_tensor, pitches), p_take_threshold)
 
 def gen_swing_trans_matrix(model, pitcher_tensor, batter_tensor, take_mat, pitches):
     """Generates swing transition matrix indexed by pitch type and count for a given pitcher/batter combination
@@ -341,111 +362,35 @@ def gen_swing_trans_matrix(model, pitcher_tensor, batter_tensor, take_mat, pitch
     dict
         a transition matrix dict to index [pitch_type][pitch_zone][count] = [prob_strike,prob_foul,prob_out,prob_hit]
     """
-    batch_pitch_tensor = []
-    batch_pitcher_tensor = []
-    batch_batter_tensor = []
-    batch_s_count_tensor = []
-    batch_b_count_tensor = []
-
-
-
-    # iterate over list of pitch types
-    for pitch_type in pitches.keys():
-        # iterate over zones
-        zone_list_raw = pitches[pitch_type].zones.strike_zones + pitches[pitch_type].zones.ball_zones
-        zone_list = []
-        for zone in zone_list_raw:
-            zone_list.append(zone.name)
-        zone_list = zone_list + ["9b","10b","11b","12b","13b","14b","15b","16b"]
-       
-        for zone in zone_list:
-
-            # generate pitch matrix
-            pitch_tensor = get_pitch_matrix(int(zone[:-1]), pitch_type)
-            # iterate over s_count
-            for s_count in range(3):
-                for b_count in range(4):
-                    zone_take = False
-                    
-                    str_count = str(b_count) + str(s_count)
-                    if zone in take_mat[pitch_type].keys():
-                        zone_take = take_mat[pitch_type][zone][str_count]
-
-
-                    # generate prediction from model
-                    if zone[-1] == "b" or zone_take:
-                        continue
-                    else:
-                        batch_pitch_tensor.append(pitch_tensor)
-                        batch_pitcher_tensor.append(pitcher_tensor)
-                        batch_batter_tensor.append(batter_tensor)
-                        batch_s_count_tensor.append(s_count)
-                        batch_b_count_tensor.append(b_count)
-
-
-    batch_pitch_tensor = np.array(batch_pitch_tensor)
-    batch_pitcher_tensor = np.array(batch_pitcher_tensor)
-    batch_batter_tensor = np.array(batch_batter_tensor)
-    batch_s_count_tensor = np.array(batch_s_count_tensor)
-    batch_b_count_tensor = np.array(batch_b_count_tensor)  
-
-
-    predictions = model.predict(
-    [
-        batch_pitcher_tensor,
-        batch_batter_tensor,
-        batch_s_count_tensor,
-        batch_b_count_tensor,
-        batch_pitch_tensor,
-    ]
-    )
-
-        # instantiate the dict
-    swing_transition_matrix = {}
-
-    prediction_index = 0
-    # iterate over list of pitch types
-    for pitch_type in pitches.keys():
-        # iterate over zones
-        swing_transition_matrix[pitch_type] = {}
-        zone_list_raw = pitches[pitch_type].zones.strike_zones + pitches[pitch_type].zones.ball_zones
-        zone_list = []
-        for zone in zone_list_raw:
-            zone_list.append(zone.name)
-        zone_list = zone_list + ["9b","10b","11b","12b","13b","14b","15b","16b"]
-       
-        for zone in zone_list:
-            # iterate over s_count
-            swing_transition_matrix[pitch_type][zone] = {}
-            for s_count in range(3):
-                for b_count in range(4):
-                    zone_take = False
-                    str_count = str(b_count) + str(s_count)
-                    if zone in take_mat[pitch_type].keys():
-                        zone_take = take_mat[pitch_type][zone][str_count]
-
-
-                    # generate prediction from model
-                    if zone[-1] == "b" or zone_take:
-                        swing_transition_matrix[pitch_type][zone][
-                                str_count
-                        ] = {Outcomes.BALL.value:1}
-                    else:
-                        prediction = predictions[prediction_index]
-                        prediction_index+=1
-                        cleaned_prediction = {
-                            Outcomes.OUT.value: float(prediction[2]),
-                            Outcomes.HIT.value: float(prediction[3]),
-                            Outcomes.FOUL.value: float(prediction[1]),
-                            Outcomes.STRIKE.value: float(prediction[0]),
-                        }
-                        swing_transition_matrix[pitch_type][zone][
-                            str_count
-                        ] = cleaned_prediction
+    # rows of the take zones are ball outcomes, the model is not run on them
+    layout = get_swing_layout(pitches)
+    rows = np.array([
+        not take_mat[pitch_type].get(zone, {}).get(count, False)
+        for pitch_type, zone, count in layout.keys
+    ], dtype=bool)
+    predictions = model.predict(layout.get_inputs([pitcher_tensor, batter_tensor], rows))
+
+    # instantiate the dict, every zone a ball until predicted otherwise
+    count_keys = gen_count_keys()
+    swing_transition_matrix = {
+        pitch_type: {
+            zone: {count: {Outcomes.BALL.value: 1} for count in count_keys}
+            for zone in get_swing_zones(pitch)
+        }
+        for pitch_type, pitch in pitches.items()
+    }
+    swing_keys = [key for key, row in zip(layout.keys, rows) if row]
+    for (pitch_type, zone, count), prediction in zip(swing_keys, predictions):
+        swing_transition_matrix[pitch_type][zone][count] = {
+            Outcomes.OUT.value: float(prediction[2]),
+            Outcomes.HIT.value: float(prediction[3]),
+            Outcomes.FOUL.value: float(prediction[1]),
+            Outcomes.STRIKE.value: float(prediction[0]),
+        }
     return swing_transition_matrix
 
 def get_pitch_matrix(zone, pitch_type):
-    """Generates 5x5x6 array representing a one-hot encoding of pitch type/location
+    """Returns the 5x5x6 array representing a one-hot encoding of pitch type/location
 
 
     Parameters
@@ -458,59 +403,84 @@ def get_pitch_matrix(zone, pitch_type):
     Returns
     -------
     array
-        numpy array with the pitch type/zone one-hot encoded
+        read-only numpy array with the pitch type/zone one-hot encoded, a view of
+        PITCH_MATRICES
     
     """
-    
-    pitch_types = ["FF", "FT", "CU", "CH", "FC", "SL"]
-    pitch_tensor = np.zeros((5, 5, 6))
-    p_ind = pitch_types.index(pitch_type)
-
-    # (x,y)
-    zone_index_map = {
-        0: (1, 1),
-        1: (2, 1),
-        2: (3, 1),
-        3: (1, 2),
-        4: (2, 2),
-        5: (3, 2),
-        6: (1, 3),
-        7: (2, 3),
-        8: (3, 3),
-        9: (0, 0),
-        10: (np.s_[1:4], 0),
-        11: (4, 0),
-        12: (0, np.s_[1:4]),
-        13: (4, np.s_[1:4]),
-        14: (0, 4),
-        15: (np.s_[1:4], 4),
-        16: (4, 4),
-    }
-    pitch_tensor[zone_index_map[zone][0], zone_index_map[zone][1], p_ind] = 1
-
-    return pitch_tensor
+    return PITCH_MATRICES[PITCH_TYPE_INDEX[pitch_type], zone]
 
 
-def gen_acc_mat(model, pitcher, pitches: Dict[str, Pitch]) -> dict:
+def gen_acc_mat(model, pitcher, pitches: Dict[str, Pitch], method: str = "simulation",
+                threads: int = 1, SEED: int = 0, pitcher_key: int = None) -> dict:
     """Generates accuracy matrix by running error simulation for each pitch
 
+    Every intended zone of every pitch draws from its own generator, spawned from
+    (SEED, pitcher_key, pitch, zone), so the matrix is the same bit for bit however
+    many threads simulate it
+
     Parameters
     ----------
+    model : keras.Model
+        the error model used to predict the pitcher's covariance matrix
+    pitcher : np.ndarray
+        the pitcher tensor
     pitches : Dict[str, Pitch]
         the list pitches a pitcher may throw
+    method : str
+        "simulation" for the Monte Carlo simulation, "halton" or "antithetic" for the
+        simulation with that sampling (see pitches.sampling), "adaptive" for halton
+        batches until every cell is within ACC_TOLERANCE, "analytic" to compute the
+        probabilities exactly from the bivariate normal CDF, "fft" to convolve the zones
+        with the error density on a grid of ACC_PIXELS_PER_SIGMA pixels a sigma, but
+        no narrower than ACC_MIN_RESOLUTION
+    threads : int
+        the number of pitches simulated at once, the model always runs on the calling
+        thread
+    SEED : int
+        the seed of the simulation
+    pitcher_key : int
+        a non-negative integer naming the pitcher in the seed, derived from the pitcher
+        tensor if None so equal tensors always get equal matrices
 
     Returns
     -------
     dict
         an accuracy matrix dict to index [pitch][int_zone][act_zone] = %in_act_zone
     """
-
-    acc_mat = {}
-    for p_name, pitch in pitches.items():
-        acc_mat[p_name] = pitch.run_error_simulation_from_pitcher(model, pitcher)
-
-    return acc_mat
-
+    if method not in ("analytic", "adaptive", "fft") + tuple(ACC_TRIALS):
+        raise ValueError(f"unknown accuracy matrix method: {method}")
+    if pitcher_key is None:
+        pitcher_key = int(tensor_digest(pitcher)[:16], 16)
+
+    # the model is not shared between threads, only the simulations are
+    cov_matrices = {p_name: pitch.get_cov_matrix(model, pitcher)
+                    for p_name, pitch in pitches.items()}
+
+    def run_pitch(p_name: str) -> dict:
+        pitch, cov_matrix = pitches[p_name], cov_matrices[p_name]
+        if method == "analytic":
+            return pitch.calc_acc_matrix(cov_matrix)
+        if method == "fft":
+            sigmas = np.sqrt(np.clip(np.diag(cov_matrix), 0, None))
+            if not (sigmas > 0).any():
+                raise ValueError(f"the error of {p_name} has no spread: {cov_matrix}")
+            resolution = max(sigmas[sigmas > 0].min() / ACC_PIXELS_PER_SIGMA,
+                             ACC_MIN_RESOLUTION)
+            return pitch.calc_acc_matrix_fft(gen_gaussian_kernel(cov_matrix, resolution),
+                                             resolution)
+        if method == "adaptive":
+            return pitch.run_error_adaptive(cov_matrix, ACC_TOLERANCE, SEED=SEED,
+                                            pitcher_key=pitcher_key)[0]
+        if method == "simulation":
+            return pitch.run_error_simulation_from_cov(cov_matrix, ACC_TRIALS[method], SEED,
+                                                       pitcher_key=pitcher_key)
+        return pitch.run_error_sampling(cov_matrix, ACC_TRIALS[method], method, SEED,
+                                        pitcher_key=pitcher_key)[0]
+
+    if threads <= 1:
+        return {p_name: run_pitch(p_name) for p_name in pitches}
+    with ThreadPoolExecutor(threads) as executor:
+        return dict(zip(pitches, executor.map(run_pitch, pitches)))
 
 
 def gen_trans_prob_mat(swing_trans_mat: dict, acc_mat: dict, take_mat:dict) -> dict:
@@ -595,3 +565,117 @@ def gen_trans_prob_mat(swing_trans_mat: dict, acc_mat: dict, take_mat:dict) -> d
                     ] = swing_trans_mat[pitch][int_zone][count]
 
     return trans_prob_mat
+
+
+def gen_acc_tensor(acc_mat: dict) -> np.ndarray:
+    """Generates the dense accuracy tensor from an accuracy matrix dict
+
+    Parameters
+    ----------
+    acc_mat : dict
+        dict that defines the accuracy matrix dict[pitch][int_zone][act_zone] = %in_act
+
+    Returns
+    -------
+    np.ndarray
+        (pitches, int_zones, act_zones) array; a pitch aimed at an obvious zone lands in
+        that obvious zone, so those rows are one-hot
+    """
+    acc_tensor = np.zeros((len(PITCHES), len(ZONES), len(ZONES)))
+    for pitch, int_zones in acc_mat.items():
+        p_ind = PITCH_INDEX[pitch]
+        for int_zone, act_zones in int_zones.items():
+            for act_zone, prob in act_zones.items():
+                # points exactly on a cutoff line (-1) have no area, dropping them
+                if act_zone in ZONE_INDEX:
+                    acc_tensor[p_ind, ZONE_INDEX[int_zone], ZONE_INDEX[act_zone]] = prob
+
+    obv_inds = [ZONE_INDEX[zone] for zone in OBVIOUS_ZONES]
+    acc_tensor[:, obv_inds, obv_inds] = 1
+    return acc_tensor
+
+
+def gen_swing_tensor(swing_trans_mat: dict) -> (np.ndarray, np.ndarray):
+    """Generates the dense swing outcome tensor from a swing transition matrix dict
+
+    Parameters
+    ----------
+    swing_trans_mat : dict
+        dict[pitch][zone][count][outcome] = %outcome
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray)
+        (pitches, zones, counts, outcomes) array of swing outcome probabilities and the
+        (pitches, zones) boolean mask of the zones each pitch can be aimed at
+    """
+    swing_tensor = np.zeros((len(PITCHES), len(ZONES), len(COUNTS), len(OUTCOMES)))
+    zone_mask = np.zeros((len(PITCHES), len(ZONES)), dtype=bool)
+    for pitch, zones in swing_trans_mat.items():
+        p_ind = PITCH_INDEX[pitch]
+        for zone, counts in zones.items():
+            zone_mask[p_ind, ZONE_INDEX[zone]] = True
+            for count, outcomes in counts.items():
+                for outcome, prob in outcomes.items():
+                    swing_tensor[p_ind, ZONE_INDEX[zone], COUNT_INDEX[count],
+                                 OUTCOME_INDEX[outcome]] = prob
+    return swing_tensor, zone_mask
+
+
+def calc_trans_prob_tensor(acc_tensor: np.ndarray, swing_tensor: np.ndarray,
+                           zone_mask: np.ndarray) -> TransitionTensor:
+    """Combines the accuracy and swing outcome tensors into the transition tensor
+
+    Parameters
+    ----------
+    acc_tensor : np.ndarray
+        (pitches, int_zones, act_zones) accuracy tensor from gen_acc_tensor
+    swing_tensor : np.ndarray
+        (pitches, zones, counts, outcomes) swing outcome tensor from gen_swing_tensor
+    zone_mask : np.ndarray
+        (pitches, zones) boolean mask of the zones each pitch can be aimed at
+
+    Returns
+    -------
+    TransitionTensor
+        probs[pitch][int_zone][count][batact][outcome]
+    """
+    probs = np.zeros(swing_tensor.shape[:3] + (len(BATACT_INDEX), len(OUTCOMES)))
+
+    # swing: sum over actual zones of P(actual | intended) * P(outcome | actual)
+    probs[:, :, :, BATACT_INDEX[BatActs.SWING.value], :] = np.einsum(
+        "pia,pack->pick", acc_tensor, swing_tensor)
+
+    # take: a called strike if the pitch lands in a strike zone, otherwise a ball
+    strike_inds = [ZONE_INDEX[zone] for zone in STRIKE_ZONES]
+    p_strike = acc_tensor[:, :, strike_inds].sum(axis=2)[:, :, np.newaxis]
+    take = BATACT_INDEX[BatActs.TAKE.value]
+    probs[:, :, :, take, OUTCOME_INDEX[Outcomes.STRIKE.value]] = p_strike
+    probs[:, :, :, take, OUTCOME_INDEX[Outcomes.BALL.value]] = 1 - p_strike
+
+    probs[~zone_mask] = 0
+    return TransitionTensor(probs, zone_mask)
+
+
+def gen_trans_prob_tensor(swing_trans_mat: dict, acc_mat: dict) -> TransitionTensor:
+    """Generates the transition probabilities as a dense TransitionTensor
+
+    Same probabilities as gen_trans_prob_mat (take_mat is already reflected in
+    swing_trans_mat, take zones only lead to balls), use TransitionTensor.to_dict
+    for the dict form
+
+    Parameters
+    ----------
+    swing_trans_mat : dict
+        dict that defines the probability of an outcome (foul, swing, out, hit, ball)
+        access probs by swing_trans_mat[pitch][zone][count][outcome] = %outcome
+    acc_mat : dict
+        dict that defines the accuracy matrix dict[pitch][int_zone][act_zone] = %in_act
+
+    Returns
+    -------
+    TransitionTensor
+        probs[pitch][zone][count][batact][outcome] = transition probability
+    """
+    swing_tensor, zone_mask = gen_swing_tensor(swing_trans_mat)
+    return calc_trans_prob_tensor(gen_acc_tensor(acc_mat), swing_tensor, zone_mask)
@@ -0,0 +1,281 @@
+"""Accuracy Field Module
+
+The probability that a pitch aimed at a lands in zone c is the error kernel summed over
+the zone, P(c | a) = sum_e K(e) mask_c(a + e): a correlation of the zone mask with the
+kernel. On a fine grid that is one FFT per zone for every aim point at once, so the cost
+of a pitch does not grow with the number of aim points, and the kernel can be any
+density on the grid: a bivariate normal (gen_gaussian_kernel) or a histogram of
+observed misses (gen_empirical_kernel).
+
+Zones are unions of the rectangular cells of their ZoneIndex, so every pixel of a mask
+holds the exact share of the pixel the zone covers (separable overlap weights), not a
+0/1 sample at the pixel center. The rasterization adds no error, what is left is the
+discretization of the kernel and the interpolation between aim pixels.
+"""
+from typing import List
+
+import numpy as np
+
+from pitches.zone_index import ZoneIndex
+
+
+def get_fast_size(n: int) -> int:
+    """Returns the smallest 2^a 3^b 5^c at least n, a length the FFT handles quickly
+
+    Parameters
+    ----------
+    n : int
+        the smallest length allowed
+
+    Returns
+    -------
+    int
+        the FFT length
+    """
+    best = 2 ** int(np.ceil(np.log2(max(n, 1))))
+    power_5 = 1
+    while power_5 < best:
+        power_3 = power_5
+        while power_3 < best:
+            size = power_3
+            while size < n:
+                size *= 2
+            best = min(best, size)
+            power_3 *= 3
+        power_5 *= 5
+    return best
+
+
+def gen_gaussian_kernel(cov_matrix: np.ndarray, resolution: float,
+                        n_sigmas: float = 5.0) -> np.ndarray:
+    """Returns a bivariate normal error density on a grid of pixels
+
+    Parameters
+    ----------
+    cov_matrix : np.ndarray
+        2x2 covariance matrix of the error, singular or with tiny negative eigenvalues
+        from a model prediction is fine, the eigenvalues are clipped at 0 as in
+        sampling.calc_cov_root
+    resolution : float
+        the width of a pixel (in feet)
+    n_sigmas : float
+        the kernel reaches n_sigmas standard deviations from the center on each axis
+
+    Returns
+    -------
+    np.ndarray
+        (2 * r_x + 1, 2 * r_y + 1) probabilities of the error landing in each pixel,
+        [x][y] with the center pixel at [r_x][r_y], summing to 1
+    """
+    cov_matrix = np.asarray(cov_matrix, dtype=float)
+    if cov_matrix.shape != (2, 2) or not np.isfinite(cov_matrix).all():
+        raise ValueError(f"a kernel needs a finite 2x2 covariance matrix, got {cov_matrix}")
+    if not resolution > 0:
+        raise ValueError(f"the pixel width must be positive, got {resolution}")
+
+    # an axis without spread keeps the variance of a uniform pixel, so its mass falls on
+    # a line one pixel wide instead of dividing by zero
+    eig_vals, eig_vecs = np.linalg.eigh(cov_matrix)
+    eig_vals = np.maximum(eig_vals, resolution ** 2 / 12)
+    radii = np.ceil(n_sigmas * np.sqrt((eig_vecs ** 2) @ eig_vals) / resolution).astype(int)
+    x_offsets = np.arange(-radii[0], radii[0] + 1) * resolution
+    y_offsets = np.arange(-radii[1], radii[1] + 1) * resolution
+    offsets = np.stack(np.meshgrid(x_offsets, y_offsets, indexing="ij"), axis=-1)
+
+    # the density up to a constant in the eigenbasis, normalized over the pixels
+    exponents = ((offsets @ eig_vecs) ** 2 / eig_vals).sum(axis=-1)
+    kernel = np.exp(-0.5 * exponents)
+    return kernel / kernel.sum()
+
+
+def gen_empirical_kernel(x_errors: np.ndarray, y_errors: np.ndarray, resolution: float,
+                         radius: float) -> np.ndarray:
+    """Returns the histogram of observed errors on a grid of pixels
+
+    Parameters
+    ----------
+    x_errors : np.ndarray
+        x distance of every pitch from where it was aimed (in feet)
+    y_errors : np.ndarray
+        y distance of every pitch from where it was aimed (in feet)
+    resolution : float
+        the width of a pixel (in feet)
+    radius : float
+        the kernel reaches radius from the center on each axis, errors beyond it are
+        dropped
+
+    Returns
+    -------
+    np.ndarray
+        (2 * r + 1, 2 * r + 1) share of the errors in each pixel, [x][y] with the
+        center pixel at [r][r], summing to 1
+    """
+    n_pixels = int(np.ceil(radius / resolution))
+    bins = (np.arange(-n_pixels, n_pixels + 2) - 0.5) * resolution
+    kernel, _, _ = np.histogram2d(x_errors, y_errors, bins=(bins, bins))
+    if kernel.sum() == 0:
+        raise ValueError(f"no error is within {radius} of the center")
+    return kernel / kernel.sum()
+
+
+def calc_coverage(pixel_edges: np.ndarray, cell_edges: np.ndarray) -> np.ndarray:
+    """Returns the share of every pixel of an axis that falls in every cell
+
+    Parameters
+    ----------
+    pixel_edges : np.ndarray
+        n + 1 sorted edges of n pixels
+    cell_edges : np.ndarray
+        m + 1 sorted edges of m cells, the outer ones may be infinite
+
+    Returns
+    -------
+    np.ndarray
+        (n, m) overlap of pixel i and cell j over the width of pixel i
+    """
+    lows = np.maximum(pixel_edges[:-1, np.newaxis], cell_edges[np.newaxis, :-1])
+    highs = np.minimum(pixel_edges[1:, np.newaxis], cell_edges[np.newaxis, 1:])
+    return np.clip(highs - lows, 0, None) / np.diff(pixel_edges)[:, np.newaxis]
+
+
+class AccuracyField:
+    """Class used to represent the landing probabilities of every zone for every aim point
+
+    Attributes
+    ----------
+    field : np.ndarray
+        (codes, x pixels, y pixels) probability that a pitch aimed at the center of an
+        aim pixel lands in each zone, codes follow names
+    names : List[str]
+        the code to name table of the zones
+    origin : np.ndarray
+        (x, y) center of the aim pixel [0][0]
+    resolution : float
+        the width of a pixel (in feet)
+
+    Methods
+    -------
+    from_kernel(zone_index, kernel, resolution, x_bounds, y_bounds)
+        convolves the zones of an index with a kernel over a box of aim points
+    get_zone_probs(x_aims, y_aims)
+        returns the landing probabilities of aim points between pixel centers
+    """
+
+    def __init__(self, field: np.ndarray, names: List[str], origin: np.ndarray,
+                 resolution: float) -> None:
+        """Instantiates AccuracyField object
+
+        Parameters
+        ----------
+        field : np.ndarray
+            (codes, x pixels, y pixels) landing probabilities of every aim pixel
+        names : List[str]
+            the code to name table of the zones
+        origin : np.ndarray
+            (x, y) center of the aim pixel [0][0]
+        resolution : float
+            the width of a pixel (in feet)
+        """
+        self.field = field
+        self.names = names
+        self.origin = np.asarray(origin, dtype=float)
+        self.resolution = resolution
+
+    @classmethod
+    def from_kernel(cls, zone_index: ZoneIndex, kernel: np.ndarray, resolution: float,
+                    x_bounds: (float, float), y_bounds: (float, float)) -> "AccuracyField":
+        """Convolves the zone masks with an error kernel for every aim point in a box
+
+        Parameters
+        ----------
+        zone_index : ZoneIndex
+            the compiled zones
+        kernel : np.ndarray
+            (2 * r_x + 1, 2 * r_y + 1) error probabilities, center pixel at [r_x][r_y]
+        resolution : float
+            the width of a pixel of the kernel and the field (in feet)
+        x_bounds : (float, float)
+            the smallest and largest x of the aim points
+        y_bounds : (float, float)
+            the smallest and largest y of the aim points
+
+        Returns
+        -------
+        AccuracyField
+            the field of the box of aim points, one pixel wider on every side
+        """
+        radii = np.array(kernel.shape) // 2
+        # aim pixels cover the bounds with a pixel to spare for interpolation, the mask
+        # reaches a kernel radius further
+        aim_lows = np.floor(np.array([x_bounds[0], y_bounds[0]]) / resolution) - 1
+        aim_highs = np.ceil(np.array([x_bounds[1], y_bounds[1]]) / resolution) + 1
+        lows = aim_lows - radii
+        shape = (aim_highs + radii - lows + 1).astype(int)
+
+        # the share of every mask pixel in every open cell of the index, per axis
+        coverages = []
+        for axis, edges in enumerate([zone_index.x_edges, zone_index.y_edges]):
+            pixel_edges = (lows[axis] + np.arange(shape[axis] + 1) - 0.5) * resolution
+            cell_edges = np.concatenate([[-np.inf], edges, [np.inf]])
+            coverages.append(calc_coverage(pixel_edges, cell_edges))
+        cell_codes = zone_index.table[0::2, 0::2]
+
+        # the error zone has no area, as in ZoneIndex.calc_zone_probs
+        codes = [code for code in np.unique(cell_codes) if code != zone_index.error_code]
+        masks = np.stack([coverages[0] @ (cell_codes == code) @ coverages[1].T
+                          for code in codes])
+
+        # linear correlation through a circular convolution with the flipped kernel, the
+        # wrapped part of the result is exactly the part outside the aim pixels
+        fft_shape = tuple(get_fast_size(n) for n in shape)
+        spectrum = (np.fft.rfft2(masks, fft_shape)
+                    * np.fft.rfft2(kernel[::-1, ::-1], fft_shape))
+        conv = np.fft.irfft2(spectrum, fft_shape)
+        aim_shape = (aim_highs - aim_lows + 1).astype(int)
+        valid = conv[:, 2 * radii[0]:2 * radii[0] + aim_shape[0],
+                     2 * radii[1]:2 * radii[1] + aim_shape[1]]
+
+        field = np.zeros((len(zone_index.names),) + tuple(aim_shape))
+        field[codes] = np.clip(valid, 0, 1)
+        return cls(field, zone_index.names, aim_lows * resolution, resolution)
+
+    def get_zone_probs(self, x_aims: np.ndarray, y_aims: np.ndarray) -> np.ndarray:
+        """Returns the landing probabilities of aim points, bilinear between pixel centers
+
+        Parameters
+        ----------
+        x_aims : np.ndarray
+            x coordinates of the aim points
+        y_aims : np.ndarray
+            y coordinates of the aim points
+
+        Returns
+        -------
+        np.ndarray
+            (len(x_aims), len(names)) array, [i][code] = P(aim point i lands in code)
+        """
+        positions = (np.column_stack([x_aims, y_aims]) - self.origin) / self.resolution
+        starts = np.floor(positions).astype(int)
+        if (starts < 0).any() or (starts + 1 >= np.array(self.field.shape[1:])).any():
+            raise ValueError("aim points outside the field")
+
+        weights = positions - starts
+        probs = 0
+        for dx in (0, 1):
+            for dy in (0, 1):
+                weight = (np.abs(1 - dx - weights[:, 0]) * np.abs(1 - dy - weights[:, 1]))
+                probs = probs + weight * self.field[:, starts[:, 0] + dx, starts[:, 1] + dy]
+        return probs.T
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return (
+            f"AccuracyField({self.field}, {self.names}, {self.origin}, {self.resolution})"
+        )
+
+    def __str__(self):
+        """Prints the size and the origin of the field"""
+        return (
+            f"AccuracyField: {self.field.shape[1]}x{self.field.shape[2]} aim pixels of "
+            f"{self.resolution} ft from {self.origin}"
+        )
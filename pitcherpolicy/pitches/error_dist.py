@@ -7,20 +7,25 @@ class ErrorDistribution:
 
     Methods
     -------
-    gen_actual_loc(x_intended, y_intended)
+    gen_actual_loc(x_intended, y_intended, rng)
         returns the actual coordinates
+    gen_actual_locs(x_intended, y_intended, trials, rng)
+        returns trials actual coordinates for every intended location
     """
 
     def __init__(self) -> None:
         """Instantiates ErrorDistribution object"""
 
-    def gen_actual_loc(self, x_intended: float, y_intended: float) -> (float, float):
+    def gen_actual_loc(self, x_intended: float, y_intended: float,
+                       rng: np.random.Generator = None) -> (float, float):
         """Applies error to intended location and returns actual location
 
         Parameters
         ----------
         intended_location : (float, float)
             coordinates of the intended location
+        rng : np.random.Generator
+            the source of the error, the global numpy random state if None
 
         Returns
         -------
@@ -28,6 +33,28 @@ class ErrorDistribution:
             the actual location
         """
 
+    def gen_actual_locs(self, x_intended: np.ndarray, y_intended: np.ndarray,
+                        trials: int,
+                        rng: np.random.Generator = None) -> (np.ndarray, np.ndarray):
+        """Applies error to many intended locations at once
+
+        Parameters
+        ----------
+        x_intended : np.ndarray
+            x coordinates of the intended locations
+        y_intended : np.ndarray
+            y coordinates of the intended locations
+        trials : int
+            the number of actual locations drawn for each intended location
+        rng : np.random.Generator
+            the source of the error, the global numpy random state if None
+
+        Returns
+        -------
+        (np.ndarray, np.ndarray)
+            (len(x_intended), trials) arrays of actual x and y coordinates
+        """
+
 
 class NormalErrorDistribution(ErrorDistribution):
     """Class used to represent NormalErrorDistribution
@@ -45,8 +72,10 @@ class NormalErrorDistribution(ErrorDistribution):
 
     Methods
     -------
-    gen_actual_loc(x_intended, y_intended)
+    gen_actual_loc(x_intended, y_intended, rng)
         returns the actual coordinates
+    gen_actual_locs(x_intended, y_intended, trials, rng)
+        returns trials actual coordinates for every intended location
     """
 
     def __init__(self, sigma_x: float, sigma_y: float,
@@ -76,7 +105,8 @@ class NormalErrorDistribution(ErrorDistribution):
         else:
             self.mu_y = mu_y
 
-    def gen_actual_loc(self, x_intended: float, y_intended: float) -> (float, float):
+    def gen_actual_loc(self, x_intended: float, y_intended: float,
+                       rng: np.random.Generator = None) -> (float, float):
         """Returns coords of actual location based on error dist and intended location
 
         Parameters
@@ -85,14 +115,51 @@ class NormalErrorDistribution(ErrorDistribution):
             x coordinate
         y_intended: float
             y coordinate
+        rng : np.random.Generator
+            the source of the error, the global numpy random state if None
 
         Returns
         -------
         (float, float)
             returns the actual coordinates, (x_actual, y_actual)
         """
-        x_actual = x_intended + np.random.normal(self.mu_x, self.sigma_x, 1)
-        y_actual = y_intended + np.random.normal(self.mu_y, self.sigma_y, 1)
+        rng = np.random if rng is None else rng
+        x_actual = x_intended + rng.normal(self.mu_x, self.sigma_x, 1)
+        y_actual = y_intended + rng.normal(self.mu_y, self.sigma_y, 1)
+        return (x_actual, y_actual)
+
+    def gen_actual_locs(self, x_intended: np.ndarray, y_intended: np.ndarray,
+                        trials: int,
+                        rng: np.random.Generator = None) -> (np.ndarray, np.ndarray):
+        """Returns trials actual locations for every intended location in one draw
+
+        Draws the same random numbers, in the same order, as calling gen_actual_loc
+        trials times for each intended location
+
+        Parameters
+        ----------
+        x_intended : np.ndarray
+            x coordinates of the intended locations
+        y_intended : np.ndarray
+            y coordinates of the intended locations
+        trials : int
+            the number of actual locations drawn for each intended location
+        rng : np.random.Generator
+            the source of the error, the global numpy random state if None
+
+        Returns
+        -------
+        (np.ndarray, np.ndarray)
+            (len(x_intended), trials) arrays of actual x and y coordinates
+        """
+        rng = np.random if rng is None else rng
+        x_intended = np.asarray(x_intended, dtype=float)[:, np.newaxis]
+        y_intended = np.asarray(y_intended, dtype=float)[:, np.newaxis]
+
+        # gen_actual_loc alternates x and y draws
+        errors = rng.standard_normal((x_intended.shape[0], trials, 2))
+        x_actual = x_intended + (self.mu_x + self.sigma_x * errors[:, :, 0])
+        y_actual = y_intended + (self.mu_y + self.sigma_y * errors[:, :, 1])
         return (x_actual, y_actual)
 
     def __repr__(self):
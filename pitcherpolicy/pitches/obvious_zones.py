@@ -1,4 +1,6 @@
 """ObviousZones Module"""
+from typing import List
+
 from pitches.pitch_zone_enums import ObviousZoneNames
 
 
@@ -22,6 +24,8 @@ class ObviousZones:
         returns true if (x_coord, y_coord) are outside left_x, right_x, top_y, and bot_y
     return_zone(x_coord, y_coord)
         returns the -1 if (x_coord, y_coord) in strike zone, otherwise returns the obvious zone name
+    get_zone_names()
+        returns the obvious zone names in the order used by zone codes
     get_obv_zones_data()
         returns a dict of obvious zone data needed to plot a Zones visualization
     """
@@ -96,6 +100,17 @@ class ObviousZones:
 
         return ObviousZoneNames.ERROR.value
 
+    @classmethod
+    def get_zone_names(cls) -> List[str]:
+        """Returns the obvious zone names, the index of a name is its zone code
+
+        Returns
+        -------
+        List[str]
+            obvious zone names (9b to 16b) followed by the error name (-1)
+        """
+        return [zone.value for zone in ObviousZoneNames]
+
     def get_obv_zones_data(self) -> dict:
         """Returns the information that defines obvious zones
 
@@ -1,13 +1,15 @@
 """Pitch Module"""
 
+from typing import List
+
 import numpy as np
-import matplotlib.pyplot as plt
 
-import json
-from pitches.error_dist import ErrorDistribution
+from pitches.accuracy_field import AccuracyField
+from pitches.error_dist import ErrorDistribution, NormalErrorDistribution
 from pitches.pitch_zone_enums import ObviousZoneNames
+from pitches.sampling import (HALTON_REPLICATES, REPLICATE_T_95, ReplicateSampler,
+                              calc_cov_root, gen_std_normals, gen_zone_rngs, get_groups)
 from pitches.zones import Zones
-from tensorflow.keras import models
 
 class Pitch:
     """Class used to represent Pitch
@@ -25,8 +27,34 @@ class Pitch:
     -------
     display_zones()
         plots a visual of our zones
-    run_error_simuation(trials)
+    get_zone_rngs(SEED, pitcher_key)
+        returns the random generator of every intended zone
+    run_error_simuation(trials, SEED, vectorized, sampling)
         generates an accuracy matrix
+    get_cov_matrix(model, pitcher)
+        returns the pitcher's predicted error covariance matrix for the pitch
+    run_error_simulation_from_pitcher(model, pitcher, trials, SEED, vectorized, sampling)
+        generates an accuracy matrix from a pitcher's predicted error distribution
+    run_error_simulation_from_cov(cov_matrix, trials, SEED, vectorized, pitcher_key)
+        generates an accuracy matrix for a bivariate normal error
+    run_error_sampling(cov_matrix, trials, sampling, SEED, mean, pitcher_key)
+        generates an accuracy matrix and its standard errors for a bivariate normal error
+    run_error_adaptive(cov_matrix, tolerance, sampling, batch, max_trials, SEED, mean)
+        draws every zone until its accuracy is known to a tolerance
+    run_error_analytic_from_pitcher(model, pitcher)
+        computes the accuracy matrix exactly from a pitcher's predicted error distribution
+    calc_acc_matrix(cov_matrix)
+        computes the accuracy matrix exactly for a bivariate normal error
+    calc_acc_matrix_fft(kernel, resolution)
+        computes the accuracy matrix for any error kernel on a grid
+    tally_intended_zones(x_actuals, y_actuals)
+        returns the accuracy matrix of actual locations drawn for every intended zone
+    tally_groups(x_actuals, y_actuals, groups)
+        returns the accuracy matrix and its standard errors from groups of draws
+    gen_acc_dicts(shares, names)
+        returns the accuracy matrix and its standard errors from group shares
+    tally_zones(x_actuals, y_actuals)
+        returns the % of actual locations that ended in each zone
     """
 
     def __init__(self, name: str, zones: Zones, error_dist: ErrorDistribution) -> None:
@@ -45,60 +73,96 @@ class Pitch:
         self.zones = zones
         self.error_dist = error_dist
 
-    def run_error_simuation(self, trials: int = 1000, SEED: int = 0) -> dict:
+    def get_zone_rngs(self, SEED: int = 0,
+                      pitcher_key: int = 0) -> List[np.random.Generator]:
+        """Returns the generator of every intended zone, see pitches.sampling.gen_zone_rngs
+
+        Parameters
+        ----------
+        SEED : int
+            the seed of the simulation
+        pitcher_key : int
+            a non-negative integer naming the pitcher, 0 for a simulation without one
+
+        Returns
+        -------
+        List[np.random.Generator]
+            one generator for each of strike_zones + ball_zones
+        """
+        n_zones = len(self.zones.strike_zones) + len(self.zones.ball_zones)
+        return gen_zone_rngs(SEED, pitcher_key, self.name, n_zones)
+
+    def run_error_simuation(self, trials: int = 1000, SEED: int = 0,
+                            vectorized: bool = True, sampling: str = "random") -> dict:
         """Runs a simulation to create an accuracy matrix based on zones and error dist
 
         Parameters
         ----------
         trials : int
             the number of times we run the simulation for each zone
+        SEED : int
+            the seed of the generators of the zones, see get_zone_rngs
+        vectorized : bool
+            draw all trials of a zone in one call, otherwise draw trial by trial;
+            both modes consume the random streams in the same order
+        sampling : str
+            "random" draws from the error dist, "antithetic" or "halton" draw from the
+            normal error dist with run_error_sampling, see pitches.sampling
 
         Returns
         -------
         dict
             a dict[int][act] that has % of time the pitch ended in a zone
         """
-        # setting seed for reproducibility
-        np.random.seed(SEED)
+        if sampling != "random":
+            if not isinstance(self.error_dist, NormalErrorDistribution):
+                raise ValueError(f"{sampling} sampling needs a NormalErrorDistribution")
+            return self.run_error_sampling(
+                np.diag([self.error_dist.sigma_x ** 2, self.error_dist.sigma_y ** 2]),
+                trials, sampling, SEED, (self.error_dist.mu_x, self.error_dist.mu_y))[0]
+
+        int_zones = self.zones.strike_zones + self.zones.ball_zones
+        centers = np.array([zone.get_center() for zone in int_zones])
+        rngs = self.get_zone_rngs(SEED)
+
+        if vectorized:
+            actuals = [self.error_dist.gen_actual_locs(center[:1], center[1:], trials, rng)
+                       for center, rng in zip(centers, rngs)]
+            return self.tally_intended_zones(np.concatenate([x for x, _ in actuals]),
+                                             np.concatenate([y for _, y in actuals]))
 
         acc_matrix = {}
-        for zone in self.zones.strike_zones + self.zones.ball_zones:
-            acc_matrix[zone.name] = {}
+        for zone, rng in zip(int_zones, rngs):
             x_intended, y_intended = zone.get_center()
 
+            x_actuals, y_actuals = [], []
             for _ in range(trials):
                 x_actual, y_actual = self.error_dist.gen_actual_loc(
-                    x_intended, y_intended)
-                loc = self.zones.return_zone(x_actual, y_actual)
-
-                if loc not in acc_matrix[zone.name].keys():
-                    acc_matrix[zone.name][loc] = 0
-                acc_matrix[zone.name][loc] += 1
-            acc_matrix[zone.name] = {k: v / trials for k,
-                                     v in acc_matrix[zone.name].items()}
+                    x_intended, y_intended, rng)
+                x_actuals.append(x_actual)
+                y_actuals.append(y_actual)
+
+            acc_matrix[zone.name] = self.tally_zones(
+                np.concatenate(x_actuals), np.concatenate(y_actuals))
         return acc_matrix
-    
-    def run_error_simulation_from_pitcher(self, model, pitcher, trials: int = 1000, SEED: int = 0) -> dict:
-        """Runs a simulation to create an accuracy matrix based on zones and error dist
+
+    def get_cov_matrix(self, model, pitcher: np.ndarray) -> np.ndarray:
+        """Predicts the covariance matrix of the pitcher's error for this pitch
 
         Parameters
         ----------
-        trials : int
-            the number of times we run the simulation for each zone
+        model : keras.Model
+            the error model, predicts [mu_x, mu_y, var_x, var_y, cov_x_y]
+        pitcher : np.ndarray
+            the pitcher tensor
 
         Returns
         -------
-        dict
-            a dict[int][act] that has % of time the pitch ended in a zone
+        np.ndarray
+            2x2 covariance matrix of the error (in feet)
         """
-
-
-
-
-
         pitches_enum = ['FF', 'SL', 'FT', 'CH', 'FC', 'CU']
 
-    
         pitch_encoding = np.zeros(6)
         pitch_type = self.name
         pitch_encoding[pitches_enum.index(pitch_type)] = 1
@@ -109,54 +173,403 @@ class Pitch:
                             np.array([pitch_encoding])
                         ]
                     )
-        
-        mu_x = prediction[0][0][0]
-        mu_y = prediction[1][0][0]
+
+        # mu_x and mu_y (prediction[0] and prediction[1]) are not used,
+        # pitches are aimed at the center of the zone
         var_x = prediction[2][0][0]
         var_y = prediction[3][0][0]
         cov_x_y = prediction[4][0][0]
 
-   
-        cov_matrix = [[var_x, cov_x_y],
-                    [cov_x_y, var_y]]
+        return np.array([[var_x, cov_x_y],
+                         [cov_x_y, var_y]])
+
+    def run_error_simulation_from_pitcher(self, model, pitcher, trials: int = 1000,
+                                          SEED: int = 0, vectorized: bool = True,
+                                          sampling: str = "random",
+                                          pitcher_key: int = 0) -> dict:
+        """Runs a simulation to create an accuracy matrix based on zones and error dist
+
+        Parameters
+        ----------
+        model : keras.Model
+            the error model used to predict the pitcher's covariance matrix
+        pitcher : np.ndarray
+            the pitcher tensor
+        trials : int
+            the number of times we run the simulation for each zone
+        SEED : int
+            the seed of the generators of the zones, see get_zone_rngs
+        vectorized : bool
+            draw all trials of a zone in one call, otherwise draw trial by trial;
+            both modes consume the random streams in the same order
+        sampling : str
+            "random", or "antithetic" or "halton" to draw with run_error_sampling
+        pitcher_key : int
+            a non-negative integer naming the pitcher, see get_zone_rngs
+
+        Returns
+        -------
+        dict
+            a dict[int][act] that has % of time the pitch ended in a zone
         """
-        cov_matrix = [[.3, -.11],
-                    [-.11, .3]]
+        cov_matrix = self.get_cov_matrix(model, pitcher)
+        if sampling != "random":
+            return self.run_error_sampling(cov_matrix, trials, sampling, SEED,
+                                           pitcher_key=pitcher_key)[0]
+        return self.run_error_simulation_from_cov(cov_matrix, trials, SEED, vectorized,
+                                                  pitcher_key)
+
+    def run_error_simulation_from_cov(self, cov_matrix: np.ndarray, trials: int = 1000,
+                                      SEED: int = 0, vectorized: bool = True,
+                                      pitcher_key: int = 0) -> dict:
+        """Simulates a bivariate normal error around the center of every intended zone
+
+        Parameters
+        ----------
+        cov_matrix : np.ndarray
+            2x2 covariance matrix of the error around the center of the intended zone
+        trials : int
+            the number of times we run the simulation for each zone
+        SEED : int
+            the seed of the generators of the zones, see get_zone_rngs
+        vectorized : bool
+            draw all trials of a zone in one call, otherwise draw trial by trial;
+            both modes consume the random streams in the same order
+        pitcher_key : int
+            a non-negative integer naming the pitcher, see get_zone_rngs
+
+        Returns
+        -------
+        dict
+            a dict[int][act] that has % of time the pitch ended in a zone
         """
-        #cov_matrix = [[ 0.40020483, -0.11664944],
-        #                [-0.11664944,  0.52309015]]
-        # setting seed for reproducibility
-        np.random.seed(SEED)
+        int_zones = self.zones.strike_zones + self.zones.ball_zones
+        centers = np.array([zone.get_center() for zone in int_zones])
+        rngs = self.get_zone_rngs(SEED, pitcher_key)
+        root = calc_cov_root(cov_matrix)
+
+        if vectorized:
+            # (zones, trials) errors, the covariance is factored once
+            errors = np.stack([rng.standard_normal((trials, 2)) for rng in rngs]) @ root.T
+            actuals = errors + centers[:, np.newaxis, :]
+            return self.tally_intended_zones(actuals[:, :, 0], actuals[:, :, 1])
 
         acc_matrix = {}
-        for zone in self.zones.strike_zones + self.zones.ball_zones:
-            acc_matrix[zone.name] = {}
-            x_intended, y_intended = zone.get_center()
-            means = [x_intended,y_intended]
-            #print("_____")
-            #print(zone.name)
-            #print(means)
-            #print(cov_matrix)
-            #print(np.mean(np.random.multivariate_normal(means,cov_matrix,10000),axis = 0))
+        for zone, means, rng in zip(int_zones, centers, rngs):
+            actuals = []
             for _ in range(trials):
-                actuals = np.random.multivariate_normal(means,cov_matrix)
-                x_actual = actuals[0]
-                y_actual = actuals[1]
-                #x_actual, y_actual = self.error_dist.gen_actual_loc(x_intended, y_intended)
-                loc = self.zones.return_zone(x_actual, y_actual)
-
-                if loc not in acc_matrix[zone.name].keys():
-                    acc_matrix[zone.name][loc] = 0
-                acc_matrix[zone.name][loc] += 1
-            acc_matrix[zone.name] = {k: v / trials for k,
-                                     v in acc_matrix[zone.name].items()}
+                actuals.append(means + root @ rng.standard_normal(2))
+            actuals = np.array(actuals)
+            acc_matrix[zone.name] = self.tally_zones(actuals[:, 0], actuals[:, 1])
         return acc_matrix
-    
 
+    def run_error_sampling(self, cov_matrix: np.ndarray, trials: int = 1000,
+                           sampling: str = "halton", SEED: int = 0,
+                           mean: (float, float) = (0, 0),
+                           pitcher_key: int = 0) -> (dict, dict):
+        """Simulates a bivariate normal error with the standard error of every cell
+
+        Parameters
+        ----------
+        cov_matrix : np.ndarray
+            2x2 covariance matrix of the error around the center of the intended zone
+        trials : int
+            the number of draws for each zone, see pitches.sampling.get_groups
+        sampling : str
+            "random", "antithetic" or "halton", see pitches.sampling
+        SEED : int
+            the seed of the generators of the zones, see get_zone_rngs
+        mean : (float, float)
+            the mean of the error
+        pitcher_key : int
+            a non-negative integer naming the pitcher, see get_zone_rngs
+
+        Returns
+        -------
+        (dict, dict)
+            a dict[int][act] that has % of time the pitch ended in a zone and a
+            dict[int][act] with the standard error of that %
+        """
+        int_zones = self.zones.strike_zones + self.zones.ball_zones
+        centers = np.array([zone.get_center() for zone in int_zones])
+
+        normals = gen_std_normals(sampling, trials, self.get_zone_rngs(SEED, pitcher_key))
+        actuals = (normals @ calc_cov_root(cov_matrix).T
+                   + (centers + np.asarray(mean))[:, np.newaxis, :])
+        return self.tally_groups(actuals[:, :, 0], actuals[:, :, 1],
+                                 get_groups(sampling, trials))
+
+    def run_error_adaptive(self, cov_matrix: np.ndarray, tolerance: float = 0.01,
+                           sampling: str = "halton", batch: int = 400,
+                           max_trials: int = 10000, SEED: int = 0,
+                           mean: (float, float) = (0, 0),
+                           pitcher_key: int = 0) -> (dict, dict, dict):
+        """Simulates a bivariate normal error until every cell is known to a tolerance
+
+        Every intended zone is drawn in batches, spread over HALTON_REPLICATES
+        independent replicates, until the 95% confidence interval of each of its cells
+        is at most tolerance either side of the estimate, or until max_trials. Zones
+        deep in a region settle after a batch, zones on boundaries draw more
 
+        Parameters
+        ----------
+        cov_matrix : np.ndarray
+            2x2 covariance matrix of the error around the center of the intended zone
+        tolerance : float
+            the half-width of the confidence interval every cell must reach
+        sampling : str
+            "random", "antithetic" or "halton", see pitches.sampling
+        batch : int
+            the draws added to a zone at a time, a multiple of HALTON_REPLICATES (twice
+            that for antithetic)
+        max_trials : int
+            the most draws of a zone, whatever its confidence intervals, the last batch
+            is cut down to stay within it, so zones stop at the largest multiple of
+            HALTON_REPLICATES (twice that for antithetic) not above it
+        SEED : int
+            the seed of the generators of the zones, see get_zone_rngs
+        mean : (float, float)
+            the mean of the error
+        pitcher_key : int
+            a non-negative integer naming the pitcher, see get_zone_rngs
+
+        Returns
+        -------
+        (dict, dict, dict)
+            a dict[int][act] that has % of time the pitch ended in a zone, a
+            dict[int][act] with the standard error of that % and a dict[int] with the
+            number of draws of every intended zone
+        """
+        # the fewest draws that keep every replicate (and antithetic pair) whole
+        step = HALTON_REPLICATES * (2 if sampling == "antithetic" else 1)
+        if batch <= 0 or batch % step != 0:
+            raise ValueError(f"batch must be a positive multiple of {step}, got {batch}")
+        if max_trials < step:
+            raise ValueError(f"max_trials must be at least {step}, got {max_trials}")
+        int_zones = self.zones.strike_zones + self.zones.ball_zones
+        centers = np.array([zone.get_center() for zone in int_zones]) + np.asarray(mean)
+        root = calc_cov_root(cov_matrix)
+        names = self.zones.get_zone_names()
+        sampler = ReplicateSampler(sampling, self.get_zone_rngs(SEED, pitcher_key),
+                                   HALTON_REPLICATES)
+        # counts[zone][replicate][code] = draws of the replicate that landed in code
+        counts = np.zeros((len(int_zones), HALTON_REPLICATES, len(names)))
+        trials = np.zeros(len(int_zones), dtype=int)
+        active = np.arange(len(int_zones))
+        while active.size > 0:
+            # the zones still drawn are in step, trials[active] are all the same
+            size = min(batch, (max_trials - trials[active[0]]) // step * step)
+            per_replicate = size // HALTON_REPLICATES
+            normals = sampler.draw(per_replicate, active)
+            actuals = normals @ root.T + centers[active][:, np.newaxis, np.newaxis, :]
+            codes, _ = self.zones.return_zones(actuals[..., 0], actuals[..., 1])
+
+            rows = np.repeat(np.arange(active.size * HALTON_REPLICATES), per_replicate)
+            counts[active] += np.bincount(
+                codes.ravel() + rows * len(names),
+                minlength=active.size * HALTON_REPLICATES * len(names),
+            ).reshape(active.size, HALTON_REPLICATES, len(names))
+            trials[active] += size
+
+            shares = counts[active] / (trials[active] // HALTON_REPLICATES)[:, None, None]
+            half_widths = (REPLICATE_T_95 * shares.std(axis=1, ddof=1)
+                           / np.sqrt(HALTON_REPLICATES))
+            done = (half_widths.max(axis=1) <= tolerance) | (trials[active] + step > max_trials)
+            active = active[~done]
+
+        shares = counts / (trials // HALTON_REPLICATES)[:, None, None]
+        acc_matrix, std_err = self.gen_acc_dicts(shares, names)
+        return acc_matrix, std_err, {zone.name: int(n) for zone, n in zip(int_zones, trials)}
+
+    def run_error_analytic_from_pitcher(self, model, pitcher) -> dict:
+        """Computes the accuracy matrix exactly, without sampling
+
+        Same error model as run_error_simulation_from_pitcher: the actual location is
+        bivariate normal around the center of the intended zone, with the covariance
+        predicted by the error model
+
+        Parameters
+        ----------
+        model : keras.Model
+            the error model used to predict the pitcher's covariance matrix
+        pitcher : np.ndarray
+            the pitcher tensor
+
+        Returns
+        -------
+        dict
+            a dict[int][act] that has the probability the pitch ends in a zone
+        """
+        return self.calc_acc_matrix(self.get_cov_matrix(model, pitcher))
+
+    def calc_acc_matrix(self, cov_matrix: np.ndarray) -> dict:
+        """Computes the accuracy matrix from the bivariate normal CDF over every zone
+
+        Parameters
+        ----------
+        cov_matrix : np.ndarray
+            2x2 covariance matrix of the error around the center of the intended zone
+
+        Returns
+        -------
+        dict
+            a dict[int][act] that has the probability the pitch ends in a zone
+        """
+        int_zones = self.zones.strike_zones + self.zones.ball_zones
+        centers = np.array([zone.get_center() for zone in int_zones])
+        zone_index = self.zones.get_zone_index()
+        probs = zone_index.calc_zone_probs(centers[:, 0], centers[:, 1], cov_matrix)
+
+        acc_matrix = {}
+        for row, zone in enumerate(int_zones):
+            acc_matrix[zone.name] = {zone_index.names[code]: float(probs[row, code])
+                                     for code in np.flatnonzero(probs[row])}
+        return acc_matrix
+
+    def calc_acc_matrix_fft(self, kernel: np.ndarray, resolution: float = 0.01) -> dict:
+        """Computes the accuracy matrix by convolving the zones with an error kernel
+
+        Parameters
+        ----------
+        kernel : np.ndarray
+            error probabilities on a grid of pixels, see pitches.accuracy_field
+        resolution : float
+            the width of a pixel of the kernel (in feet)
+
+        Returns
+        -------
+        dict
+            a dict[int][act] that has the probability the pitch ends in a zone
+        """
+        int_zones = self.zones.strike_zones + self.zones.ball_zones
+        centers = np.array([zone.get_center() for zone in int_zones])
+        field = AccuracyField.from_kernel(
+            self.zones.get_zone_index(), kernel, resolution,
+            (centers[:, 0].min(), centers[:, 0].max()),
+            (centers[:, 1].min(), centers[:, 1].max()))
+        probs = field.get_zone_probs(centers[:, 0], centers[:, 1])
+
+        acc_matrix = {}
+        for row, zone in enumerate(int_zones):
+            acc_matrix[zone.name] = {field.names[code]: float(probs[row, code])
+                                     for code in np.flatnonzero(probs[row])}
+        return acc_matrix
+
+    def tally_intended_zones(self, x_actuals: np.ndarray, y_actuals: np.ndarray) -> dict:
+        """Classifies the actual locations of every intended zone and builds the acc matrix
+
+        Parameters
+        ----------
+        x_actuals : np.ndarray
+            (zones, trials) x coordinates, rows follow strike_zones + ball_zones
+        y_actuals : np.ndarray
+            (zones, trials) y coordinates, rows follow strike_zones + ball_zones
+
+        Returns
+        -------
+        dict
+            a dict[int][act] that has % of time the pitch ended in a zone
+        """
+        codes, names = self.zones.return_zones(x_actuals, y_actuals)
+        n_zones, trials = codes.shape
+
+        # offsetting each row's codes so one bincount fills the whole matrix
+        offsets = np.arange(n_zones)[:, np.newaxis] * len(names)
+        counts = np.bincount((codes + offsets).ravel(),
+                             minlength=n_zones * len(names)).reshape(n_zones, len(names))
+
+        acc_matrix = {}
+        for row, zone in enumerate(self.zones.strike_zones + self.zones.ball_zones):
+            acc_matrix[zone.name] = {names[code]: float(counts[row, code] / trials)
+                                     for code in np.flatnonzero(counts[row])}
+        return acc_matrix
+
+    def tally_groups(self, x_actuals: np.ndarray, y_actuals: np.ndarray,
+                     groups: int) -> (dict, dict):
+        """Builds the acc matrix and its standard errors from independent groups of draws
+
+        Every group of trials / groups consecutive draws of a zone gives its own
+        estimate of each cell; the estimate is their mean and its standard error their
+        standard deviation over sqrt(groups)
+
+        Parameters
+        ----------
+        x_actuals : np.ndarray
+            (zones, trials) x coordinates, rows follow strike_zones + ball_zones
+        y_actuals : np.ndarray
+            (zones, trials) y coordinates, rows follow strike_zones + ball_zones
+        groups : int
+            the number of independent groups the trials of a zone split into
+
+        Returns
+        -------
+        (dict, dict)
+            a dict[int][act] that has % of time the pitch ended in a zone and a
+            dict[int][act] with the standard error of that %
+        """
+        codes, names = self.zones.return_zones(x_actuals, y_actuals)
+        n_zones, trials = codes.shape
+
+        # one bincount over every (zone, group) row, as in tally_intended_zones
+        rows = np.repeat(np.arange(n_zones * groups), trials // groups)
+        counts = np.bincount((codes.ravel() + rows * len(names)),
+                             minlength=n_zones * groups * len(names))
+        return self.gen_acc_dicts(
+            counts.reshape(n_zones, groups, len(names)) / (trials // groups), names)
+
+    def gen_acc_dicts(self, shares: np.ndarray, names: List[str]) -> (dict, dict):
+        """Averages the shares of independent groups into the acc matrix and standard errors
+
+        Parameters
+        ----------
+        shares : np.ndarray
+            (zones, groups, codes) share of the draws of a group in every zone, rows
+            follow strike_zones + ball_zones
+        names : List[str]
+            the code to name table
+
+        Returns
+        -------
+        (dict, dict)
+            a dict[int][act] that has % of time the pitch ended in a zone and a
+            dict[int][act] with the standard error of that %
+        """
+        means = shares.mean(axis=1)
+        std_errs = shares.std(axis=1, ddof=1) / np.sqrt(shares.shape[1])
+
+        acc_matrix, std_err = {}, {}
+        for row, zone in enumerate(self.zones.strike_zones + self.zones.ball_zones):
+            acc_matrix[zone.name] = {names[code]: float(means[row, code])
+                                     for code in np.flatnonzero(means[row])}
+            std_err[zone.name] = {names[code]: float(std_errs[row, code])
+                                  for code in np.flatnonzero(means[row])}
+        return acc_matrix, std_err
+
+    def tally_zones(self, x_actuals: np.ndarray, y_actuals: np.ndarray) -> dict:
+        """Classifies actual pitch locations in bulk and returns the share per zone
+
+        Parameters
+        ----------
+        x_actuals : np.ndarray
+            x coordinates of the actual locations
+        y_actuals : np.ndarray
+            y coordinates of the actual locations
+
+        Returns
+        -------
+        dict
+            a dict[act_zone] with the % of locations that ended in act_zone
+        """
+        codes, names = self.zones.return_zones(x_actuals, y_actuals)
+        counts = np.bincount(codes, minlength=len(names))
+        return {names[code]: float(counts[code] / len(codes))
+                for code in np.flatnonzero(counts)}
 
     def display_zones(self) -> None:
         """Displays an image and name for each Zone in the Zones object"""
+        # imported here, matplotlib is slow to import and only needed for plots
+        import matplotlib.pyplot as plt
+
         _, axis = plt.subplots(figsize=(8, 10))
         plt.title(f"{self.name} Zones from Umpire Perspective")
 
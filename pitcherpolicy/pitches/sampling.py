@@ -0,0 +1,324 @@
+"""Sampling Module
+
+Standard normal 2-D error draws for the accuracy simulations and the groups their
+standard errors are estimated from.
+
+- "random": independent pseudo-random draws, every draw is its own group.
+- "antithetic": every draw z comes with -z. The mean of a pair varies less than the
+  mean of two independent draws where the integrand is monotone along z, but a zone
+  indicator around the aim point is close to symmetric, so for the intended zone
+  itself the pairs gain little. Every pair is a group.
+- "halton": randomized quasi-Monte Carlo. The 2-D Halton sequence (bases 2 and 3)
+  covers the unit square far more evenly than random points, and its error shrinks
+  close to O(1/n) instead of O(1/sqrt(n)) for the smooth parts of the integrand. A
+  deterministic point set has no variance to estimate, so the trials are split into
+  replicates, each the same points under its own random shift modulo 1
+  (Cranley-Patterson rotation); every replicate is an unbiased estimate and a group.
+
+ReplicateSampler keeps the draws of every zone in a fixed number of independent
+replicate streams that can be extended a batch at a time, so a simulation can stop a
+zone as soon as the spread of its replicates is small enough.
+
+Uniform points become normal pairs by the Box-Muller transform, which maps the unit
+square onto the plane in one step, so the even coverage of the Halton points carries
+over to the normal draws.
+
+Every intended zone draws from its own np.random.Generator, spawned from a
+SeedSequence of (seed, pitcher key, pitch) (gen_zone_rngs), so no two zones, pitches or
+pitchers share a stream, and a result does not depend on what else ran before it or
+on which thread it ran.
+"""
+import hashlib
+from typing import List
+
+import numpy as np
+
+SAMPLING_METHODS = ("random", "antithetic", "halton")
+
+# the number of randomly shifted copies of the Halton points, the degrees of freedom
+# of the standard error of a halton estimate
+HALTON_REPLICATES = 8
+
+# two-sided 95% quantile of Student's t with HALTON_REPLICATES - 1 degrees of freedom,
+# the half-width of a confidence interval from replicates in standard errors
+REPLICATE_T_95 = 2.365
+
+
+def get_name_key(name: str) -> int:
+    """Returns a stable 64 bit integer for a name, a SeedSequence spawn key entry
+
+    Parameters
+    ----------
+    name : str
+        a pitch name
+
+    Returns
+    -------
+    int
+        the first 8 bytes of the sha256 digest of the name
+    """
+    return int.from_bytes(hashlib.sha256(name.encode()).digest()[:8], "little")
+
+
+def gen_zone_rngs(seed: int, pitcher_key: int, pitch_name: str,
+                  n_zones: int) -> List[np.random.Generator]:
+    """Returns an independent generator for every intended zone of a pitch
+
+    Parameters
+    ----------
+    seed : int
+        the seed of the simulation
+    pitcher_key : int
+        a non-negative integer naming the pitcher, 0 for a simulation without one
+    pitch_name : str
+        the name of the pitch
+    n_zones : int
+        the number of intended zones
+
+    Returns
+    -------
+    List[np.random.Generator]
+        generators of the children of SeedSequence(seed, (pitcher_key, pitch)), in
+        zone order
+    """
+    seed_seq = np.random.SeedSequence(seed,
+                                      spawn_key=(pitcher_key, get_name_key(pitch_name)))
+    return [np.random.default_rng(child) for child in seed_seq.spawn(n_zones)]
+
+
+def radical_inverse(indices: np.ndarray, base: int) -> np.ndarray:
+    """Mirrors the base-b digits of every index around the radix point
+
+    Parameters
+    ----------
+    indices : np.ndarray
+        non-negative integers
+    base : int
+        the base, a prime
+
+    Returns
+    -------
+    np.ndarray
+        the van der Corput points of the indices, in [0, 1)
+    """
+    indices = np.array(indices, dtype=np.int64)
+    points = np.zeros(indices.shape)
+    scale = 1.0 / base
+    while indices.any():
+        indices, digits = np.divmod(indices, base)
+        points += digits * scale
+        scale /= base
+    return points
+
+
+def gen_halton(n: int, start: int = 1) -> np.ndarray:
+    """Returns the 2-D Halton points with bases 2 and 3
+
+    Parameters
+    ----------
+    n : int
+        the number of points
+    start : int
+        the index of the first point, the point of index 0 is the origin
+
+    Returns
+    -------
+    np.ndarray
+        (n, 2) points in the unit square
+    """
+    indices = np.arange(start, start + n)
+    return np.column_stack([radical_inverse(indices, 2), radical_inverse(indices, 3)])
+
+
+def box_muller(uniforms: np.ndarray) -> np.ndarray:
+    """Maps points of the unit square to independent standard normal pairs
+
+    Parameters
+    ----------
+    uniforms : np.ndarray
+        (..., 2) points in [0, 1)
+
+    Returns
+    -------
+    np.ndarray
+        (..., 2) standard normal pairs
+    """
+    # 1 - u is in (0, 1], so the log is finite
+    radius = np.sqrt(-2 * np.log1p(-uniforms[..., 0]))
+    angle = 2 * np.pi * uniforms[..., 1]
+    return np.stack([radius * np.cos(angle), radius * np.sin(angle)], axis=-1)
+
+
+def calc_cov_root(cov_matrix: np.ndarray) -> np.ndarray:
+    """Returns a matrix root with root @ root.T == cov_matrix
+
+    Parameters
+    ----------
+    cov_matrix : np.ndarray
+        2x2 covariance matrix, singular or with tiny negative eigenvalues from a
+        model prediction is fine
+
+    Returns
+    -------
+    np.ndarray
+        2x2 root, standard normal draws @ root.T have covariance cov_matrix
+    """
+    eig_vals, eig_vecs = np.linalg.eigh(np.asarray(cov_matrix, dtype=float))
+    return eig_vecs * np.sqrt(np.clip(eig_vals, 0, None))
+
+
+def get_groups(sampling: str, trials: int) -> int:
+    """Returns the number of independent groups the trials of a method fall into
+
+    Parameters
+    ----------
+    sampling : str
+        "random", "antithetic" or "halton"
+    trials : int
+        the number of draws for every intended zone
+
+    Returns
+    -------
+    int
+        the number of groups, every group is trials / groups consecutive draws
+    """
+    if sampling not in SAMPLING_METHODS:
+        raise ValueError(f"unknown sampling method: {sampling}")
+    groups = {"random": trials, "antithetic": trials // 2,
+              "halton": HALTON_REPLICATES}[sampling]
+    if groups < 2 or trials % groups != 0:
+        raise ValueError(
+            f"{sampling} sampling needs a multiple of {trials // max(groups, 1)} trials "
+            f"in at least two groups, got {trials}"
+        )
+    return groups
+
+
+def gen_std_normals(sampling: str, trials: int,
+                    rngs: List[np.random.Generator]) -> np.ndarray:
+    """Returns standard normal 2-D draws for every intended zone
+
+    Parameters
+    ----------
+    sampling : str
+        "random", "antithetic" or "halton"
+    trials : int
+        the number of draws for every intended zone, see get_groups
+    rngs : List[np.random.Generator]
+        the source of the random draws and shifts of every zone, see gen_zone_rngs
+
+    Returns
+    -------
+    np.ndarray
+        (len(rngs), trials, 2) draws, the trials of a group consecutive
+    """
+    groups = get_groups(sampling, trials)
+    if sampling == "random":
+        return np.stack([rng.standard_normal((trials, 2)) for rng in rngs])
+
+    if sampling == "antithetic":
+        draws = np.stack([rng.standard_normal((groups, 1, 2)) for rng in rngs])
+        return np.concatenate([draws, -draws], axis=2).reshape(len(rngs), trials, 2)
+
+    # every zone gets its own shifts of the same points
+    points = gen_halton(trials // groups)
+    shifts = np.stack([rng.random((groups, 1, 2)) for rng in rngs])
+    uniforms = (points + shifts) % 1.0
+    return box_muller(uniforms).reshape(len(rngs), trials, 2)
+
+
+class ReplicateSampler:
+    """Class used to represent independent streams of draws that grow in batches
+
+    Every zone has the same number of replicates, each an independent estimate however
+    many draws it holds: "random" replicates are independent draws, "antithetic" ones
+    independent pairs and "halton" ones the Halton sequence under a random shift fixed
+    per zone and replicate, continued where the last batch stopped.
+
+    Attributes
+    ----------
+    sampling : str
+        "random", "antithetic" or "halton"
+    rngs : List[np.random.Generator]
+        the source of the random draws and shifts of every zone
+    replicates : int
+        the number of streams of every zone
+    shifts : np.ndarray
+        (zones, replicates, 1, 2) halton shifts, None for the other methods
+    drawn : int
+        the number of draws of every replicate of the zones still drawn
+
+    Methods
+    -------
+    draw(n, zones)
+        returns the next n draws of every replicate of some zones
+    """
+
+    def __init__(self, sampling: str, rngs: List[np.random.Generator],
+                 replicates: int = HALTON_REPLICATES) -> None:
+        """Instantiates ReplicateSampler object
+
+        Parameters
+        ----------
+        sampling : str
+            "random", "antithetic" or "halton"
+        rngs : List[np.random.Generator]
+            the source of the random draws and shifts of every zone, see gen_zone_rngs
+        replicates : int
+            the number of streams of every zone, at least 2
+        """
+        if sampling not in SAMPLING_METHODS:
+            raise ValueError(f"unknown sampling method: {sampling}")
+        if replicates < 2:
+            raise ValueError(f"at least 2 replicates are needed, got {replicates}")
+        self.sampling = sampling
+        self.rngs = rngs
+        self.replicates = replicates
+        self.shifts = None
+        if sampling == "halton":
+            self.shifts = np.stack([rng.random((replicates, 1, 2)) for rng in rngs])
+        self.drawn = 0
+
+    def draw(self, n: int, zones: np.ndarray) -> np.ndarray:
+        """Returns the next draws of every replicate of some zones
+
+        Zones left out of a batch are done, the streams of the zones drawn stay in step
+
+        Parameters
+        ----------
+        n : int
+            the number of draws added to every replicate, even for antithetic
+        zones : np.ndarray
+            indices of the zones to draw for
+
+        Returns
+        -------
+        np.ndarray
+            (len(zones), replicates, n, 2) standard normal draws
+        """
+        if self.sampling == "random":
+            draws = np.stack([self.rngs[zone].standard_normal((self.replicates, n, 2))
+                              for zone in zones])
+        elif self.sampling == "antithetic":
+            if n % 2 != 0:
+                raise ValueError(f"antithetic sampling needs an even batch, got {n}")
+            shape = (self.replicates, n // 2, 1, 2)
+            draws = np.stack([self.rngs[zone].standard_normal(shape) for zone in zones])
+            draws = np.concatenate([draws, -draws], axis=3).reshape(
+                len(zones), self.replicates, n, 2)
+        else:
+            points = gen_halton(n, start=1 + self.drawn)
+            draws = box_muller((points + self.shifts[zones]) % 1.0)
+        self.drawn += n
+        return draws
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"ReplicateSampler({repr(self.sampling)}, {self.rngs}, {self.replicates})"
+
+    def __str__(self):
+        """Prints the method and the draws so far"""
+        return (
+            f"ReplicateSampler: {self.sampling}, {len(self.rngs)} zones, "
+            f"{self.replicates} replicates of {self.drawn} draws"
+        )
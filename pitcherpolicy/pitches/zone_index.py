@@ -0,0 +1,212 @@
+"""ZoneIndex Module"""
+from typing import List
+
+import numpy as np
+
+from pitches.bivariate_normal import bvn_cdf
+
+
+class ZoneIndex:
+    """Class used to represent a compiled lookup table over the geometry of a Zones object
+
+    Every zone is an axis-aligned rectangle (or an unbounded obvious zone) so the sorted
+    x and y edges of all zones split the plane into a grid. Each axis is divided into
+    slots: the open intervals between edges and the edges themselves (zones have closed
+    boundaries, obvious zones open ones, so points on an edge can belong to a different
+    zone than points next to it). table[x_slot][y_slot] holds the zone code of the slot.
+
+    Attributes
+    ----------
+    x_edges : np.ndarray
+        sorted unique x edges of all zones
+    y_edges : np.ndarray
+        sorted unique y edges of all zones
+    table: np.ndarray
+        (2 * len(x_edges) + 1, 2 * len(y_edges) + 1) array of zone codes
+    names: List[str]
+        the code to name table, names[code] is the name of the zone
+    error_code: int
+        code of the error zone (-1), returned for points that are nan
+
+    Methods
+    -------
+    from_zones(zones)
+        compiles the index of a Zones object
+    lookup(x_coords, y_coords)
+        returns the zone code of every (x_coords[i], y_coords[i])
+    get_slot_points(edges)
+        returns a point inside every slot of an axis
+    calc_zone_probs(x_means, y_means, cov_matrix)
+        returns the probability of landing in each zone for bivariate normal locations
+    """
+
+    def __init__(self, x_edges: np.ndarray, y_edges: np.ndarray,
+                 table: np.ndarray, names: List[str], error_code: int) -> None:
+        """Instantiates ZoneIndex object
+
+        Parameters
+        ----------
+        x_edges : np.ndarray
+            sorted unique x edges of all zones
+        y_edges : np.ndarray
+            sorted unique y edges of all zones
+        table: np.ndarray
+            (2 * len(x_edges) + 1, 2 * len(y_edges) + 1) array of zone codes
+        names: List[str]
+            the code to name table
+        error_code: int
+            code of the error zone (-1)
+        """
+        self.x_edges = x_edges
+        self.y_edges = y_edges
+        self.table = table
+        self.names = names
+        self.error_code = error_code
+
+        # edge, next float after edge, ... so one searchsorted gives the slot:
+        # below e[0] -> 0, on e[0] -> 1, between e[0] and e[1] -> 2, on e[1] -> 3, ...
+        self.x_breaks = np.ravel(np.column_stack([x_edges, np.nextafter(x_edges, np.inf)]))
+        self.y_breaks = np.ravel(np.column_stack([y_edges, np.nextafter(y_edges, np.inf)]))
+
+    @classmethod
+    def from_zones(cls, zones) -> "ZoneIndex":
+        """Compiles the lookup table of a Zones object
+
+        Every slot of the grid is classified once with Zones.return_zone, so the index
+        follows exactly the same rules as the scalar lookup
+
+        Parameters
+        ----------
+        zones : Zones
+            the zones to compile
+
+        Returns
+        -------
+        ZoneIndex
+            the compiled index
+        """
+        obv = zones.obvious_zones
+        x_edges = [obv.left_x, obv.right_x]
+        y_edges = [obv.bot_y, obv.top_y]
+        for zone in zones.strike_zones + zones.ball_zones:
+            # the same sums Zone.in_zone compares against
+            x_edges += [zone.coords[0], zone.coords[0] + zone.width]
+            y_edges += [zone.coords[1], zone.coords[1] + zone.height]
+        x_edges = np.unique(np.array(x_edges, dtype=float))
+        y_edges = np.unique(np.array(y_edges, dtype=float))
+
+        names = zones.get_zone_names()
+        codes = {name: code for code, name in enumerate(names)}
+        x_points = cls.get_slot_points(x_edges)
+        y_points = cls.get_slot_points(y_edges)
+        table = np.array([[codes[zones.return_zone(x, y)] for y in y_points]
+                          for x in x_points])
+
+        error_code = codes[obv.return_zone(np.nan, np.nan)]
+        return cls(x_edges, y_edges, table, names, error_code)
+
+    @staticmethod
+    def get_slot_points(edges: np.ndarray) -> np.ndarray:
+        """Returns one point in every slot of an axis
+
+        Parameters
+        ----------
+        edges : np.ndarray
+            sorted unique edges of the axis
+
+        Returns
+        -------
+        np.ndarray
+            2 * len(edges) + 1 points, alternating between an interval and an edge
+        """
+        mids = (edges[:-1] + edges[1:]) / 2
+        intervals = np.concatenate([[edges[0] - 1], mids, [edges[-1] + 1]])
+        points = np.empty(2 * len(edges) + 1)
+        points[0::2] = intervals
+        points[1::2] = edges
+        return points
+
+    def lookup(self, x_coords: np.ndarray, y_coords: np.ndarray) -> np.ndarray:
+        """Returns the zone code of every (x_coords[i], y_coords[i])
+
+        Parameters
+        ----------
+        x_coords : np.ndarray
+            array of x coordinates
+        y_coords: np.ndarray
+            array of y coordinates
+
+        Returns
+        -------
+        np.ndarray
+            integer zone code of every point, names[code] is the zone name
+        """
+        x_coords = np.asarray(x_coords, dtype=float)
+        y_coords = np.asarray(y_coords, dtype=float)
+        codes = self.table[np.searchsorted(self.x_breaks, x_coords, side="right"),
+                           np.searchsorted(self.y_breaks, y_coords, side="right")]
+        nans = np.isnan(x_coords) | np.isnan(y_coords)
+        if nans.any():
+            codes[nans] = self.error_code
+        return codes
+
+    def calc_zone_probs(self, x_means: np.ndarray, y_means: np.ndarray,
+                        cov_matrix: np.ndarray) -> np.ndarray:
+        """Probability of landing in each zone when the location is bivariate normal
+
+        Every cell of the grid (an open interval on each axis, the outer cells are
+        unbounded) lies in exactly one zone, so the probability of a zone is the sum of
+        the rectangle probabilities of its cells. Edges have no area and are ignored, and
+        so is the error zone.
+
+        Parameters
+        ----------
+        x_means : np.ndarray
+            x coordinates of the mean (intended) locations
+        y_means : np.ndarray
+            y coordinates of the mean (intended) locations
+        cov_matrix : np.ndarray
+            2x2 covariance matrix of the actual location around the mean
+
+        Returns
+        -------
+        np.ndarray
+            (len(x_means), len(names)) array, [i][code] = P(location i lands in code)
+        """
+        x_means = np.asarray(x_means, dtype=float)[:, np.newaxis]
+        y_means = np.asarray(y_means, dtype=float)[:, np.newaxis]
+        sigma_x = np.sqrt(cov_matrix[0][0])
+        sigma_y = np.sqrt(cov_matrix[1][1])
+        rho = float(np.clip(cov_matrix[0][1] / (sigma_x * sigma_y), -1, 1))
+
+        # standardized cell bounds, (means, x bounds) and (means, y bounds)
+        h = (np.concatenate([[-np.inf], self.x_edges, [np.inf]]) - x_means) / sigma_x
+        k = (np.concatenate([[-np.inf], self.y_edges, [np.inf]]) - y_means) / sigma_y
+
+        # CDF at every corner, then inclusion-exclusion for every cell
+        cdf = bvn_cdf(h[:, :, np.newaxis], k[:, np.newaxis, :], rho)
+        cell_probs = cdf[:, 1:, 1:] - cdf[:, :-1, 1:] - cdf[:, 1:, :-1] + cdf[:, :-1, :-1]
+        cell_probs = np.clip(cell_probs, 0, 1)
+
+        # the error zone (-1) is only cutoff lines and float rounding slivers between
+        # zones, it has no area in the error model
+        cell_codes = self.table[0::2, 0::2]
+        cell_probs[:, cell_codes == self.error_code] = 0
+
+        cell_codes = cell_codes.ravel()
+        zone_probs = np.zeros((x_means.shape[0], len(self.names)))
+        for code in np.unique(cell_codes):
+            zone_probs[:, code] = cell_probs.reshape(x_means.shape[0], -1)[
+                :, cell_codes == code].sum(axis=1)
+        return zone_probs
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return (
+            f"ZoneIndex({self.x_edges}, {self.y_edges}, {self.table}, {self.names},"
+            f"{self.error_code})"
+        )
+
+    def __str__(self):
+        """Prints the edges of the index"""
+        return f"x edges: {self.x_edges}, y edges: {self.y_edges}"
@@ -1,8 +1,11 @@
 """Zones Module"""
 from typing import List
 
+import numpy as np
+
 from pitches.obvious_zones import ObviousZones
 from pitches.zone import Zone
+from pitches.zone_index import ZoneIndex
 
 
 class Zones:
@@ -16,6 +19,8 @@ class Zones:
         the list of zones that dfine ball zones
     obvious_zones: ObviousZones
         the object used to define all obvious zones
+    zone_index: ZoneIndex
+        the compiled lookup table of the zones, built on first use
 
     Methods
     -------
@@ -27,6 +32,12 @@ class Zones:
         returns true if (x_coord, y_coord) are in an obvious zone
     return_zone(x_coord, y_coord)
         returns the name of the zone the coords are in
+    get_zone_names()
+        returns the zone names in the order used by return_zones codes
+    get_zone_index()
+        returns the compiled lookup table of the zones
+    return_zones(x_coords, y_coords)
+        returns an array of zone codes for many points and the code to name table
     """
 
     def __init__(self, strike_zones: List[Zone],
@@ -46,6 +57,7 @@ class Zones:
         self.strike_zones = strike_zones
         self.ball_zones = ball_zones
         self.obvious_zones = obvious_zones
+        self.zone_index = None
 
     def in_strike_zone(self, x_coord: float, y_coord: float) -> bool:
         """Checks if (x_coord, y_coord) are in a strike zone
@@ -134,6 +146,53 @@ class Zones:
 
         return self.obvious_zones.return_zone(x_coord, y_coord)
 
+    def get_zone_names(self) -> List[str]:
+        """Returns every zone name, the index of a name is its zone code
+
+        Returns
+        -------
+        List[str]
+            strike zone names, ball zone names, then the obvious zone names
+            (the last name is the error zone, -1)
+        """
+        return ([zone.name for zone in self.strike_zones + self.ball_zones]
+                + self.obvious_zones.get_zone_names())
+
+    def get_zone_index(self) -> ZoneIndex:
+        """Returns the compiled lookup table of the zones, compiling it on first use
+
+        Returns
+        -------
+        ZoneIndex
+            sorted edge index mapping (x slot, y slot) to a zone code
+        """
+        if self.zone_index is None:
+            self.zone_index = ZoneIndex.from_zones(self)
+        return self.zone_index
+
+    def return_zones(self, x_coords: np.ndarray,
+                     y_coords: np.ndarray) -> (np.ndarray, List[str]):
+        """Finds the zone that contains each (x_coords[i], y_coords[i]) at once
+
+        Uses exactly the same rules as return_zone: strike zones are checked first,
+        then ball zones (both in list order), then the obvious zones. The lookup is
+        done on the compiled ZoneIndex, two searchsorted calls instead of a scan
+
+        Parameters
+        ----------
+        x_coords : np.ndarray
+            array of x coordinates
+        y_coords: np.ndarray
+            array of y coordinates
+
+        Returns
+        -------
+        (np.ndarray, List[str])
+            integer zone code for each point and the code to name table,
+            names[codes[i]] == return_zone(x_coords[i], y_coords[i])
+        """
+        return self.get_zone_index().lookup(x_coords, y_coords), self.get_zone_names()
+
     def __repr__(self):
         """Displays the inputs used to instantiate the object"""
         return (
@@ -0,0 +1,279 @@
+"""Player Cache Module
+
+The accuracy matrix depends only on the pitcher and the swing probabilities behind the
+take matrix only on the batter, so a sweep of N pitchers and M batters needs N + M of
+those model calls, not N * M. PlayerCache keeps them in memory by a digest of the player
+tensor and, given a directory, on disk as json. Swing probabilities are kept raw, so a
+different p_take_threshold is a threshold away, not a new prediction.
+"""
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from pathlib import Path
+from typing import Dict
+
+import numpy as np
+
+from pitch_zone_config import calc_take_mat, gen_acc_mat, gen_swing_probs
+from pitches.pitch import Pitch
+from tensor_store import tensor_digest
+
+PLAYER_CACHE_DIR = Path(__file__).parent / ".player_cache"
+
+# bumped when an entry for the same player, models and pitches changes, 2: accuracy
+# simulations draw from per-zone generators instead of the global random state
+PLAYER_CACHE_VERSION = 2
+
+
+def model_digest(model) -> str:
+    """Returns the sha256 hex digest of the weights of a keras model
+
+    Parameters
+    ----------
+    model : keras.Model
+        the model to hash
+
+    Returns
+    -------
+    str
+        sha256 hex digest of every weight array
+    """
+    digest = hashlib.sha256()
+    for weights in model.get_weights():
+        weights = np.ascontiguousarray(weights)
+        digest.update(str((weights.shape, weights.dtype.str)).encode())
+        digest.update(weights.tobytes())
+    return digest.hexdigest()
+
+
+class PlayerCache:
+    """Class used to represent the per-player model outputs of a set of models
+
+    Entries are keyed by a digest of the player tensor. On disk the key also holds the
+    class and a digest of the weights of the model and a digest of the pitches, so files
+    written with other models, another backend or another zone config are never read. Lookups are thread-safe, and threads missing
+    the same key wait for the one computing it instead of running the model again.
+
+    Attributes
+    ----------
+    models : dict
+        the "take" and "error" keras models (others are ignored)
+    pitches : Dict[str, Pitch]
+        the pitches a pitcher may throw
+    cache_dir : Path
+        the directory of the json entries, None to keep entries in memory only
+    entries : dict
+        entries[key] = accuracy matrix or swing probabilities
+    take_table : TakeTable
+        league-wide swing probabilities read instead of running the take model, None
+        to always run it
+    hits : int
+        the number of lookups answered from memory, disk or the take table
+    misses : int
+        the number of lookups that ran a model
+    lock : threading.Lock
+        guards entries, the counters and key_locks
+    key_locks : dict
+        key_locks[key] = lock held while the entry of key is read from disk or computed
+
+    Methods
+    -------
+    get_acc_mat(pitcher, method)
+        returns the accuracy matrix of a pitcher
+    get_swing_probs(batter, batter_id)
+        returns the swing probabilities of a batter
+    get_take_mat(batter, p_take_threshold, batter_id)
+        returns the take matrix of a batter
+    """
+
+    def __init__(self, models: dict, pitches: Dict[str, Pitch], cache_dir=None,
+                 take_table=None) -> None:
+        """Instantiates PlayerCache object
+
+        Parameters
+        ----------
+        models : dict
+            the "take" and "error" keras models
+        pitches : Dict[str, Pitch]
+            the pitches a pitcher may throw
+        cache_dir : str or Path
+            the directory of the json entries, created if missing, None for memory only
+        take_table : TakeTable
+            league-wide swing probabilities, see take_table.load_take_table
+        """
+        self.models = models
+        self.pitches = pitches
+        self.cache_dir = None if cache_dir is None else Path(cache_dir)
+        self.take_table = take_table
+        self.entries = {}
+        self.hits = 0
+        self.misses = 0
+        self.lock = threading.Lock()
+        self.key_locks = {}
+
+        # digests of the models and pitches, only needed for disk entries
+        self.disk_digests = {}
+        if self.cache_dir is not None:
+            self.cache_dir.mkdir(parents=True, exist_ok=True)
+
+    def get_disk_path(self, kind: str, key: str) -> Path:
+        """Returns the file of an entry, named by the key and the digests of its inputs
+
+        Parameters
+        ----------
+        kind : str
+            "acc" or "swing"
+        key : str
+            the in-memory key of the entry
+
+        Returns
+        -------
+        Path
+            the json file of the entry
+        """
+        model_name = "error" if kind == "acc" else "take"
+        if model_name not in self.disk_digests:
+            # the keras, numpy and split backends agree to float32 rounding, not bit for
+            # bit, so as in the keys of a SolutionCache each keeps its own entries
+            model = self.models[model_name]
+            self.disk_digests[model_name] = f"{type(model).__name__}:{model_digest(model)}"
+        if "pitches" not in self.disk_digests:
+            self.disk_digests["pitches"] = hashlib.sha256(
+                repr(self.pitches).encode()).hexdigest()
+
+        digest = hashlib.sha256(
+            f"{PLAYER_CACHE_VERSION}:{key}:{self.disk_digests[model_name]}:"
+            f"{self.disk_digests['pitches']}".encode()
+        )
+        return self.cache_dir / f"{kind}_{digest.hexdigest()}.json"
+
+    def lookup(self, kind: str, key: str, compute):
+        """Returns an entry from memory, then disk, computing and storing it on a miss
+
+        Parameters
+        ----------
+        kind : str
+            "acc" or "swing"
+        key : str
+            the in-memory key of the entry
+        compute : Callable[[], dict]
+            runs the model for the entry
+
+        Returns
+        -------
+        dict
+            the entry
+        """
+        with self.lock:
+            if key in self.entries:
+                self.hits += 1
+                return self.entries[key]
+            key_lock = self.key_locks.setdefault(key, threading.Lock())
+
+        with key_lock:
+            # another thread may have stored the entry while this one waited
+            with self.lock:
+                if key in self.entries:
+                    self.hits += 1
+                    return self.entries[key]
+
+            path = None if self.cache_dir is None else self.get_disk_path(kind, key)
+            if path is not None and path.exists():
+                with open(path) as f:
+                    entry = json.load(f)
+                with self.lock:
+                    self.entries[key] = entry
+                    self.hits += 1
+                return entry
+
+            entry = compute()
+            if path is not None:
+                # write then rename, so a crash never leaves a truncated entry, the tmp
+                # file is unique to this call so processes and threads never share one
+                fd, tmp_path = tempfile.mkstemp(suffix=".tmp", dir=self.cache_dir)
+                with os.fdopen(fd, "w") as f:
+                    json.dump(entry, f)
+                os.replace(tmp_path, path)
+            with self.lock:
+                self.entries[key] = entry
+                self.misses += 1
+            return entry
+
+    def get_acc_mat(self, pitcher: np.ndarray, method: str = "simulation") -> dict:
+        """Returns the accuracy matrix of a pitcher, see gen_acc_mat
+
+        Parameters
+        ----------
+        pitcher : np.ndarray
+            the pitcher tensor
+        method : str
+            the accuracy matrix method, see gen_acc_mat
+
+        Returns
+        -------
+        dict
+            acc_mat[pitch][int_zone][act_zone] = %in_act_zone
+        """
+        return self.lookup(
+            "acc", f"acc:{method}:{tensor_digest(pitcher)}",
+            lambda: gen_acc_mat(self.models["error"], pitcher, self.pitches, method)
+        )
+
+    def get_swing_probs(self, batter: np.ndarray, batter_id: int = None) -> dict:
+        """Returns the swing probabilities of a batter, see gen_swing_probs
+
+        Parameters
+        ----------
+        batter : np.ndarray
+            the batter tensor
+        batter_id : int
+            the batter id, the row of the take table to read if there is one
+
+        Returns
+        -------
+        dict
+            swing_probs[pitch_type][zone][count] = probability the batter swings
+        """
+        key = f"swing:{tensor_digest(batter)}"
+        if key not in self.entries and self.take_table is not None and batter_id is not None:
+            swing_probs = self.take_table.get_swing_probs(batter_id, batter)
+            if swing_probs is not None:
+                with self.lock:
+                    self.entries.setdefault(key, swing_probs)
+        return self.lookup(
+            "swing", key, lambda: gen_swing_probs(self.models["take"], batter, self.pitches)
+        )
+
+    def get_take_mat(self, batter: np.ndarray, p_take_threshold: float = .2,
+                     batter_id: int = None) -> dict:
+        """Returns the take matrix of a batter, see gen_take_mat
+
+        Parameters
+        ----------
+        batter : np.ndarray
+            the batter tensor
+        p_take_threshold : float
+            swing probability under which a ball zone is a take zone
+        batter_id : int
+            the batter id, the row of the take table to read if there is one
+
+        Returns
+        -------
+        dict
+            take_mat[pitch_type][zone][count] = True if the zone is a take zone
+        """
+        return calc_take_mat(self.get_swing_probs(batter, batter_id), p_take_threshold)
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        cache_dir = None if self.cache_dir is None else str(self.cache_dir)
+        return f"PlayerCache({list(self.models)}, {self.pitches}, {repr(cache_dir)})"
+
+    def __str__(self):
+        """Prints the cache counters"""
+        return (
+            f"PlayerCache: {len(self.entries)} entries, {self.hits} hits, "
+            f"{self.misses} misses"
+        )
@@ -0,0 +1,264 @@
+"""Solution Cache Module
+
+A persistent cache of solved matchups. An entry is addressed by a hash of everything
+that determines the solution: the pitcher and batter tensors, the digests of the model
+files, the zone and error distribution config of pitch_zone_config and the solve
+parameters (p_take_threshold, max_pitch_pct, theta, method, the take table, ...). Changing any input
+changes the key, so stale entries are never read, they age out of the LRU order.
+"""
+import hashlib
+import json
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from game_solution import GameSolution
+from tensor_store import tensor_digest
+
+CACHE_DIR = Path(__file__).parent / ".solution_cache"
+
+# bump when a change to the solvers or the accuracy simulation changes the solutions
+CACHE_VERSION = 3
+
+
+def file_digest(path) -> str:
+    """Returns the sha256 hex digest of a file
+
+    Parameters
+    ----------
+    path : str or Path
+        the file to hash
+
+    Returns
+    -------
+    str
+        sha256 hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def get_config_digest() -> str:
+    """Returns a digest of the zone, cutoff and error distribution config
+
+    The Pitch objects of gen_pitches are built from all of that config and their repr
+    shows every zone bound and error parameter.
+
+    Returns
+    -------
+    str
+        sha256 hex digest of repr(gen_pitches())
+    """
+    # imported here, pitch_zone_config is only needed when a key is made
+    from pitch_zone_config import gen_pitches
+
+    return hashlib.sha256(repr(gen_pitches()).encode()).hexdigest()
+
+
+class SolutionCache:
+    """Class used to represent an on-disk LRU cache of GameSolution objects
+
+    Every entry is a json file named by its key. The LRU order is kept in memory and in
+    the file modification times, so it survives restarts.
+
+    Attributes
+    ----------
+    cache_dir : Path
+        the directory of the entries
+    max_entries : int
+        the number of entries kept, the least recently used are evicted past it
+    hits : int
+        the number of get calls that found their entry
+    misses : int
+        the number of get calls that did not
+    evictions : int
+        the number of entries removed to stay under max_entries
+
+    Methods
+    -------
+    make_key(pitcher, batter, model_paths, **params)
+        returns the key of a matchup
+    get(key)
+        returns the cached GameSolution of key, None on a miss
+    put(key, solution)
+        stores a GameSolution under key
+    get_stats()
+        returns the hit, miss and eviction counters
+    """
+
+    def __init__(self, cache_dir=CACHE_DIR, max_entries: int = 100000) -> None:
+        """Instantiates SolutionCache object
+
+        Parameters
+        ----------
+        cache_dir : str or Path
+            the directory of the entries, created if missing
+        max_entries : int
+            the number of entries kept
+        """
+        self.cache_dir = Path(cache_dir)
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        entries = sorted(self.cache_dir.glob("*.json"), key=lambda path: path.stat().st_mtime)
+        self.lru = OrderedDict((path.stem, None) for path in entries)
+
+        self.config_digest = None
+        self.model_digests = {}
+
+    def get_model_digest(self, path) -> str:
+        """Returns the digest of an input file, hashed again only if the file changed
+
+        Parameters
+        ----------
+        path : str or Path
+            the model file, or a take table and its description
+
+        Returns
+        -------
+        str
+            sha256 hex digest of the file
+        """
+        stat = os.stat(path)
+        stamp = (str(path), stat.st_mtime_ns, stat.st_size)
+        if stamp not in self.model_digests:
+            self.model_digests[stamp] = file_digest(path)
+        return self.model_digests[stamp]
+
+    def make_key(self, pitcher: np.ndarray, batter: np.ndarray, model_paths: dict,
+                 **params) -> str:
+        """Returns the key of a matchup
+
+        Parameters
+        ----------
+        pitcher : np.ndarray
+            the pitcher tensor
+        batter : np.ndarray
+            the batter tensor
+        model_paths : dict
+            path of every model used to build the game
+        params
+            every other input of the solve, p_take_threshold, max_pitch_pct, theta, ...
+
+        Returns
+        -------
+        str
+            sha256 hex digest of all inputs
+        """
+        if self.config_digest is None:
+            self.config_digest = get_config_digest()
+
+        digest = hashlib.sha256()
+        # the models see float32, so json and tensor store inputs share keys
+        for tensor in (pitcher, batter):
+            digest.update(tensor_digest(tensor).encode())
+        model_digests = {name: self.get_model_digest(path) for name, path in model_paths.items()}
+        digest.update(json.dumps({
+            "version": CACHE_VERSION,
+            "config": self.config_digest,
+            "models": model_digests,
+            "params": params,
+        }, sort_keys=True).encode())
+        return digest.hexdigest()
+
+    def get(self, key: str) -> Optional[GameSolution]:
+        """Returns the cached solution of key
+
+        Parameters
+        ----------
+        key : str
+            the key returned by make_key
+
+        Returns
+        -------
+        Optional[GameSolution]
+            the solution (values, previous values and policy), None on a miss
+        """
+        path = self.cache_dir / f"{key}.json"
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except (OSError, ValueError):
+            self.misses += 1
+            self.lru.pop(key, None)
+            return None
+
+        self.hits += 1
+        self.lru[key] = None
+        self.lru.move_to_end(key)
+        os.utime(path)
+
+        prev_values = entry["prev_values"]
+        return GameSolution(
+            entry["state_names"], np.array(entry["values"]), entry["policy"],
+            None if prev_values is None else np.array(prev_values), entry["iterations"]
+        )
+
+    def put(self, key: str, solution: GameSolution) -> None:
+        """Stores a solution under key, evicting the least recently used entries
+
+        Parameters
+        ----------
+        key : str
+            the key returned by make_key
+        solution : GameSolution
+            the solution to store, its history is not stored
+        """
+        prev_values = solution.prev_values
+        entry = {
+            "state_names": list(solution.state_names),
+            "values": np.asarray(solution.values).tolist(),
+            "prev_values": None if prev_values is None else np.asarray(prev_values).tolist(),
+            "iterations": solution.iterations,
+            "policy": solution.policy,
+        }
+
+        # write then rename, so a crash never leaves a truncated entry
+        path = self.cache_dir / f"{key}.json"
+        tmp_path = path.with_suffix(f".{os.getpid()}.tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(entry, f)
+        os.replace(tmp_path, path)
+
+        self.lru[key] = None
+        self.lru.move_to_end(key)
+        while len(self.lru) > self.max_entries:
+            old_key, _ = self.lru.popitem(last=False)
+            (self.cache_dir / f"{old_key}.json").unlink(missing_ok=True)
+            self.evictions += 1
+
+    def get_stats(self) -> dict:
+        """Returns the cache counters
+
+        Returns
+        -------
+        dict
+            hits, misses, evictions and the number of entries
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": len(self.lru),
+        }
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"SolutionCache({repr(str(self.cache_dir))}, {self.max_entries})"
+
+    def __str__(self):
+        """Prints the cache counters"""
+        stats = self.get_stats()
+        return (
+            f"SolutionCache: {stats['entries']} entries, {stats['hits']} hits, "
+            f"{stats['misses']} misses, {stats['evictions']} evictions"
+        )
@@ -1,8 +1,16 @@
 """Stochastic Game Module"""
-from typing import List
+from typing import List, Union
+
+import numpy as np
+
+from game_solution import GameSolution
+from matrix_game import GlopMatrixGame, solve_breakpoint_game, solve_glop_game
 from state import Count
-from ortools.linear_solver import pywraplp
 from state_action_enums import BatActs, Outcomes
+from trans_tensor import TransitionTensor, BATACT_INDEX, COUNT_INDEX, OUTCOMES
+
+# solvers of the linear program of one state, glop is the reference
+LP_BACKENDS = {"glop": solve_glop_game, "breakpoint": solve_breakpoint_game}
 
 
 class StochasticGame:
@@ -14,55 +22,188 @@ class StochasticGame:
         the list of states that define our game
     trans_prob_mat : dict
         dict[pitch][zone][batact][outcome] = transition_probability
+    max_pitch_pct : float
+        the maximum percent of the time a pitcher is allowed to perform an action
+    lp_backend : str
+        the solver used for the linear program of each state, a key of LP_BACKENDS
+    lp_models : list
+        with the glop backend, the GlopMatrixGame of every state, re-solved each sweep
+    lp_stats : List[dict]
+        state, status and simplex iterations of every GLOP solve of the last
+        run_val_iter
+    actions : list
+        the (pitch, zone) of every pitcher action, the row order of the arrays below
+    hit_vec : np.ndarray
+        (states * actions * batacts) probability of an immediate hit
+    succ_mat : np.ndarray
+        (states * actions * batacts, states) probability of moving to each count,
+        q_vals = hit_vec + succ_mat @ state_vals
     state_val: dict
         a dict that maps each state to a value
-    q_vals: dict
-        q_vals, a dict that we sum outcomes across pitcher and batter actions
-        q[state][pitch][zone][batact] = trans_prob_mat * state_vals[next_state]
+    q_vals: np.ndarray
+        q_vals, we sum outcomes across pitcher and batter actions
+        q[state][action][batact] = trans_prob_mat * state_vals[next_state]
     policy: dict
         the optimal actions a pitcher should take to minimize a batter's OBP
 
     Methods
     -------
-    solve_game()
-        runts value iteration and solve_lp to solve the game
-    solve_lp(q_vals, max_pitch_pct)
+    solve_game(method)
+        runts value iteration (or backward induction) and solve_lp to solve the game
+    solve(method, theta)
+        solves the game with the given method without printing it
+    solve_lp(q_vals, max_pitch_pct, state_name)
         given q_vals and max_pitch_pct, solves the linear program
     run_val_iter(theta)
         runs value iteration until we see changes less than theta
+    run_gauss_seidel(theta, keep_history)
+        runs in place value iteration until the max-norm residual is below theta
+    run_backward_induction(max_loop_iters)
+        solves every state once in reverse topological order, exact values
+    get_solve_order(states)
+        returns the states in reverse topological order of the count graph
+    solve_self_loop(state_ind, base, loop, weights, max_loop_iters)
+        solves a state whose q_vals depend on its own value
+    get_solution(history, weights)
+        converts state value arrays and policy weights to the solution dicts
+    compile_game()
+        precomputes the hit vector and successor matrix used to compute q_vals
+    get_q_vals(state_vals)
+        returns the q_vals of every state, action and batter action as an array
+    solve_matrix_game(swing_q, take_q, max_pitch_pct, state_ind)
+        solves the linear program of one state given q_vals arrays with lp_backend
+    get_lp_model(state_ind, max_pitch_pct)
+        returns the persistent GLOP model of a state
     """
 
-    def __init__(self, states: List[Count], trans_prob_mat: dict) -> None:
+    def __init__(self, states: List[Count],
+                 trans_prob_mat: Union[dict, TransitionTensor],
+                 max_pitch_pct: float = 0.7, lp_backend: str = "glop") -> None:
         """Instantiates StochasticGame object
 
         Parameters
         ----------
         counts : List[Count]
             the list of states that define our game
-        trans_prob_mat : dict
-            dict[pitch][zone][batact][outcome] = transition_probability
+        trans_prob_mat : Union[dict, TransitionTensor]
+            dict[pitch][zone][batact][outcome] = transition_probability,
+            or the same probabilities as a TransitionTensor
+        max_pitch_pct : float
+            the maximum percent of the time a pitcher is allowed to perform an action
+        lp_backend : str
+            "glop" to solve each state with a GLOP model (the reference), or
+            "breakpoint" for the exact solver of matrix_game.solve_breakpoint_game
         """
+        if lp_backend not in LP_BACKENDS:
+            raise ValueError(f"lp_backend must be one of {list(LP_BACKENDS)}, got {lp_backend}")
         self.states = states
         self.trans_prob_mat = trans_prob_mat
+        self.max_pitch_pct = max_pitch_pct
+        self.lp_backend = lp_backend
+        self.lp_models = [None] * len(states)
+        self.lp_stats = []
+        self.compile_game()
+
+    def compile_game(self) -> None:
+        """Precomputes the arrays that turn state values into q_vals
+
+        For every state, pitcher action and batter action, an outcome either ends the
+        at bat with a hit (value 1), ends it with an out (value 0) or moves to another
+        count, so q_vals = hit_vec + succ_mat @ state_vals. With 12 counts succ_mat is
+        small enough to keep dense.
+        """
+        if isinstance(self.trans_prob_mat, TransitionTensor):
+            trans_tensor = self.trans_prob_mat
+        else:
+            trans_tensor = TransitionTensor.from_dict(self.trans_prob_mat)
+
+        self.actions = trans_tensor.get_actions()
+        state_index = {state.state_name: i for i, state in enumerate(self.states)}
+
+        # (states, actions, batacts, outcomes)
+        probs = trans_tensor.probs[trans_tensor.zone_mask]
+        probs = probs[:, [COUNT_INDEX[state.state_name] for state in self.states]]
+        probs = probs.transpose(1, 0, 2, 3)
+
+        hit_vec = np.zeros(probs.shape[:3])
+        succ_mat = np.zeros(probs.shape[:3] + (len(self.states),))
+        for i, state in enumerate(self.states):
+            for o_ind, res in enumerate(OUTCOMES):
+                nxt_state = state.get_successor(res)
+                if nxt_state == Outcomes.HIT.value:
+                    hit_vec[i] += probs[i, :, :, o_ind]
+                elif nxt_state != Outcomes.OUT.value:
+                    succ_mat[i, :, :, state_index[nxt_state]] += probs[i, :, :, o_ind]
+
+        self.hit_vec = hit_vec.ravel()
+        self.succ_mat = succ_mat.reshape(-1, len(self.states))
+
+    def get_q_vals(self, state_vals: np.ndarray) -> np.ndarray:
+        """Returns the q_vals of every state given the current state values
 
+        Parameters
+        ----------
+        state_vals : np.ndarray
+            value of every state, in the order of self.states
 
-    def solve_game(self) -> None:
+        Returns
+        -------
+        np.ndarray
+            (states, actions, batacts) q_vals, batacts in BatActs order
+        """
+        q_vals = self.hit_vec + self.succ_mat @ state_vals
+        return q_vals.reshape(len(self.states), len(self.actions), len(BATACT_INDEX))
+
+    def solve_game(self, method: str = "value_iteration") -> GameSolution:
         """Solves the stochastic game given state and tranisition probabilities
 
+        Parameters
+        ----------
+        method : str
+            "value_iteration" for run_val_iter, "gauss_seidel" for run_gauss_seidel or
+            "backward_induction" for the exact run_backward_induction
+
         Returns
         -------
-        (dict, dict)
-            state_val the value of each state,
+        GameSolution
+            unpacks to (state_val, policy), state_val the value of each state,
             policy the optimal pitcher actions to minimize batter OBP
             (which determines state_val)
         """
-        state_vals, state_policy = self.run_val_iter()
+        solution = self.solve(method)
+        state_vals, state_policy = solution
         self.print_solution(state_vals, state_policy)
-        return state_vals, state_policy
+        return solution
 
-        # we want this to get the results and then print them too
+    def solve(self, method: str = "value_iteration", theta: float = 0.001) -> GameSolution:
+        """Solves the stochastic game with the given method, like solve_game without
+        printing
 
-    def solve_lp(self, q_vals: dict, max_pitch_pct: float = 0.7) -> (int, dict):
+        Parameters
+        ----------
+        method : str
+            "value_iteration", "gauss_seidel" or "backward_induction"
+        theta : float
+            the stopping threshold of the value iteration methods
+
+        Returns
+        -------
+        GameSolution
+            unpacks to (state_val, policy)
+        """
+        if method == "value_iteration":
+            return self.run_val_iter(theta)
+        if method == "gauss_seidel":
+            return self.run_gauss_seidel(theta)
+        if method == "backward_induction":
+            return self.run_backward_induction()
+        raise ValueError(
+            "method must be value_iteration, gauss_seidel or backward_induction, "
+            f"got {method}"
+        )
+
+    def solve_lp(self, q_vals: dict, max_pitch_pct: float = 0.7,
+                 state_name: str = None) -> (int, dict):
         """Solves the linear program to get state value and policy
 
         Parameters
@@ -71,6 +212,9 @@ class StochasticGame:
             q_vals calculated by summing state values across transition probabilities
         max_pitch_pct : float
             the maximum percent of the time a pitcher is allowed to perform an action
+        state_name : str
+            the count the q_vals belong to, with the glop backend its model is re-solved
+            instead of building a new one
 
         Returns
         -------
@@ -92,67 +236,78 @@ class StochasticGame:
             x_optimal: dict, the optimal policy of a pitcher to minimize state_val
             One can think of state_val as the OBP of a batter at a given state
         """
-        solver = pywraplp.Solver(
-            "SolveSimpleSystem", pywraplp.Solver.GLOP_LINEAR_PROGRAMMING
-        )
+        actions = [(pitch, zone) for pitch in q_vals for zone in q_vals[pitch]]
+        swing_q = np.array([q_vals[pitch][zone][BatActs.SWING.value] for pitch, zone in actions])
+        take_q = np.array([q_vals[pitch][zone][BatActs.TAKE.value] for pitch, zone in actions])
 
-        # defining state value
-        state_val = solver.NumVar(0, solver.infinity(), "state_val")
+        state_ind = None
+        if state_name is not None:
+            state_ind = [state.state_name for state in self.states].index(state_name)
+        value, weights = self.solve_matrix_game(swing_q, take_q, max_pitch_pct, state_ind)
 
-        # defining pitcher actions
-        p_actions = {}
-        for pitch in q_vals:
-            p_actions[pitch] = {}
-            for zone in q_vals[pitch]:
-                p_actions[pitch][zone] = solver.NumVar(
-                    0, max_pitch_pct, pitch + str(zone)
-                )
+        optimal_policy = {pitch: {} for pitch in q_vals}
+        for (pitch, zone), weight in zip(actions, weights):
+            if weight > 0:
+                optimal_policy[pitch][zone] = float(weight)
 
-        # Constraint 1: state_val - sum(i = 0...n) { policy(i) * q(i,swing) } >= 0
-        constraint1 = solver.Constraint(0, solver.infinity())
-        constraint1.SetCoefficient(state_val, 1)
-        for pitch in q_vals:
-            for zone in q_vals[pitch]:
-                constraint1.SetCoefficient(
-                    p_actions[pitch][zone],
-                    -1 * q_vals[pitch][zone][BatActs.SWING.value],
-                )
+        return float(value), optimal_policy
 
-        # Constraint 2: state_val - sum(i = 0...n) { policy(i) * q(i, take) } >= 0
-        constraint2 = solver.Constraint(0, solver.infinity())
-        constraint2.SetCoefficient(state_val, 1)
-        for pitch in q_vals:
-            for zone in q_vals[pitch]:
-                constraint2.SetCoefficient(
-                    p_actions[pitch][zone], -1 * q_vals[pitch][zone][BatActs.TAKE.value]
-                )
+    def solve_matrix_game(self, swing_q: np.ndarray, take_q: np.ndarray,
+                          max_pitch_pct: float = 0.7,
+                          state_ind: int = None) -> (float, np.ndarray):
+        """Solves the linear program of solve_lp given the q_vals as arrays
 
-        # Constraint 3: sum(x_optimal) = 1
-        constraint3 = solver.Constraint(1, 1)
-        for pitch in p_actions:
-            for zone in p_actions[pitch]:
-                constraint3.SetCoefficient(p_actions[pitch][zone], 1)
+        Parameters
+        ----------
+        swing_q : np.ndarray
+            q_val of every pitcher action if the batter swings
+        take_q : np.ndarray
+            q_val of every pitcher action if the batter takes
+        max_pitch_pct : float
+            the maximum percent of the time a pitcher is allowed to perform an action
+        state_ind : int
+            index of the state in self.states, with the glop backend the persistent model
+            of the state is re-solved and the solve is recorded in lp_stats
 
-        # Objective Function: minimize state_val
-        objective = solver.Objective()
-        objective.SetCoefficient(state_val, 1)
-        objective.SetMinimization()
+        Returns
+        -------
+        (float, np.ndarray)
+            state value, probability of every pitcher action
+        """
+        if self.lp_backend != "glop" or state_ind is None:
+            return LP_BACKENDS[self.lp_backend](swing_q, take_q, max_pitch_pct)
 
-        # Solve the game and return state_val and x_optimal
-        solver.Solve()
+        model = self.get_lp_model(state_ind, max_pitch_pct)
+        result = model.solve(swing_q, take_q)
+        self.lp_stats.append({
+            "state": self.states[state_ind].state_name,
+            "status": model.status,
+            "iterations": model.iterations,
+        })
+        return result
 
-        optimal_policy = {}
-        for pitch in p_actions:
-            optimal_policy[pitch] = {}
-            for zone in p_actions[pitch]:
-                if p_actions[pitch][zone].solution_value() > 0:
-                    optimal_policy[pitch][zone] = p_actions[pitch][
-                        zone
-                    ].solution_value()
+    def get_lp_model(self, state_ind: int, max_pitch_pct: float = 0.7) -> GlopMatrixGame:
+        """Returns the GLOP model of a state, built on first use
 
-        return state_val.solution_value(), optimal_policy
+        Parameters
+        ----------
+        state_ind : int
+            index of the state in self.states
+        max_pitch_pct : float
+            the maximum percent of the time a pitcher is allowed to perform an action
 
-    def run_val_iter(self, theta: float = 0.001):
+        Returns
+        -------
+        GlopMatrixGame
+            the model of the state, rebuilt if max_pitch_pct changed
+        """
+        model = self.lp_models[state_ind]
+        if model is None or model.max_pitch_pct != max_pitch_pct:
+            model = GlopMatrixGame(len(self.actions), max_pitch_pct)
+            self.lp_models[state_ind] = model
+        return model
+
+    def run_val_iter(self, theta: float = 0.001) -> GameSolution:
         """Runs value iteration until we see state value changes less than theta
 
         Parameters
@@ -162,97 +317,271 @@ class StochasticGame:
 
         Returns
         -------
-        (dict, dict)
-            state_val the value of each state,
-            policy the optimal pitcher actions to minimize batter OBP
+        GameSolution
+            unpacks to (state_val, policy), state_val the history of values of each
+            state, policy the optimal pitcher actions to minimize batter OBP
             (which determines state_val)
         """
-        q_vals = {}
-        policy = {}
-        state_val = {}
-        for state in self.states:
-            policy[state.state_name] = {}
-            state_val[state.state_name] = [0]
+        swing = BATACT_INDEX[BatActs.SWING.value]
+        take = BATACT_INDEX[BatActs.TAKE.value]
+
+        state_vals = np.zeros(len(self.states))
+        weights = np.zeros((len(self.states), len(self.actions)))
+
+        self.lp_stats = []
 
         # to keep track of the previous state value (storing in a list rather than last prev)
+        history = [state_vals]
         iters = 0
         while True:
-            all_states_done = True if iters > 0 else False
-            for state in self.states:
-                count = state.state_name
-
-                q_vals[state.state_name] = {}
-                for pitch in self.trans_prob_mat:
-                    q_vals[state.state_name][pitch] = {}
-                    for zone in self.trans_prob_mat[pitch]:
-                        # we reset the q_vals everytime our state_vals change
-                        q_vals[state.state_name][pitch][zone] = {
-                            BatActs.SWING.value: 0,
-                            BatActs.TAKE.value: 0,
-                        }
-
-                        # compute swing q_vals
-                        for res, res_prob in self.trans_prob_mat[pitch][zone][count][
-                            BatActs.SWING.value
-                        ].items():
-
-                            # given a state and outcome, what is the next state
-                            nxt_state = state.get_successor(res)
-
-                            if nxt_state == Outcomes.HIT.value:
-                                q_vals[state.state_name][pitch][zone][
-                                    BatActs.SWING.value
-                                ] += res_prob
-
-                            elif nxt_state != Outcomes.OUT.value:
-                                # print(state_val[nxt_state][iters])
-                                # print(res_prob)
-                                q_vals[state.state_name][pitch][zone][
-                                    BatActs.SWING.value
-                                ] += (res_prob * state_val[nxt_state][iters])
-
-                        # compute take q_vals
-                        for res, res_prob in self.trans_prob_mat[pitch][zone][count][
-                            BatActs.TAKE.value
-                        ].items():
-
-                            # given a state and outcome, what is the next state
-                            nxt_state = state.get_successor(res)
-
-                            if nxt_state == Outcomes.HIT.value:
-                                q_vals[state.state_name][pitch][zone][
-                                    BatActs.TAKE.value
-                                ] += res_prob
-
-                            elif nxt_state != Outcomes.OUT.value:
-                                q_vals[state.state_name][pitch][zone][
-                                    BatActs.TAKE.value
-                                ] += (res_prob * state_val[nxt_state][iters])
-
-                # passing q_vals into LP to get state_val and policy
-                new_state_val, policy[state.state_name] = self.solve_lp(
-                    q_vals[state.state_name]
+            q_vals = self.get_q_vals(state_vals)
+
+            # passing q_vals into LP to get state_val and policy
+            new_state_vals = np.zeros(len(self.states))
+            for i in range(len(self.states)):
+                new_state_vals[i], weights[i] = self.solve_matrix_game(
+                    q_vals[i, :, swing], q_vals[i, :, take], self.max_pitch_pct, i
                 )
-                state_val[state.state_name].append(new_state_val)
-
-                # checking if any state val difference is >= theta... if so do not exit
-                if iters > 0:
-                    if (
-                        abs(
-                            state_val[state.state_name][iters]
-                            - state_val[state.state_name][iters - 1]
-                        )
-                        >= theta
-                    ):
-                        all_states_done = False
+            history.append(new_state_vals)
+            state_vals = new_state_vals
 
-            # if all state differences are < theta, then exit while loop
-            if all_states_done:
+            # if all state differences of the previous sweep are < theta, then exit
+            if iters > 0 and np.all(np.abs(history[iters] - history[iters - 1]) < theta):
                 break
 
             iters += 1
 
-        return state_val, policy
+        return self.get_solution(history[-1], weights, history[-2], len(history) - 1, history)
+
+    def run_gauss_seidel(self, theta: float = 0.001,
+                         keep_history: bool = False) -> GameSolution:
+        """Runs in place (Gauss-Seidel) value iteration until the residual is below theta
+
+        States are swept in get_solve_order, successors first, and each matrix game uses
+        the values already updated in the sweep. Only the values of the current and the
+        previous sweep are stored.
+
+        Parameters
+        ----------
+        theta : float
+            stop once the max-norm difference between two sweeps is below theta
+        keep_history : bool
+            keep the values after every sweep in GameSolution.history
+
+        Returns
+        -------
+        GameSolution
+            the solution, unpacks to (state_vals, policy)
+        """
+        swing = BATACT_INDEX[BatActs.SWING.value]
+        take = BATACT_INDEX[BatActs.TAKE.value]
+        shape = (len(self.states), len(self.actions), len(BATACT_INDEX))
+        hit_vals = self.hit_vec.reshape(shape)
+        succ_probs = self.succ_mat.reshape(shape + (len(self.states),))
+        order = self.get_solve_order(self.states)
+
+        state_vals = np.zeros(len(self.states))
+        weights = np.zeros((len(self.states), len(self.actions)))
+        history = [state_vals.copy()] if keep_history else None
+
+        self.lp_stats = []
+
+        iters = 0
+        while True:
+            prev_vals = state_vals.copy()
+            for i in order:
+                q_vals = hit_vals[i] + succ_probs[i] @ state_vals
+                state_vals[i], weights[i] = self.solve_matrix_game(
+                    q_vals[:, swing], q_vals[:, take], self.max_pitch_pct, i
+                )
+            iters += 1
+            if keep_history:
+                history.append(state_vals.copy())
+
+            if np.max(np.abs(state_vals - prev_vals)) < theta:
+                break
+
+        return self.get_solution(state_vals, weights, prev_vals, iters, history)
+
+    @staticmethod
+    def get_solve_order(states: List[Count]) -> List[int]:
+        """Returns the states in reverse topological order of the count graph
+
+        A count only moves to counts with more balls or strikes (or stays put on a
+        foul with two strikes), so apart from self loops the graph is acyclic and every
+        state can be solved after all of its successors.
+
+        Parameters
+        ----------
+        states : List[Count]
+            the states of the game
+
+        Returns
+        -------
+        List[int]
+            indices into states, successors first
+        """
+        state_index = {state.state_name: i for i, state in enumerate(states)}
+        successors = [
+            {state_index[nxt] for nxt in (state.get_successor(res) for res in OUTCOMES)
+             if nxt in state_index and nxt != state.state_name}
+            for state in states
+        ]
+
+        order = []
+        visiting = set()
+        done = set()
+
+        def visit(i: int) -> None:
+            if i in done:
+                return
+            if i in visiting:
+                raise ValueError(
+                    f"count {states[i].state_name} is on a cycle, the game has no "
+                    "backward induction order"
+                )
+            visiting.add(i)
+            for j in sorted(successors[i]):
+                visit(j)
+            visiting.remove(i)
+            done.add(i)
+            order.append(i)
+
+        for i in range(len(states)):
+            visit(i)
+        return order
+
+    def run_backward_induction(self, max_loop_iters: int = 100) -> GameSolution:
+        """Solves the game exactly by solving every state once after its successors
+
+        Without a self loop the q_vals of a state only depend on the values of solved
+        states, so one matrix game gives its value. A two strike count fouls back to
+        itself and its value is the fixed point of its matrix game, found locally by
+        solve_self_loop in a few more solves. No theta is needed.
+
+        Parameters
+        ----------
+        max_loop_iters : int
+            the maximum number of matrix games solved for one self loop state
+
+        Returns
+        -------
+        GameSolution
+            unpacks to (state_val, policy), state_val the value of each state (a list
+            with one value), policy the optimal pitcher actions to minimize batter OBP
+        """
+        swing = BATACT_INDEX[BatActs.SWING.value]
+        take = BATACT_INDEX[BatActs.TAKE.value]
+        shape = (len(self.states), len(self.actions), len(BATACT_INDEX))
+        hit_vals = self.hit_vec.reshape(shape)
+        succ_probs = self.succ_mat.reshape(shape + (len(self.states),))
+
+        state_vals = np.zeros(len(self.states))
+        weights = np.zeros((len(self.states), len(self.actions)))
+
+        self.lp_stats = []
+
+        for i in self.get_solve_order(self.states):
+            # state_vals[i] is still 0, so base leaves out the self loop
+            base = hit_vals[i] + succ_probs[i] @ state_vals
+            loop = succ_probs[i, :, :, i]
+
+            value, weights[i] = self.solve_matrix_game(
+                base[:, swing], base[:, take], self.max_pitch_pct, i
+            )
+            if loop.any():
+                value, weights[i] = self.solve_self_loop(i, base, loop, weights[i],
+                                                         max_loop_iters)
+
+            state_vals[i] = value
+
+        return self.get_solution(state_vals, weights)
+
+    def solve_self_loop(self, state_ind: int, base: np.ndarray, loop: np.ndarray,
+                        weights: np.ndarray, max_loop_iters: int = 100) -> (float, np.ndarray):
+        """Solves a state whose q_vals depend on its own value, q = base + loop * value
+
+        Against a pitcher mix x the batter's best response gives the value
+        max_batact x . base / (1 - x . loop), the pitcher minimizes this max of ratios.
+        It is solved with the Crouzeix-Ferland-Schaible (normalized Dinkelbach) method:
+        given the value v of the current mix, the next mix solves the matrix game with
+        q_vals (base - v * (1 - loop)) / (1 - x . loop). The values decrease
+        superlinearly to the fixed point and the iteration stops once they stop
+        decreasing.
+
+        Parameters
+        ----------
+        state_ind : int
+            index of the state in self.states
+        base : np.ndarray
+            (actions, batacts) q_vals without the self loop
+        loop : np.ndarray
+            (actions, batacts) probability of staying in the state
+        weights : np.ndarray
+            a starting pitcher mix
+        max_loop_iters : int
+            the maximum number of matrix games to solve
+
+        Returns
+        -------
+        (float, np.ndarray)
+            state value, probability of every pitcher action
+        """
+        swing = BATACT_INDEX[BatActs.SWING.value]
+        take = BATACT_INDEX[BatActs.TAKE.value]
+
+        denom = 1 - weights @ loop
+        value = np.max((weights @ base) / denom)
+        for _ in range(max_loop_iters):
+            q_vals = (base - value * (1 - loop)) / denom
+            # sum(x) = 1, so a shift keeps the solution and keeps q_vals non negative
+            q_vals -= min(q_vals.min(), 0)
+            _, new_weights = self.solve_matrix_game(
+                q_vals[:, swing], q_vals[:, take], self.max_pitch_pct, state_ind
+            )
+            new_denom = 1 - new_weights @ loop
+            new_value = np.max((new_weights @ base) / new_denom)
+            if new_value >= value:
+                return value, weights
+            value, weights, denom = new_value, new_weights, new_denom
+
+        raise RuntimeError(
+            f"count {self.states[state_ind].state_name} did not converge in "
+            f"{max_loop_iters} solves"
+        )
+
+    def get_solution(self, values: np.ndarray, weights: np.ndarray,
+                     prev_values: np.ndarray = None, iterations: int = 1,
+                     history: List[np.ndarray] = None) -> GameSolution:
+        """Converts state value arrays and policy weights to a GameSolution
+
+        Parameters
+        ----------
+        values : np.ndarray
+            the final value of every state, in the order of self.states
+        weights : np.ndarray
+            (states, actions) probability of every pitcher action
+        prev_values : np.ndarray
+            the values of the sweep before the last
+        iterations : int
+            the number of sweeps over the states
+        history : List[np.ndarray]
+            the values after every sweep
+
+        Returns
+        -------
+        GameSolution
+            the solution, unpacks to (state_vals, policy)
+        """
+        policy = {}
+        for i, state in enumerate(self.states):
+            policy[state.state_name] = {pitch: {} for pitch, _ in self.actions}
+            for (pitch, zone), weight in zip(self.actions, weights[i]):
+                if weight > 0:
+                    policy[state.state_name][pitch][zone] = float(weight)
+
+        return GameSolution([state.state_name for state in self.states], values, policy,
+                            prev_values, iterations, history)
 
     def print_solution(self, state_vals: List[dict], state_policy: dict) -> None:
         """Prints the state_value and optimal policy for each state
@@ -0,0 +1,487 @@
+"""Sweep Module
+
+Solves many pitcher/batter matchups on a process pool. Every worker loads the three
+models and the tensor files once (init_worker) and then solves the matchups it is sent
+with matchup.solve_matchup. Workers are started with the spawn method, a forked copy
+of a process that already initialized tensorflow is not safe to use.
+
+In a single process the steps of a matchup can instead run as a pipeline of threads
+(gen_pipeline), running the models of the next matchup while the last one is solved.
+"""
+import multiprocessing
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+import numpy as np
+
+from game_solution import GameSolution
+from solution_cache import SolutionCache
+from tensor_store import load_tensor_file
+
+MODEL_DIR = Path(__file__).parent.parent / "models"
+MODEL_PATHS = {
+    "take": MODEL_DIR / "take_2015-2018.h5",
+    "transition": MODEL_DIR / "transition_model_2015-2018.h5",
+    "error": MODEL_DIR / "error_2015-2018.h5",
+}
+
+TENSOR_DIR = Path(__file__).parent / "tensors"
+TENSOR_PATHS = {
+    "pitcher": TENSOR_DIR / "pitcher_tensors.json",
+    "batter": TENSOR_DIR / "batter_tensors.json",
+}
+
+# the same tensors converted to memory-mapped stores, see tensor_store
+STORE_PATHS = {name: path.with_suffix(".npy") for name, path in TENSOR_PATHS.items()}
+
+# swing probabilities of every batter, built by take_table.py
+TAKE_TABLE_PATH = TENSOR_DIR / "batter_take_table.npy"
+
+# what a worker process loads once, filled by init_worker
+_worker = {}
+
+
+def load_keras_model(path):
+    """Loads a model with keras
+
+    Parameters
+    ----------
+    path : str or Path
+        the h5 file of the model
+
+    Returns
+    -------
+    keras.Model
+        the model
+    """
+    # imported here so the parent of a pool never has to import tensorflow
+    from tensorflow.keras import models
+
+    # only predict is used, the training config is not needed
+    return models.load_model(path, compile=False)
+
+
+def load_numpy_model(path):
+    """Loads a model to be run with NumPy, see numpy_model
+
+    Parameters
+    ----------
+    path : str or Path
+        the h5 file of the model
+
+    Returns
+    -------
+    NumpyModel
+        the model
+    """
+    from numpy_model import NumpyModel
+
+    return NumpyModel.from_h5(path)
+
+
+def load_split_model(path):
+    """Loads a model to be run with NumPy, split at its concat layer, see numpy_model
+
+    Parameters
+    ----------
+    path : str or Path
+        the h5 file of the model
+
+    Returns
+    -------
+    SplitModel
+        the model, caching the embedding of every player it sees
+    """
+    from numpy_model import SplitModel
+
+    return SplitModel(load_numpy_model(path))
+
+
+MODEL_BACKENDS = {
+    "keras": load_keras_model,
+    "numpy": load_numpy_model,
+    "split": load_split_model,
+}
+
+
+def load_models(model_paths: dict, backend: str = "split") -> dict:
+    """Loads the models
+
+    Parameters
+    ----------
+    model_paths : dict
+        path of the "take", "transition" and "error" models
+    backend : str
+        "split" or "numpy" to run the models with NumPy (tensorflow is never imported),
+        with or without caching the player embeddings, or "keras"
+
+    Returns
+    -------
+    dict
+        the loaded models under the same keys
+    """
+    if backend not in MODEL_BACKENDS:
+        raise ValueError(f"unknown model backend: {backend}")
+    return {name: MODEL_BACKENDS[backend](path) for name, path in model_paths.items()}
+
+
+def load_tensors(tensor_paths: dict) -> dict:
+    """Loads the pitcher and batter tensor files
+
+    Parameters
+    ----------
+    tensor_paths : dict
+        path of the "pitcher" and "batter" files, json or the .npy array of a
+        tensor_store.TensorStore
+
+    Returns
+    -------
+    dict
+        dict["pitcher"][str(pitcher_id)] = pitcher tensor, same for "batter"
+    """
+    return {name: load_tensor_file(path) for name, path in tensor_paths.items()}
+
+
+def get_tensor_paths() -> dict:
+    """Returns STORE_PATHS if the json files were converted, otherwise TENSOR_PATHS
+
+    Returns
+    -------
+    dict
+        path of the "pitcher" and "batter" tensor files
+    """
+    if all(path.exists() for path in STORE_PATHS.values()):
+        return STORE_PATHS
+    return TENSOR_PATHS
+
+
+def load_inputs(model_paths: dict, tensor_paths: dict,
+                model_backend: str = "split") -> (dict, dict):
+    """Loads the models and the tensor files concurrently
+
+    Reading the h5 and json files is mostly waiting on disk and in libraries that
+    release the GIL, so every file gets a thread.
+
+    Parameters
+    ----------
+    model_paths : dict
+        path of the "take", "transition" and "error" models
+    tensor_paths : dict
+        path of the "pitcher" and "batter" tensor files, json or .npy stores
+    model_backend : str
+        "split", "numpy" or "keras", see load_models
+
+    Returns
+    -------
+    (dict, dict)
+        the models as load_models returns them, the tensors as load_tensors does
+    """
+    with ThreadPoolExecutor(len(model_paths) + len(tensor_paths)) as executor:
+        model_futures = {name: executor.submit(load_models, {name: path}, model_backend)
+                         for name, path in model_paths.items()}
+        tensor_futures = {name: executor.submit(load_tensors, {name: path})
+                          for name, path in tensor_paths.items()}
+        models = {name: future.result()[name] for name, future in model_futures.items()}
+        tensors = {name: future.result()[name] for name, future in tensor_futures.items()}
+    return models, tensors
+
+
+def init_worker(model_paths: dict, tensor_paths: dict, solve_kwargs: dict,
+                threads: int = None, player_cache_dir=None,
+                model_backend: str = "split", take_table_path=None) -> None:
+    """Loads the models, tensors, pitches and counts of a worker process once
+
+    Parameters
+    ----------
+    model_paths : dict
+        path of the "take", "transition" and "error" models
+    tensor_paths : dict
+        path of the "pitcher" and "batter" tensor files, json or .npy stores
+    solve_kwargs : dict
+        keyword arguments passed on to matchup.solve_matchup
+    threads : int
+        threads tensorflow may use in this process, so workers do not compete for
+        cores (None leaves the tensorflow default), keras backend only
+    player_cache_dir : str or Path
+        directory the per-player model outputs are shared in, None keeps them in the
+        memory of the worker only
+    model_backend : str
+        "split", "numpy" or "keras", see load_models
+    take_table_path : str or Path
+        take table read instead of running the take model, None to always run it
+    """
+    # a worker of a pool runs this once, run_sweep in process runs it for every sweep,
+    # so nothing of an earlier sweep is kept, an error in particular
+    _worker.clear()
+    _worker["solve_kwargs"] = solve_kwargs
+    # a pool restarts workers whose initializer raises, forever, so any error is kept
+    # and raised by solve_pair instead
+    try:
+        from pitch_zone_config import gen_counts, gen_pitches
+        from player_cache import PlayerCache
+        from take_table import load_take_table
+
+        if threads is not None and model_backend == "keras":
+            import tensorflow as tf
+
+            tf.config.threading.set_intra_op_parallelism_threads(threads)
+            tf.config.threading.set_inter_op_parallelism_threads(threads)
+
+        _worker["pitches"] = gen_pitches()
+        _worker["counts"] = gen_counts()
+        _worker["models"], _worker["tensors"] = load_inputs(model_paths, tensor_paths,
+                                                            model_backend)
+        take_table = None
+        if take_table_path is not None:
+            take_table = load_take_table(take_table_path, _worker["models"]["take"],
+                                         _worker["pitches"])
+        # every pitcher and batter runs its models once per worker, not once per matchup
+        _worker["player_cache"] = PlayerCache(_worker["models"], _worker["pitches"],
+                                              player_cache_dir, take_table)
+    except Exception as err:
+        _worker["error"] = err
+
+
+def solve_pair(pair: Tuple[int, int]) -> GameSolution:
+    """Solves one (pitcher_id, batter_id) matchup with the models of the worker
+
+    Parameters
+    ----------
+    pair : Tuple[int, int]
+        the pitcher and batter ids
+
+    Returns
+    -------
+    GameSolution
+        the solution of the matchup
+    """
+    from matchup import solve_matchup
+
+    if "error" in _worker:
+        raise RuntimeError("the worker could not load its models and tensors") from (
+            _worker["error"]
+        )
+
+    pitcher, batter = get_pair_tensors(pair)
+    return solve_matchup(_worker["models"], pitcher, batter, _worker["pitches"],
+                         _worker["counts"], player_cache=_worker["player_cache"],
+                         batter_id=pair[1], **_worker["solve_kwargs"])
+
+
+def get_pair_tensors(pair: Tuple[int, int]) -> (np.ndarray, np.ndarray):
+    """Returns the pitcher and batter tensors of a matchup from the tensors of the worker
+
+    Parameters
+    ----------
+    pair : Tuple[int, int]
+        the pitcher and batter ids
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray)
+        the pitcher and batter tensors
+    """
+    pitcher_id, batter_id = pair
+    # a view of the memory map of a store, a new array from json lists
+    return (np.asarray(_worker["tensors"]["pitcher"][str(pitcher_id)]),
+            np.asarray(_worker["tensors"]["batter"][str(batter_id)]))
+
+
+def gen_pipeline(stage_workers: dict = None, queue_size: int = 4):
+    """Builds the stages of solve_pair over the models and tensors of this process
+
+    "infer" runs the models (gen_matchup_mats), "build" turns their outputs into a
+    StochasticGame and "solve" solves it, so the models of one matchup run while the
+    game of the one before is built and solved. init_worker must have run. The "infer"
+    threads share the PlayerCache of the process, which computes every player once.
+
+    Parameters
+    ----------
+    stage_workers : dict
+        the number of threads of the "infer", "build" and "solve" stages, 1 for a
+        stage left out
+    queue_size : int
+        the most matchups waiting between two stages
+
+    Returns
+    -------
+    Pipeline
+        takes (pitcher_id, batter_id) pairs, returns GameSolutions
+    """
+    from matchup import gen_matchup_mats, get_solve_params
+    from pipeline import Pipeline, Stage
+    from pitch_zone_config import gen_trans_prob_tensor
+    from stochastic_game import StochasticGame
+
+    if "error" in _worker:
+        raise RuntimeError("the worker could not load its models and tensors") from (
+            _worker["error"]
+        )
+    stage_workers = {} if stage_workers is None else stage_workers
+    unknown = set(stage_workers) - {"infer", "build", "solve"}
+    if unknown:
+        raise ValueError(f"unknown stages: {sorted(unknown)}")
+    params = get_solve_params(**_worker["solve_kwargs"])
+
+    def infer(pair: Tuple[int, int]) -> (dict, dict):
+        pitcher, batter = get_pair_tensors(pair)
+        return gen_matchup_mats(_worker["models"], pitcher, batter, _worker["pitches"],
+                                params["p_take_threshold"], params["acc_method"],
+                                _worker["player_cache"], pair[1])
+
+    def build(mats: (dict, dict)) -> StochasticGame:
+        return StochasticGame(_worker["counts"], gen_trans_prob_tensor(*mats),
+                              params["max_pitch_pct"], params["lp_backend"])
+
+    def solve(game: StochasticGame) -> GameSolution:
+        return game.solve(params["method"], params["theta"])
+
+    return Pipeline([
+        Stage(name, func, stage_workers.get(name, 1))
+        for name, func in [("infer", infer), ("build", build), ("solve", solve)]
+    ], queue_size)
+
+
+def print_progress(done: int, total: int, elapsed: float) -> None:
+    """Prints how many matchups are solved
+
+    Parameters
+    ----------
+    done : int
+        the number of solved matchups
+    total : int
+        the number of matchups in the sweep
+    elapsed : float
+        seconds since the sweep started
+    """
+    rate = done / elapsed if elapsed > 0 else 0
+    print(f"solved {done}/{total} matchups, {elapsed:.1f}s, {rate:.2f} matchups/s")
+
+
+def run_sweep(pairs: List[Tuple[int, int]], processes: int = None,
+              model_paths: dict = None, tensor_paths: dict = None, chunksize: int = 1,
+              progress: Callable[[int, int, float], None] = print_progress,
+              cache: SolutionCache = None, player_cache_dir=None,
+              model_backend: str = "split", take_table_path=None,
+              stage_workers: dict = None, queue_size: int = 4,
+              **solve_kwargs) -> List[GameSolution]:
+    """Solves every (pitcher_id, batter_id) pair on a process pool
+
+    Parameters
+    ----------
+    pairs : List[Tuple[int, int]]
+        the matchups to solve
+    processes : int
+        the number of worker processes, os.cpu_count() if None, 1 solves the
+        matchups in this process, unused with stage_workers
+    model_paths : dict
+        path of the "take", "transition" and "error" models, MODEL_PATHS if None
+    tensor_paths : dict
+        path of the "pitcher" and "batter" json or .npy store files,
+        get_tensor_paths() if None
+    chunksize : int
+        the number of matchups sent to a worker at a time
+    progress : Callable[[int, int, float], None]
+        called with (done, total, elapsed seconds) after every solved matchup,
+        None to stay quiet
+    cache : SolutionCache
+        matchups found in the cache are not solved again, solved ones are stored
+    player_cache_dir : str or Path
+        directory the accuracy matrices and swing probabilities of the players are
+        kept in across workers and runs, None keeps them in worker memory only
+    model_backend : str
+        "split" runs the models with NumPy, encoding every player once per worker,
+        "numpy" runs the whole models with NumPy for every matchup, "keras" runs them
+        with keras
+    take_table_path : str or Path
+        swing probabilities of every batter read instead of running the take model,
+        TAKE_TABLE_PATH if None and it exists
+    stage_workers : dict
+        threads of the "infer", "build" and "solve" stages, see gen_pipeline; if given
+        the matchups are solved in this process by a pipeline of those stages instead
+        of a pool, and the utilization of every stage is printed unless progress is
+        None
+    queue_size : int
+        the most matchups waiting between two pipeline stages
+    solve_kwargs
+        keyword arguments passed on to matchup.solve_matchup (method, lp_backend, ...)
+
+    Returns
+    -------
+    List[GameSolution]
+        the solution of every pair, in the order of pairs
+    """
+    if len(pairs) == 0:
+        return []
+    model_paths = MODEL_PATHS if model_paths is None else model_paths
+    tensor_paths = get_tensor_paths() if tensor_paths is None else tensor_paths
+    if take_table_path is None and TAKE_TABLE_PATH.exists():
+        take_table_path = TAKE_TABLE_PATH
+    processes = os.cpu_count() if processes is None else processes
+
+    start = time.perf_counter()
+    solutions = [None] * len(pairs)
+    keys = None
+    if cache is not None:
+        # imported here, the parent only needs the defaults of solve_matchup
+        from matchup import get_solve_params
+        from take_table import get_meta_path
+
+        tensors = load_tensors(tensor_paths)
+        # the backends agree to float32 rounding, not bit for bit, and a take table
+        # replaces the take model, at its own dtype
+        take_table = None
+        if take_table_path is not None:
+            take_table = [cache.get_model_digest(path) for path in
+                          (take_table_path, get_meta_path(take_table_path))]
+        params = dict(get_solve_params(**solve_kwargs), model_backend=model_backend,
+                      take_table=take_table)
+        keys = [cache.make_key(np.asarray(tensors["pitcher"][str(pitcher_id)]),
+                               np.asarray(tensors["batter"][str(batter_id)]),
+                               model_paths, **params)
+                for pitcher_id, batter_id in pairs]
+        solutions = [cache.get(key) for key in keys]
+    todo = [i for i, solution in enumerate(solutions) if solution is None]
+    done = len(pairs) - len(todo)
+    if progress is not None and done > 0:
+        progress(done, len(pairs), time.perf_counter() - start)
+
+    def collect(solution_iter) -> None:
+        nonlocal done
+        for i, solution in zip(todo, solution_iter):
+            solutions[i] = solution
+            if keys is not None:
+                cache.put(keys[i], solution)
+            done += 1
+            if progress is not None:
+                progress(done, len(pairs), time.perf_counter() - start)
+
+    todo_pairs = [pairs[i] for i in todo]
+    processes = min(processes, len(todo_pairs))
+    if len(todo_pairs) == 0:
+        return solutions
+
+    if processes <= 1 or stage_workers is not None:
+        init_worker(model_paths, tensor_paths, solve_kwargs, None, player_cache_dir,
+                    model_backend, take_table_path)
+        if stage_workers is None:
+            collect(map(solve_pair, todo_pairs))
+            return solutions
+
+        pipeline = gen_pipeline(stage_workers, queue_size)
+        collect(pipeline.imap(todo_pairs))
+        if progress is not None:
+            print(pipeline.format_stats())
+        return solutions
+
+    context = multiprocessing.get_context("spawn")
+    with context.Pool(processes, initializer=init_worker,
+                      initargs=(model_paths, tensor_paths, solve_kwargs, 1,
+                                player_cache_dir, model_backend,
+                                take_table_path)) as pool:
+        # imap hands results back in the order of pairs
+        collect(pool.imap(solve_pair, todo_pairs, chunksize))
+    return solutions
@@ -0,0 +1,290 @@
+"""Take Table Module
+
+The swing probabilities of the take model depend only on the batter, so they are
+computed for every batter of a league once, in memory-bounded chunks, into a
+(batters, pitches, zones 9a-16a, counts) table. A .npy file holds the table and a json
+file next to it the batter ids, a digest of every batter tensor, the axis labels and a
+digest of the take model. Matchups read a row instead of running the model; a row is
+only used if the digest of the batter tensor being solved matches.
+
+Build the table from the pitcherpolicy folder with:
+
+    python take_table.py
+"""
+import json
+import warnings
+from pathlib import Path
+from typing import Dict, Union
+
+import numpy as np
+
+from pitch_encoding import TAKE_ZONES, gen_count_keys, get_take_layout
+from pitches.pitch import Pitch
+from player_cache import model_digest
+from tensor_store import TensorStore, tensor_digest
+
+
+def get_meta_path(npy_path) -> Path:
+    """Returns the path of the json file describing a table
+
+    Parameters
+    ----------
+    npy_path : str or Path
+        the table array
+
+    Returns
+    -------
+    Path
+        "<name>.json" next to "<name>.npy"
+    """
+    return Path(npy_path).with_suffix(".json")
+
+
+def gen_take_table(model, tensors: Union[dict, TensorStore], pitches: Dict[str, Pitch],
+                   max_rows: int = 32768, dtype=np.float32) -> (np.ndarray, np.ndarray):
+    """Runs the take model for every batter in chunks of at most max_rows model rows
+
+    Parameters
+    ----------
+    model : keras.Model or NumpyModel
+        the take model
+    tensors : Union[dict, TensorStore]
+        the batter tensors, dict[str(batter_id)] = tensor
+    pitches : Dict[str, Pitch]
+        the pitches a pitcher may throw
+    max_rows : int
+        the largest batch sent to the model, bounds the memory of the job
+    dtype : np.dtype
+        float32, or float16 for a table half the size
+
+    Returns
+    -------
+    (np.ndarray, np.ndarray)
+        (batters, pitches, zones, counts) swing probabilities with zones in TAKE_ZONES
+        order and counts in gen_count_keys order, (batters,) sorted batter ids
+    """
+    layout = get_take_layout(pitches)
+    n_rows = len(layout.keys)
+    ids = np.array(sorted(int(batter_id) for batter_id in tensors.keys()), dtype=np.int64)
+    table = np.zeros((len(ids), len(pitches), len(TAKE_ZONES), len(gen_count_keys())),
+                     dtype=dtype)
+
+    chunk = max(max_rows // n_rows, 1)
+    for start in range(0, len(ids), chunk):
+        chunk_ids = ids[start:start + chunk]
+        batters = np.stack([np.asarray(tensors[str(batter_id)], dtype=np.float32)
+                            for batter_id in chunk_ids])
+        predictions = model.predict([
+            np.repeat(batters, n_rows, axis=0),
+            np.tile(layout.s_counts, len(chunk_ids)),
+            np.tile(layout.b_counts, len(chunk_ids)),
+            np.tile(layout.pitch_tensors, (len(chunk_ids), 1, 1, 1)),
+        ])
+        # the layout rows are pitch, zone then count major
+        table[start:start + len(chunk_ids)] = np.reshape(
+            predictions, (len(chunk_ids),) + table.shape[1:]
+        )
+    return table, ids
+
+
+def save_take_table(npy_path, model, tensors: Union[dict, TensorStore],
+                    pitches: Dict[str, Pitch], max_rows: int = 32768,
+                    dtype=np.float32) -> Path:
+    """Builds the take table of every batter and writes it with its description
+
+    Parameters
+    ----------
+    npy_path : str or Path
+        the table array to write, its description goes to get_meta_path(npy_path)
+    model : keras.Model or NumpyModel
+        the take model
+    tensors : Union[dict, TensorStore]
+        the batter tensors, dict[str(batter_id)] = tensor
+    pitches : Dict[str, Pitch]
+        the pitches a pitcher may throw
+    max_rows : int
+        the largest batch sent to the model
+    dtype : np.dtype
+        float32 or float16
+
+    Returns
+    -------
+    Path
+        the table array written
+    """
+    table, ids = gen_take_table(model, tensors, pitches, max_rows, dtype)
+    np.save(npy_path, table)
+    with open(get_meta_path(npy_path), "w") as f:
+        json.dump({
+            "ids": ids.tolist(),
+            "digests": [tensor_digest(np.asarray(tensors[str(batter_id)])) for batter_id in ids],
+            "pitches": list(pitches),
+            "zones": TAKE_ZONES,
+            "counts": gen_count_keys(),
+            "model": model_digest(model),
+        }, f)
+    return Path(npy_path)
+
+
+class TakeTable:
+    """Class used to represent a memory-mapped table of batter swing probabilities
+
+    Attributes
+    ----------
+    npy_path : Path
+        the table array
+    table : np.ndarray
+        (batters, pitches, zones, counts) read-only memory-mapped swing probabilities
+    ids : np.ndarray
+        (batters,) sorted batter ids, the first axis of table
+    digests : List[str]
+        tensor_digest of the batter tensor every row was computed from
+    pitches : List[str]
+        the pitch axis of table
+    zones : List[str]
+        the zone axis of table
+    counts : List[str]
+        the count axis of table
+    model : str
+        model_digest of the take model the table was computed with
+
+    Methods
+    -------
+    get_index(batter_id, batter)
+        returns the row of a batter, None if the table has no row for that tensor
+    get_swing_probs(batter_id, batter)
+        returns the swing probabilities of a batter as gen_swing_probs does
+    matches(model, pitches)
+        returns if the table was computed with this model and these pitches
+    """
+
+    def __init__(self, npy_path) -> None:
+        """Instantiates TakeTable object
+
+        Parameters
+        ----------
+        npy_path : str or Path
+            the table array written by save_take_table
+        """
+        self.npy_path = Path(npy_path)
+        self.table = np.load(self.npy_path, mmap_mode="r")
+        with open(get_meta_path(self.npy_path)) as f:
+            meta = json.load(f)
+        self.ids = np.array(meta["ids"], dtype=np.int64)
+        self.digests = meta["digests"]
+        self.pitches = meta["pitches"]
+        self.zones = meta["zones"]
+        self.counts = meta["counts"]
+        self.model = meta["model"]
+
+    def matches(self, model, pitches: Dict[str, Pitch]) -> bool:
+        """Returns if the table was computed with a model and pitches
+
+        Parameters
+        ----------
+        model : keras.Model or NumpyModel
+            the take model
+        pitches : Dict[str, Pitch]
+            the pitches a pitcher may throw
+
+        Returns
+        -------
+        bool
+            True if the weights, pitches, zones and counts all match
+        """
+        return (self.model == model_digest(model) and self.pitches == list(pitches)
+                and self.zones == TAKE_ZONES and self.counts == gen_count_keys())
+
+    def get_index(self, batter_id: Union[int, str], batter: np.ndarray):
+        """Returns the row of a batter
+
+        Parameters
+        ----------
+        batter_id : Union[int, str]
+            the batter id
+        batter : np.ndarray
+            the batter tensor, the row is only used if it was computed from it
+
+        Returns
+        -------
+        Optional[int]
+            the row, None if the batter is missing or its tensor changed
+        """
+        batter_id = int(batter_id)
+        index = int(np.searchsorted(self.ids, batter_id))
+        if index == len(self.ids) or self.ids[index] != batter_id:
+            return None
+        if self.digests[index] != tensor_digest(batter):
+            return None
+        return index
+
+    def get_swing_probs(self, batter_id: Union[int, str], batter: np.ndarray):
+        """Returns the swing probabilities of a batter
+
+        Parameters
+        ----------
+        batter_id : Union[int, str]
+            the batter id
+        batter : np.ndarray
+            the batter tensor
+
+        Returns
+        -------
+        Optional[dict]
+            swing_probs[pitch_type][zone][count] = probability the batter swings,
+            None if the table has no row for the batter tensor
+        """
+        index = self.get_index(batter_id, batter)
+        if index is None:
+            return None
+        row = self.table[index].tolist()
+        return {
+            pitch_type: {
+                zone: dict(zip(self.counts, row[p_ind][z_ind]))
+                for z_ind, zone in enumerate(self.zones)
+            }
+            for p_ind, pitch_type in enumerate(self.pitches)
+        }
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"TakeTable({repr(str(self.npy_path))})"
+
+    def __str__(self):
+        """Prints the number of batters and the table shape"""
+        return f"TakeTable: {len(self.ids)} batters, {self.table.shape} {self.table.dtype}"
+
+
+def load_take_table(npy_path, model, pitches: Dict[str, Pitch]):
+    """Opens a take table if it was computed with the model and pitches in use
+
+    Parameters
+    ----------
+    npy_path : str or Path
+        the table array written by save_take_table
+    model : keras.Model or NumpyModel
+        the take model in use
+    pitches : Dict[str, Pitch]
+        the pitches in use
+
+    Returns
+    -------
+    Optional[TakeTable]
+        the table, None (with a warning) if it is stale
+    """
+    take_table = TakeTable(npy_path)
+    if not take_table.matches(model, pitches):
+        warnings.warn(f"{npy_path} was built with another take model or zone config, "
+                      "rebuild it with take_table.py; running the take model instead")
+        return None
+    return take_table
+
+
+if __name__ == "__main__":
+    from pitch_zone_config import gen_pitches
+    from sweep import MODEL_PATHS, TAKE_TABLE_PATH, get_tensor_paths, load_inputs
+
+    models, tensors = load_inputs({"take": MODEL_PATHS["take"]},
+                                  {"batter": get_tensor_paths()["batter"]})
+    path = save_take_table(TAKE_TABLE_PATH, models["take"], tensors["batter"], gen_pitches())
+    print(TakeTable(path))
@@ -0,0 +1,197 @@
+"""Tensor Store Module
+
+A binary store of player tensors: one contiguous float32 .npy array of every player of
+a role and a sorted .npy index of their ids. The array is memory-mapped, so opening a
+store reads no tensor data and looking a player up is a binary search and a view.
+
+Convert the json files from the pitcherpolicy folder with:
+
+    python tensor_store.py tensors/pitcher_tensors.json tensors/batter_tensors.json
+"""
+import hashlib
+import json
+import sys
+from pathlib import Path
+from typing import Iterator, Union
+
+import numpy as np
+
+
+def tensor_digest(tensor: np.ndarray) -> str:
+    """Returns the sha256 hex digest of a player tensor
+
+    Parameters
+    ----------
+    tensor : np.ndarray
+        the pitcher or batter tensor
+
+    Returns
+    -------
+    str
+        sha256 hex digest of the shape and float32 values of the tensor, the
+        precision the models see, so json and tensor store inputs share digests
+    """
+    tensor = np.ascontiguousarray(tensor, dtype=np.float32)
+    digest = hashlib.sha256(str(tensor.shape).encode())
+    digest.update(tensor.tobytes())
+    return digest.hexdigest()
+
+
+def get_ids_path(npy_path) -> Path:
+    """Returns the path of the id index of a store
+
+    Parameters
+    ----------
+    npy_path : str or Path
+        the tensor array of the store
+
+    Returns
+    -------
+    Path
+        "<name>_ids.npy" next to "<name>.npy"
+    """
+    npy_path = Path(npy_path)
+    return npy_path.with_name(f"{npy_path.stem}_ids.npy")
+
+
+def convert_tensor_json(json_path, npy_path=None) -> Path:
+    """Converts a json file of player tensors to a store
+
+    Parameters
+    ----------
+    json_path : str or Path
+        json file, dict[str(player_id)] = nested list tensor
+    npy_path : str or Path
+        the tensor array to write, the json path with a .npy suffix if None
+
+    Returns
+    -------
+    Path
+        the tensor array written, its id index is at get_ids_path(npy_path)
+    """
+    json_path = Path(json_path)
+    npy_path = json_path.with_suffix(".npy") if npy_path is None else Path(npy_path)
+    with open(json_path) as f:
+        tensors = json.load(f)
+
+    ids = np.array(sorted(int(player_id) for player_id in tensors), dtype=np.int64)
+    array = np.stack([np.asarray(tensors[str(player_id)], dtype=np.float32)
+                      for player_id in ids])
+    np.save(npy_path, array)
+    np.save(get_ids_path(npy_path), ids)
+    return npy_path
+
+
+class TensorStore:
+    """Class used to represent a memory-mapped store of player tensors
+
+    Looks up players like the dict of a json file, store[str(player_id)] and
+    store[player_id] both work.
+
+    Attributes
+    ----------
+    npy_path : Path
+        the tensor array of the store
+    tensors : np.ndarray
+        (players, 5, 5, 12) read-only memory-mapped float32 tensors, in id order
+    ids : np.ndarray
+        (players,) sorted player ids
+
+    Methods
+    -------
+    get_index(player_id)
+        returns the row of a player, KeyError if the player is not in the store
+    keys()
+        returns the player ids as strings, like the keys of the json file
+    """
+
+    def __init__(self, npy_path) -> None:
+        """Instantiates TensorStore object
+
+        Parameters
+        ----------
+        npy_path : str or Path
+            the tensor array written by convert_tensor_json
+        """
+        self.npy_path = Path(npy_path)
+        self.tensors = np.load(self.npy_path, mmap_mode="r")
+        self.ids = np.load(get_ids_path(self.npy_path))
+        if len(self.ids) != len(self.tensors):
+            raise ValueError(
+                f"{self.npy_path} has {len(self.tensors)} tensors but {len(self.ids)} ids"
+            )
+
+    def get_index(self, player_id: Union[int, str]) -> int:
+        """Returns the row of a player
+
+        Parameters
+        ----------
+        player_id : Union[int, str]
+            the player id
+
+        Returns
+        -------
+        int
+            the index of the player in tensors
+        """
+        player_id = int(player_id)
+        index = int(np.searchsorted(self.ids, player_id))
+        if index == len(self.ids) or self.ids[index] != player_id:
+            raise KeyError(player_id)
+        return index
+
+    def __getitem__(self, player_id: Union[int, str]) -> np.ndarray:
+        """Returns the tensor of a player, a view of the memory map"""
+        return self.tensors[self.get_index(player_id)]
+
+    def __contains__(self, player_id) -> bool:
+        """Returns if the player is in the store"""
+        try:
+            self.get_index(player_id)
+        except (KeyError, ValueError):
+            return False
+        return True
+
+    def __len__(self) -> int:
+        """Returns the number of players"""
+        return len(self.ids)
+
+    def keys(self) -> Iterator[str]:
+        """Returns the player ids as strings, like the keys of the json file"""
+        return (str(player_id) for player_id in self.ids)
+
+    def __iter__(self) -> Iterator[str]:
+        """Iterates over the player ids as strings"""
+        return self.keys()
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"TensorStore({repr(str(self.npy_path))})"
+
+    def __str__(self):
+        """Prints the number of players and the tensor shape"""
+        return f"TensorStore: {len(self)} players of shape {self.tensors.shape[1:]}"
+
+
+def load_tensor_file(path) -> Union[dict, TensorStore]:
+    """Opens a file of player tensors, a store for .npy and parsed json otherwise
+
+    Parameters
+    ----------
+    path : str or Path
+        the .npy tensor array of a store or a json file
+
+    Returns
+    -------
+    Union[dict, TensorStore]
+        indexable by str(player_id) either way
+    """
+    if Path(path).suffix == ".npy":
+        return TensorStore(path)
+    with open(path) as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    for path in sys.argv[1:]:
+        print(f"{path} -> {convert_tensor_json(path)}")
@@ -0,0 +1,68 @@
+"""Config file for tests of the game level modules (transition matrices, solvers)"""
+import numpy as np
+
+from pitch_zone_config import gen_pitches, gen_counts
+from state_action_enums import Outcomes
+
+TEST_COV_MATRIX = np.array([[0.09, -0.03],
+                            [-0.03, 0.12]])
+
+TEST_PITCHES = gen_pitches()
+TEST_COUNTS = gen_counts()
+
+
+def gen_test_acc_mat() -> dict:
+    """Generates the analytic accuracy matrix of every pitch for TEST_COV_MATRIX
+
+    Returns
+    -------
+    dict
+        an accuracy matrix dict to index [pitch][int_zone][act_zone] = %in_act_zone
+    """
+    return {p_name: pitch.calc_acc_matrix(TEST_COV_MATRIX)
+            for p_name, pitch in TEST_PITCHES.items()}
+
+
+def gen_test_take_mat(seed: int = 0) -> dict:
+    """Generates a random take matrix, about 30% of ball zones are take zones
+
+    Returns
+    -------
+    dict
+        dict[pitch][ball_zone][count] = True if the batter takes
+    """
+    rng = np.random.default_rng(seed)
+    return {p_name: {f"{zone}a": {c.state_name: bool(rng.random() < 0.3) for c in TEST_COUNTS}
+                     for zone in range(9, 17)}
+            for p_name in TEST_PITCHES}
+
+
+def gen_test_swing_trans_mat(take_mat: dict, seed: int = 0) -> dict:
+    """Generates a random swing transition matrix with the layout of gen_swing_trans_matrix
+
+    Returns
+    -------
+    dict
+        dict[pitch][zone][count][outcome] = %outcome
+    """
+    rng = np.random.default_rng(seed)
+    swing_trans_mat = {}
+    for p_name, pitch in TEST_PITCHES.items():
+        swing_trans_mat[p_name] = {}
+        zones = [zone.name for zone in pitch.zones.strike_zones + pitch.zones.ball_zones]
+        zones += pitch.zones.obvious_zones.get_zone_names()[:-1]
+        for zone in zones:
+            swing_trans_mat[p_name][zone] = {}
+            for count in TEST_COUNTS:
+                c_name = count.state_name
+                if zone[-1] == "b" or take_mat[p_name].get(zone, {}).get(c_name):
+                    swing_trans_mat[p_name][zone][c_name] = {Outcomes.BALL.value: 1}
+                else:
+                    probs = rng.dirichlet(np.ones(4))
+                    swing_trans_mat[p_name][zone][c_name] = {
+                        Outcomes.STRIKE.value: probs[0],
+                        Outcomes.FOUL.value: probs[1],
+                        Outcomes.OUT.value: probs[2],
+                        Outcomes.HIT.value: probs[3],
+                    }
+    return swing_trans_mat
@@ -0,0 +1,146 @@
+"""Transition Tensor Module
+
+Dense array form of the transition probability matrix. Axes are fixed by the enums:
+
+    probs[pitch][zone][count][batact][outcome]
+
+with pitches in PitchNames order, zones in StrikeZoneNames, BallZoneNames and then
+ObviousZoneNames order, counts in CountStates order, batter actions in BatActs order
+and outcomes in Outcomes order (error zones, -1, are left out).
+"""
+import numpy as np
+
+from pitches.pitch_zone_enums import (
+    BallZoneNames, ObviousZoneNames, PitchNames, StrikeZoneNames
+)
+from state_action_enums import BatActs, CountStates, Outcomes
+
+PITCHES = [p.value for p in PitchNames]
+STRIKE_ZONES = [z.value for z in StrikeZoneNames]
+BALL_ZONES = [z.value for z in BallZoneNames if z is not BallZoneNames.ERROR]
+OBVIOUS_ZONES = [z.value for z in ObviousZoneNames if z is not ObviousZoneNames.ERROR]
+ZONES = STRIKE_ZONES + BALL_ZONES + OBVIOUS_ZONES
+COUNTS = [c.value for c in CountStates]
+BATACTS = [a.value for a in BatActs]
+OUTCOMES = [o.value for o in Outcomes]
+
+PITCH_INDEX = {name: i for i, name in enumerate(PITCHES)}
+ZONE_INDEX = {name: i for i, name in enumerate(ZONES)}
+COUNT_INDEX = {name: i for i, name in enumerate(COUNTS)}
+BATACT_INDEX = {name: i for i, name in enumerate(BATACTS)}
+OUTCOME_INDEX = {name: i for i, name in enumerate(OUTCOMES)}
+
+# outcomes a take can lead to, the swing row of the dict form has every outcome
+TAKE_OUTCOMES = [Outcomes.STRIKE.value, Outcomes.BALL.value]
+
+
+class TransitionTensor:
+    """Class used to represent the transition probability matrix as a dense array
+
+    Attributes
+    ----------
+    probs : np.ndarray
+        (pitches, zones, counts, batacts, outcomes) array of transition probabilities
+    zone_mask : np.ndarray
+        (pitches, zones) boolean array, true for the zones a pitch can be aimed at
+
+    Methods
+    -------
+    from_dict(trans_prob_mat)
+        builds the tensor from a trans_prob_mat dict
+    to_dict()
+        returns the trans_prob_mat dict used by existing callers
+    get_actions()
+        returns the (pitch, zone) name of every pitcher action, in tensor order
+    """
+
+    def __init__(self, probs: np.ndarray, zone_mask: np.ndarray) -> None:
+        """Instantiates TransitionTensor object
+
+        Parameters
+        ----------
+        probs : np.ndarray
+            (pitches, zones, counts, batacts, outcomes) array of transition probabilities
+        zone_mask : np.ndarray
+            (pitches, zones) boolean array, true for the zones a pitch can be aimed at
+        """
+        self.probs = probs
+        self.zone_mask = zone_mask
+
+    @classmethod
+    def from_dict(cls, trans_prob_mat: dict) -> "TransitionTensor":
+        """Builds the tensor from a dict[pitch][zone][count][batact][outcome]
+
+        Parameters
+        ----------
+        trans_prob_mat : dict
+            dict[pitch][zone][count][batact][outcome] = transition_probability
+
+        Returns
+        -------
+        TransitionTensor
+            the same probabilities as a dense array
+        """
+        probs = np.zeros((len(PITCHES), len(ZONES), len(COUNTS),
+                          len(BATACTS), len(OUTCOMES)))
+        zone_mask = np.zeros((len(PITCHES), len(ZONES)), dtype=bool)
+        for pitch, zones in trans_prob_mat.items():
+            p_ind = PITCH_INDEX[pitch]
+            for zone, counts in zones.items():
+                z_ind = ZONE_INDEX[zone]
+                zone_mask[p_ind, z_ind] = True
+                for count, batacts in counts.items():
+                    c_ind = COUNT_INDEX[count]
+                    for batact, outcomes in batacts.items():
+                        a_ind = BATACT_INDEX[batact]
+                        for outcome, prob in outcomes.items():
+                            probs[p_ind, z_ind, c_ind, a_ind, OUTCOME_INDEX[outcome]] = prob
+        return cls(probs, zone_mask)
+
+    def to_dict(self) -> dict:
+        """Returns the tensor as a dict[pitch][zone][count][batact][outcome]
+
+        Returns
+        -------
+        dict
+            trans_prob_mat dict with the layout returned by gen_trans_prob_mat
+        """
+        probs = self.probs.tolist()
+        trans_prob_mat = {}
+        for p_ind, pitch in enumerate(PITCHES):
+            if not self.zone_mask[p_ind].any():
+                continue
+            trans_prob_mat[pitch] = {}
+            for z_ind in np.flatnonzero(self.zone_mask[p_ind]):
+                trans_prob_mat[pitch][ZONES[z_ind]] = {}
+                for c_ind, count in enumerate(COUNTS):
+                    row = probs[p_ind][z_ind][c_ind]
+                    take = row[BATACT_INDEX[BatActs.TAKE.value]]
+                    swing = row[BATACT_INDEX[BatActs.SWING.value]]
+                    trans_prob_mat[pitch][ZONES[z_ind]][count] = {
+                        BatActs.TAKE.value: {
+                            outcome: take[OUTCOME_INDEX[outcome]] for outcome in TAKE_OUTCOMES
+                        },
+                        BatActs.SWING.value: {
+                            outcome: swing[o_ind] for o_ind, outcome in enumerate(OUTCOMES)
+                        },
+                    }
+        return trans_prob_mat
+
+    def get_actions(self) -> list:
+        """Returns the (pitch, zone) name of every pitcher action
+
+        Returns
+        -------
+        list
+            (pitch, zone) tuples in the order of np.nonzero(zone_mask)
+        """
+        return [(PITCHES[p_ind], ZONES[z_ind]) for p_ind, z_ind in zip(*np.nonzero(self.zone_mask))]
+
+    def __repr__(self):
+        """Displays the inputs used to instantiate the object"""
+        return f"TransitionTensor({repr(self.probs)}, {repr(self.zone_mask)})"
+
+    def __str__(self):
+        """Prints the shape of the tensor and the number of pitcher actions"""
+        return f"TransitionTensor: shape {self.probs.shape}, {self.zone_mask.sum()} actions"
@@ -0,0 +1,60 @@
+"""Batch Game Test Module"""
+import unittest
+
+import numpy as np
+
+from batch_game import BatchStochasticGame, solve_many
+from pitch_zone_config import gen_trans_prob_tensor
+from stochastic_game import StochasticGame
+from test_config import (
+    TEST_COUNTS, gen_test_acc_mat, gen_test_swing_trans_mat, gen_test_take_mat
+)
+from trans_tensor import TransitionTensor
+
+
+class TestBatchStochasticGameClass(unittest.TestCase):
+    """Test BatchStochasticGame class"""
+
+    def setUp(self):
+        acc_mat = gen_test_acc_mat()
+        self.trans_tensors = []
+        for seed in range(4):
+            take_mat = gen_test_take_mat(seed)
+            self.trans_tensors.append(gen_trans_prob_tensor(
+                gen_test_swing_trans_mat(take_mat, seed), acc_mat))
+
+    def test_solve_many(self):
+        """Test solve_many matches solving every matchup with StochasticGame"""
+        state_vals, policies = solve_many(TEST_COUNTS, self.trans_tensors)
+        self.assertEqual(state_vals.shape, (len(self.trans_tensors), len(TEST_COUNTS)))
+
+        for n_ind, trans_tensor in enumerate(self.trans_tensors):
+            game = StochasticGame(TEST_COUNTS, trans_tensor, lp_backend="breakpoint")
+            solution = game.run_backward_induction()
+            np.testing.assert_allclose(state_vals[n_ind], solution.values, atol=1e-12)
+
+            for state in TEST_COUNTS:
+                policy = policies[n_ind][state.state_name]
+                self.assertEqual(policy.keys(), solution.policy[state.state_name].keys())
+                weights = [w for zones in policy.values() for w in zones.values()]
+                self.assertAlmostEqual(sum(weights), 1)
+
+    def test_valid_actions(self):
+        """Test actions outside the zone mask of a matchup get no weight"""
+        masked = self.trans_tensors[0]
+        zone_mask = masked.zone_mask.copy()
+        zone_mask[0] = False
+        masked = TransitionTensor(masked.probs * zone_mask[:, :, None, None, None], zone_mask)
+
+        game = BatchStochasticGame.from_tensors(TEST_COUNTS, [masked, self.trans_tensors[1]])
+        state_vals, weights = game.solve()
+        self.assertEqual(weights.shape, (2, len(TEST_COUNTS), len(game.actions)))
+        self.assertTrue(np.all(weights[0][:, ~game.valid[0]] == 0))
+
+        single = StochasticGame(TEST_COUNTS, masked, lp_backend="breakpoint")
+        np.testing.assert_allclose(state_vals[0], single.run_backward_induction().values,
+                                   atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
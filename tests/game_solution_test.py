@@ -0,0 +1,37 @@
+"""Game Solution Test Module"""
+import unittest
+
+import numpy as np
+
+from game_solution import GameSolution
+
+
+class TestGameSolutionClass(unittest.TestCase):
+    """Test GameSolution class"""
+
+    def setUp(self):
+        self.policy = {"00": {"FF": {"1a": 1.0}}, "01": {"FF": {"2a": 1.0}}}
+
+    def test_unpack(self):
+        """Test GameSolution unpacks to (state_vals, policy) with the final value last"""
+        solution = GameSolution(["00", "01"], np.array([0.3, 0.2]), self.policy,
+                                prev_values=np.array([0.25, 0.2]), iterations=4)
+        state_vals, policy = solution
+        self.assertEqual(state_vals, {"00": [0.25, 0.3], "01": [0.2, 0.2]})
+        self.assertEqual(policy, self.policy)
+        self.assertAlmostEqual(solution.residual, 0.05)
+
+    def test_get_state_vals(self):
+        """Test GameSolution.get_state_vals with and without history"""
+        history = [np.zeros(2), np.array([0.2, 0.1]), np.array([0.3, 0.2])]
+        solution = GameSolution(["00", "01"], history[-1], self.policy,
+                                prev_values=history[-2], iterations=2, history=history)
+        self.assertEqual(solution.get_state_vals()["00"], [0.0, 0.2, 0.3])
+
+        exact = GameSolution(["00", "01"], np.array([0.3, 0.2]), self.policy)
+        self.assertEqual(exact.get_state_vals(), {"00": [0.3], "01": [0.2]})
+        self.assertEqual(exact.residual, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,26 @@
+"""Import Time Test Module"""
+import os
+import unittest
+from pathlib import Path
+
+from benchmarks.import_time import MODULES, import_time
+
+
+class TestImportTime(unittest.TestCase):
+    """Guard the cold start of the pitcherpolicy modules"""
+
+    def test_no_heavy_imports(self):
+        """Test no module loads tensorflow, keras or matplotlib at import time"""
+        # the subprocesses import from the working directory, as the benchmark does
+        cwd = os.getcwd()
+        os.chdir(Path(__file__).parent.parent / "pitcherpolicy")
+        try:
+            for module in MODULES:
+                _, heavy = import_time(module, repeats=1)
+                self.assertEqual(heavy, [], f"importing {module} loads {heavy}")
+        finally:
+            os.chdir(cwd)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+"""Matrix Game Test Module"""
+import unittest
+
+import numpy as np
+
+from ortools.linear_solver import pywraplp
+
+from matrix_game import (
+    GlopMatrixGame, solve_breakpoint_game, solve_glop_game, solve_many_breakpoint_games
+)
+
+
+class TestMatrixGame(unittest.TestCase):
+    """Test the matrix game solvers"""
+
+    def assert_optimal(self, value, weights, swing_q, take_q, max_pitch_pct):
+        """Checks weights are feasible and reach value"""
+        self.assertAlmostEqual(weights.sum(), 1)
+        self.assertGreaterEqual(weights.min(), -1e-12)
+        self.assertLessEqual(weights.max(), max_pitch_pct + 1e-12)
+        self.assertAlmostEqual(max(weights @ swing_q, weights @ take_q), value)
+
+    def test_breakpoint_matches_glop(self):
+        """Test solve_breakpoint_game against GLOP on random instances"""
+        rng = np.random.default_rng(0)
+        for _ in range(200):
+            n_actions = int(rng.integers(2, 80))
+            max_pitch_pct = float(rng.choice([1.0, 0.7, 0.5, 0.25, 0.1]))
+            if n_actions * max_pitch_pct < 1:
+                continue
+            swing_q = rng.uniform(0, 1, n_actions)
+            take_q = rng.uniform(0, 1, n_actions)
+            if rng.random() < 0.5:
+                # coarse values give ties and degenerate programs
+                swing_q, take_q = np.round(swing_q, 1), np.round(take_q, 1)
+
+            glop_value, glop_weights = solve_glop_game(swing_q, take_q, max_pitch_pct)
+            value, weights = solve_breakpoint_game(swing_q, take_q, max_pitch_pct)
+
+            self.assertAlmostEqual(value, glop_value)
+            self.assert_optimal(value, weights, swing_q, take_q, max_pitch_pct)
+            self.assert_optimal(value, glop_weights, swing_q, take_q, max_pitch_pct)
+
+    def test_glop_resolve(self):
+        """Test re-solving a GlopMatrixGame matches new models and reuses the basis"""
+        rng = np.random.default_rng(1)
+        swing_q = rng.uniform(0, 1, 40)
+        take_q = rng.uniform(0, 1, 40)
+        model = GlopMatrixGame(40, 0.7)
+        model.solve(swing_q, take_q)
+        first_iterations = model.iterations
+        for _ in range(9):
+            value, weights = model.solve(swing_q, take_q)
+            self.assertEqual(model.status, pywraplp.Solver.OPTIMAL)
+            self.assertAlmostEqual(value, solve_glop_game(swing_q, take_q, 0.7)[0])
+            self.assert_optimal(value, weights, swing_q, take_q, 0.7)
+            swing_q = swing_q + rng.normal(0, 1e-4, 40)
+            take_q = take_q + rng.normal(0, 1e-4, 40)
+
+        self.assertEqual(model.n_solves, 10)
+        # small changes keep the optimal basis, so later solves take no iterations
+        self.assertLess(model.total_iterations, 2 * first_iterations)
+
+        with self.assertRaises(ValueError):
+            model.solve(swing_q[:-1], take_q[:-1])
+
+    def test_solve_many(self):
+        """Test solve_many_breakpoint_games matches solving the games one at a time"""
+        rng = np.random.default_rng(2)
+        for max_pitch_pct in [1.0, 0.7, 0.3]:
+            swing_q = np.round(rng.uniform(0, 1, (50, 30)), 2)
+            take_q = np.round(rng.uniform(0, 1, (50, 30)), 2)
+            valid = rng.random((50, 30)) < 0.8
+            valid[:, :4] = True
+
+            values, weights = solve_many_breakpoint_games(swing_q, take_q, max_pitch_pct, valid)
+            self.assertTrue(np.all(weights[~valid] == 0))
+            for n_ind in range(50):
+                value, _ = solve_breakpoint_game(swing_q[n_ind][valid[n_ind]],
+                                                 take_q[n_ind][valid[n_ind]], max_pitch_pct)
+                self.assertAlmostEqual(values[n_ind], value)
+                self.assert_optimal(value, weights[n_ind], swing_q[n_ind], take_q[n_ind],
+                                    max_pitch_pct)
+
+    def test_breakpoint_mixed(self):
+        """Test solve_breakpoint_game on a game that needs a mixed policy"""
+        # pitching a strike is bad if the batter swings, a ball is bad if the batter takes
+        value, weights = solve_breakpoint_game(np.array([0.6, 0.0]), np.array([0.0, 0.4]), 1)
+        self.assertAlmostEqual(value, 0.24)
+        np.testing.assert_allclose(weights, [0.4, 0.6])
+
+    def test_breakpoint_infeasible(self):
+        """Test solve_breakpoint_game raises when the caps cannot sum to 1"""
+        with self.assertRaises(ValueError):
+            solve_breakpoint_game(np.zeros(2), np.zeros(2), 0.4)
+
+
+if __name__ == '__main__':
+    unittest.main()
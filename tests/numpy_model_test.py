@@ -0,0 +1,128 @@
+"""NumPy Model Test Module"""
+import importlib.util
+import subprocess
+import sys
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+import numpy as np
+
+from numpy_model import NumpyModel, SplitModel, get_same_padding, max_pool2d
+from pitch_encoding import get_swing_layout, get_take_layout
+from pitch_zone_config import gen_pitches
+from sweep import MODEL_PATHS, load_models
+
+
+class TestNumpyModel(unittest.TestCase):
+    """Test NumpyModel against keras with the models in the repository"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        pitches = gen_pitches()
+        pitcher, batter = rng.random((5, 5, 12)), rng.random((5, 5, 12))
+        self.inputs = {
+            "take": get_take_layout(pitches).get_inputs([batter]),
+            "transition": get_swing_layout(pitches).get_inputs([pitcher, batter]),
+            "error": [rng.random((6, 5, 5, 12)), np.eye(6)],
+        }
+
+    def test_same_padding(self):
+        """Test the odd cell of "same" padding goes after, as in tensorflow"""
+        self.assertEqual(get_same_padding(5, 4, 1), (1, 2))
+        self.assertEqual(get_same_padding(5, 2, 2), (0, 1))
+        self.assertEqual(get_same_padding(1, 2, 2), (0, 1))
+        x = np.arange(5.0).reshape(1, 5, 1, 1)
+        np.testing.assert_array_equal(max_pool2d(x)[0, :, 0, 0], [1, 3, 4])
+
+    def test_outputs(self):
+        """Test every model has the output shapes of the keras model"""
+        model = NumpyModel.from_h5(MODEL_PATHS["error"])
+        outputs = model.predict(self.inputs["error"])
+        self.assertEqual(len(outputs), 5)
+        self.assertEqual(outputs[0].shape, (6, 1))
+
+        probs = NumpyModel.from_h5(MODEL_PATHS["transition"]).predict(self.inputs["transition"])
+        np.testing.assert_allclose(probs.sum(axis=1), 1, rtol=1e-6)
+
+    def test_split_model(self):
+        """Test the split model matches the full one and encodes each player once"""
+        model = NumpyModel.from_h5(MODEL_PATHS["transition"])
+        split_model = SplitModel(model)
+        self.assertEqual(split_model.branches["pitcher"], "flatten_pitcher")
+        self.assertEqual(split_model.branches["strike_count"], "strike_count")
+
+        inputs = self.inputs["transition"]
+        np.testing.assert_allclose(split_model.predict(inputs), model.predict(inputs),
+                                   rtol=1e-6, atol=1e-7)
+        # one pitcher, one batter and the distinct pitch encodings
+        n_pitch_rows = len({row.tobytes() for row in inputs[4]})
+        self.assertEqual(split_model.misses, 2 + n_pitch_rows)
+
+        # a new batter is the only row encoded again
+        inputs = [inputs[0], np.broadcast_to(inputs[1][0] + 1, inputs[1].shape)] + inputs[2:]
+        np.testing.assert_allclose(split_model.predict(inputs), model.predict(inputs),
+                                   rtol=1e-6, atol=1e-7)
+        self.assertEqual(split_model.misses, 3 + n_pitch_rows)
+
+    def test_split_model_threads(self):
+        """Test threads predicting the same players encode every row once"""
+        model = NumpyModel.from_h5(MODEL_PATHS["transition"])
+        split_model = SplitModel(model)
+        run = model.run
+
+        def slow_run(values, layers):
+            # widen the window in which threads miss the same rows
+            time.sleep(.02)
+            return run(values, layers)
+
+        model.run = slow_run
+        inputs = self.inputs["transition"]
+        with ThreadPoolExecutor(4) as pool:
+            outputs = list(pool.map(lambda _: split_model.predict(inputs), range(8)))
+        for output in outputs:
+            np.testing.assert_array_equal(output, outputs[0])
+        n_pitch_rows = len({row.tobytes() for row in inputs[4]})
+        self.assertEqual(split_model.misses, 2 + n_pitch_rows)
+        # no counter update is lost
+        serial = SplitModel(NumpyModel.from_h5(MODEL_PATHS["transition"]))
+        serial.predict(inputs)
+        self.assertEqual(split_model.hits + split_model.misses,
+                         8 * (serial.hits + serial.misses))
+
+    @unittest.skipIf(importlib.util.find_spec("tensorflow") is None, "tensorflow is not installed")
+    def test_keras(self):
+        """Test the NumPy forward pass matches keras to float32 rounding"""
+        keras_models = load_models(MODEL_PATHS, "keras")
+        numpy_models = load_models(MODEL_PATHS, "numpy")
+        for name, inputs in self.inputs.items():
+            expected = keras_models[name].predict(inputs, verbose=0)
+            actual = numpy_models[name].predict(inputs)
+            if name == "error":
+                expected, actual = np.concatenate(expected, 1), np.concatenate(actual, 1)
+            np.testing.assert_allclose(actual, expected, rtol=1e-5, atol=1e-5, err_msg=name)
+
+    def test_no_tensorflow(self):
+        """Test a matchup is solved with the NumPy backend without importing tensorflow"""
+        script = (
+            "import sys\n"
+            "import numpy as np\n"
+            "from matchup import solve_matchup\n"
+            "from pitch_zone_config import gen_counts, gen_pitches\n"
+            "from sweep import MODEL_PATHS, load_models\n"
+            "rng = np.random.default_rng(0)\n"
+            "solution = solve_matchup(load_models(MODEL_PATHS), rng.random((5, 5, 12)),\n"
+            "                         rng.random((5, 5, 12)), gen_pitches(), gen_counts(),\n"
+            "                         method='backward_induction', acc_method='analytic')\n"
+            "assert 0 < solution.values.min()\n"
+            "assert 'tensorflow' not in sys.modules\n"
+        )
+        pitcherpolicy_dir = Path(__file__).parent.parent / "pitcherpolicy"
+        result = subprocess.run([sys.executable, "-c", script], cwd=pitcherpolicy_dir,
+                                capture_output=True, text=True)
+        self.assertEqual(result.returncode, 0, result.stderr)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""Pipeline Test Module"""
+import threading
+import time
+import unittest
+
+from pipeline import Pipeline, Stage
+
+
+class TestPipeline(unittest.TestCase):
+    """Test Pipeline ordering, errors, backpressure and stats"""
+
+    def test_run(self):
+        """Test results come back in item order with several workers per stage"""
+        pipeline = Pipeline([
+            Stage("double", lambda x: 2 * x, 3),
+            # later items finish first
+            Stage("sleep", lambda x: time.sleep(.001 * (20 - x) % 7) or x + 1, 4),
+        ], queue_size=2)
+        self.assertEqual(pipeline.run(range(10)), [2 * x + 1 for x in range(10)])
+
+        stats = dict(pipeline.get_stats())
+        self.assertEqual(stats["double"]["items"], 10)
+        self.assertEqual(stats["sleep"]["workers"], 4)
+        self.assertIn("sleep", pipeline.format_stats())
+        self.assertEqual(pipeline.run([]), [])
+
+    def test_threads_exit(self):
+        """Test every worker thread exits after a run with several workers per stage"""
+        before = set(threading.enumerate())
+        pipeline = Pipeline([Stage("a", int, 2), Stage("b", int, 3), Stage("c", int, 2)])
+        for _ in range(3):
+            self.assertEqual(pipeline.run(range(10)), list(range(10)))
+        for thread in set(threading.enumerate()) - before:
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+
+    def test_error(self):
+        """Test the exception of an item is raised in its turn, after earlier results"""
+        def check(x):
+            if x == 3:
+                raise KeyError(x)
+            return x
+
+        results = []
+        with self.assertRaises(KeyError):
+            pipeline = Pipeline([Stage("check", check), Stage("copy", int, 2)])
+            for result in pipeline.imap(range(6)):
+                results.append(result)
+        self.assertEqual(results, [0, 1, 2])
+
+        with self.assertRaises(ValueError):
+            Stage("none", int, 0)
+        with self.assertRaises(ValueError):
+            Pipeline([Stage("copy", int)], queue_size=0)
+
+    def test_backpressure(self):
+        """Test a slow stage keeps the fast stage before it at most a queue ahead"""
+        started, finished = [], []
+        release = threading.Event()
+
+        def fast(x):
+            started.append(x)
+            return x
+
+        def slow(x):
+            release.wait()
+            finished.append(x)
+            return x
+
+        pipeline = Pipeline([Stage("fast", fast), Stage("slow", slow)], queue_size=2)
+        thread = threading.Thread(target=pipeline.run, args=(range(20),))
+        thread.start()
+        time.sleep(.2)
+        # one item in slow, two waiting in its queue, one blocked in fast
+        self.assertLessEqual(len(started), 4)
+        release.set()
+        thread.join()
+        self.assertEqual(finished, list(range(20)))
+
+        stats = dict(pipeline.get_stats())
+        self.assertGreater(stats["fast"]["blocked"], .1)
+        self.assertGreater(stats["slow"]["utilization"], stats["fast"]["utilization"])
+
+
+if __name__ == '__main__':
+    unittest.main()
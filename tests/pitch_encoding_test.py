@@ -0,0 +1,54 @@
+"""Pitch Encoding Test Module"""
+import unittest
+
+import numpy as np
+
+from pitch_encoding import PITCH_MATRICES, PITCH_TYPES, get_swing_layout, get_take_layout
+from pitch_zone_config import gen_pitches, get_pitch_matrix
+
+
+class TestPitchEncoding(unittest.TestCase):
+    """Test the pitch encoding table and the batch layouts"""
+
+    def setUp(self):
+        self.pitches = gen_pitches()
+
+    def test_pitch_matrices(self):
+        """Test every encoding marks its zone cells in its pitch channel only"""
+        self.assertFalse(PITCH_MATRICES.flags.writeable)
+        for p_ind, pitch_type in enumerate(PITCH_TYPES):
+            # a corner zone is one cell, an edge zone three
+            self.assertEqual(get_pitch_matrix(9, pitch_type)[0, 0, p_ind], 1)
+            self.assertEqual(get_pitch_matrix(9, pitch_type).sum(), 1)
+            self.assertEqual(get_pitch_matrix(10, pitch_type)[1:4, 0, p_ind].sum(), 3)
+            self.assertEqual(get_pitch_matrix(10, pitch_type).sum(), 3)
+            self.assertEqual(get_pitch_matrix(4, pitch_type)[2, 2, p_ind], 1)
+
+    def test_take_layout(self):
+        """Test the take rows are every pitch, ball zone and count, in loop order"""
+        layout = get_take_layout(self.pitches)
+        self.assertIs(layout, get_take_layout(self.pitches))
+        self.assertEqual(len(layout.keys), len(self.pitches) * 8 * 12)
+        self.assertEqual(layout.keys[:2], [("FF", "9a", "00"), ("FF", "9a", "10")])
+        pitch_type, zone, count = layout.keys[13]
+        np.testing.assert_array_equal(layout.pitch_tensors[13],
+                                      get_pitch_matrix(int(zone[:-1]), pitch_type))
+        self.assertEqual((layout.b_counts[13], layout.s_counts[13]),
+                         (int(count[0]), int(count[1])))
+
+    def test_get_inputs(self):
+        """Test player tensors are broadcast, not copied, over the selected rows"""
+        layout = get_swing_layout(self.pitches)
+        self.assertTrue(all(zone[-1] == "a" for _, zone, _ in layout.keys))
+        pitcher, batter = np.zeros((5, 5, 12)), np.ones((5, 5, 12))
+        rows = np.arange(len(layout.keys)) % 3 == 0
+
+        inputs = layout.get_inputs([pitcher, batter], rows)
+        self.assertEqual(len(inputs), 5)
+        self.assertEqual(inputs[0].shape, (rows.sum(), 5, 5, 12))
+        self.assertTrue(np.shares_memory(inputs[1], batter))
+        np.testing.assert_array_equal(inputs[4], layout.pitch_tensors[rows])
+
+
+if __name__ == '__main__':
+    unittest.main()
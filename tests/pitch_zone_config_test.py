@@ -0,0 +1,61 @@
+"""Pitch Zone Config Test Module"""
+import unittest
+
+import numpy as np
+
+from pitch_zone_config import gen_acc_mat, gen_pitches
+from sweep import MODEL_PATHS, load_models
+
+
+class TestGenAccMat(unittest.TestCase):
+    """Test gen_acc_mat with the error model in the repository and a random pitcher"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.models = load_models({"error": MODEL_PATHS["error"]})
+        cls.pitches = gen_pitches()
+
+    def setUp(self):
+        self.pitcher = np.random.default_rng(0).random((5, 5, 12))
+
+    def test_acc_mat_threads(self):
+        """Test the accuracy matrix is the same bit for bit on a thread pool"""
+        for method in ["simulation", "halton", "adaptive"]:
+            acc_mat = gen_acc_mat(self.models["error"], self.pitcher, self.pitches, method)
+            self.assertEqual(acc_mat, gen_acc_mat(self.models["error"], self.pitcher,
+                                                  self.pitches, method, threads=6))
+        # the pitcher is part of the seed
+        self.assertNotEqual(acc_mat, gen_acc_mat(self.models["error"], self.pitcher,
+                                                 self.pitches, method, pitcher_key=1))
+
+    def test_acc_mat_fft(self):
+        """Test the fft accuracy matrix of the predicted covariances is close to analytic"""
+        acc_mat = gen_acc_mat(self.models["error"], self.pitcher, self.pitches, "fft")
+        analytic = gen_acc_mat(self.models["error"], self.pitcher, self.pitches, "analytic")
+        for p_name, pitch_acc in analytic.items():
+            for int_zone, err in pitch_acc.items():
+                for act_zone, prob in err.items():
+                    self.assertAlmostEqual(acc_mat[p_name][int_zone].get(act_zone, 0), prob,
+                                           delta=2e-3)
+
+    def test_acc_mat_fft_anisotropic(self):
+        """Test an error narrow on one axis is close to analytic at the floored pixel"""
+
+        class CovModel:
+            """Predicts one covariance for every pitch, as the error model does"""
+
+            def predict(self, _):
+                return [np.zeros((1, 1)), np.zeros((1, 1)), np.full((1, 1), .02 ** 2),
+                        np.full((1, 1), .7 ** 2), np.zeros((1, 1))]
+
+        pitches = {"FF": self.pitches["FF"]}
+        acc_mat = gen_acc_mat(CovModel(), self.pitcher, pitches, "fft")
+        analytic = gen_acc_mat(CovModel(), self.pitcher, pitches, "analytic")
+        for int_zone, err in analytic["FF"].items():
+            for act_zone, prob in err.items():
+                self.assertAlmostEqual(acc_mat["FF"][int_zone].get(act_zone, 0), prob,
+                                       delta=2e-3)
+
+
+if __name__ == '__main__':
+    unittest.main()
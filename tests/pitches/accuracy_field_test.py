@@ -0,0 +1,87 @@
+"""Accuracy Field Test Module"""
+import unittest
+
+import numpy as np
+
+from pitches.accuracy_field import (AccuracyField, calc_coverage, gen_empirical_kernel,
+                                    gen_gaussian_kernel, get_fast_size)
+from pitches.pitch import Pitch
+from pitches.pitch_zone_enums import PitchNames
+from pitches.test_config import TEST_ERR_DIST, TEST_ZONES
+
+
+class TestAccuracyField(unittest.TestCase):
+    """Test the FFT accuracy matrix against the analytic one"""
+
+    def setUp(self):
+        self.pitch = Pitch(PitchNames.FOUR_SEAM.value, TEST_ZONES, TEST_ERR_DIST)
+        self.cov_matrix = np.array([[0.8, -0.3], [-0.3, 1.2]])
+
+    def assert_acc_close(self, acc_mat, expected, delta):
+        """Asserts every cell of two accuracy matrices is within delta"""
+        self.assertEqual(set(acc_mat), set(expected))
+        for int_zone, err in expected.items():
+            for act_zone in set(err) | set(acc_mat[int_zone]):
+                self.assertAlmostEqual(acc_mat[int_zone].get(act_zone, 0),
+                                       err.get(act_zone, 0), delta=delta)
+
+    def test_gaussian_kernel(self):
+        """Test a Gaussian kernel gives the analytic matrix"""
+        kernel = gen_gaussian_kernel(self.cov_matrix, 0.05)
+        self.assertAlmostEqual(kernel.sum(), 1)
+        self.assertEqual(np.unravel_index(kernel.argmax(), kernel.shape),
+                         (kernel.shape[0] // 2, kernel.shape[1] // 2))
+        acc_mat = self.pitch.calc_acc_matrix_fft(kernel, 0.05)
+        for err in acc_mat.values():
+            self.assertAlmostEqual(1, sum(err.values()), places=6)
+        self.assert_acc_close(acc_mat, self.pitch.calc_acc_matrix(self.cov_matrix), 2e-4)
+
+    def test_singular_kernel(self):
+        """Test singular and slightly indefinite covariances match the simulation"""
+        for cov_matrix in [[[0.8, 0.8], [0.8, 0.8]], [[0.8, 0.85], [0.85, 0.8]]]:
+            kernel = gen_gaussian_kernel(cov_matrix, 0.05)
+            self.assertTrue(np.isfinite(kernel).all())
+            self.assertAlmostEqual(kernel.sum(), 1)
+            simulated, _ = self.pitch.run_error_sampling(np.array(cov_matrix), 8000, "halton")
+            self.assert_acc_close(self.pitch.calc_acc_matrix_fft(kernel, 0.05), simulated,
+                                  0.02)
+
+        with self.assertRaises(ValueError):
+            gen_gaussian_kernel([[np.nan, 0], [0, 1]], 0.05)
+        with self.assertRaises(ValueError):
+            gen_gaussian_kernel(self.cov_matrix, 0)
+
+    def test_empirical_kernel(self):
+        """Test a histogram of normal errors gives close to the analytic matrix"""
+        errors = np.random.default_rng(0).multivariate_normal(
+            [0, 0], self.cov_matrix, 400000)
+        kernel = gen_empirical_kernel(errors[:, 0], errors[:, 1], 0.05, 6)
+        self.assertEqual(kernel.shape, (241, 241))
+        self.assert_acc_close(self.pitch.calc_acc_matrix_fft(kernel, 0.05),
+                              self.pitch.calc_acc_matrix(self.cov_matrix), 0.005)
+
+    def test_get_zone_probs(self):
+        """Test aim points between pixels and outside the field"""
+        zone_index = TEST_ZONES.get_zone_index()
+        kernel = gen_gaussian_kernel(self.cov_matrix, 0.05)
+        field = AccuracyField.from_kernel(zone_index, kernel, 0.05, (-1, 1.5), (-2, 0))
+        x_aims, y_aims = np.array([-1, 0.333, 1.5]), np.array([-2, -0.777, 0])
+        np.testing.assert_allclose(
+            field.get_zone_probs(x_aims, y_aims),
+            zone_index.calc_zone_probs(x_aims, y_aims, self.cov_matrix), atol=1e-3)
+        with self.assertRaises(ValueError):
+            field.get_zone_probs(np.array([2.0]), np.array([0.0]))
+
+    def test_calc_coverage(self):
+        """Test pixels split between cells and unbounded outer cells"""
+        coverage = calc_coverage(np.array([0, 1, 2, 3.0]), np.array([-np.inf, 1.5, np.inf]))
+        np.testing.assert_allclose(coverage, [[1, 0], [0.5, 0.5], [0, 1]])
+
+    def test_get_fast_size(self):
+        """Test the FFT lengths are the smallest 5-smooth numbers large enough"""
+        self.assertEqual([get_fast_size(n) for n in [1, 7, 17, 97, 1000, 1025]],
+                         [1, 8, 18, 100, 1000, 1080])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+"""Bivariate Normal Test Module"""
+import math
+import unittest
+
+import numpy as np
+
+from pitches.bivariate_normal import bvn_cdf, norm_cdf
+
+
+class TestBivariateNormal(unittest.TestCase):
+    """Test norm_cdf and bvn_cdf"""
+
+    def test_norm_cdf(self):
+        """Test norm_cdf at known points"""
+        np.testing.assert_allclose(
+            norm_cdf(np.array([-np.inf, -1.96, 0, 1, np.inf])),
+            [0, 0.024997895148220435, 0.5, 0.8413447460685429, 1], atol=1e-15)
+
+    def test_bvn_cdf_origin(self):
+        """Test bvn_cdf(0, 0, rho) = 1/4 + asin(rho) / (2 pi)"""
+        for rho in [-0.999, -0.95, -0.5, -0.1, 0, 0.3, 0.8, 0.95, 0.999]:
+            self.assertAlmostEqual(bvn_cdf(np.array(0.0), np.array(0.0), rho),
+                                   0.25 + math.asin(rho) / (2 * math.pi), places=12)
+
+    def test_bvn_cdf_limits(self):
+        """Test bvn_cdf reduces to norm_cdf when one limit is infinite"""
+        k = np.linspace(-4, 4, 9)
+        np.testing.assert_allclose(bvn_cdf(np.inf, k, -0.4), norm_cdf(k), atol=1e-15)
+        np.testing.assert_allclose(bvn_cdf(-np.inf, k, 0.7), 0, atol=1e-15)
+
+    def test_bvn_cdf_symmetry(self):
+        """Test Phi2(h, k, rho) + Phi2(h, -k, -rho) = Phi(h)"""
+        rng = np.random.default_rng(0)
+        h, k = rng.uniform(-3, 3, 100), rng.uniform(-3, 3, 100)
+        for rho in [-0.97, -0.3, 0.6, 0.97]:
+            np.testing.assert_allclose(bvn_cdf(h, k, rho) + bvn_cdf(h, -k, -rho),
+                                       norm_cdf(h), atol=1e-13)
+
+
+if __name__ == '__main__':
+    unittest.main()
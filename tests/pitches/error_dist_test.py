@@ -2,6 +2,8 @@
 
 import unittest
 
+import numpy as np
+
 from pitches.error_dist import NormalErrorDistribution
 
 
@@ -23,6 +25,23 @@ class TestNormalErrorDistributionClass(unittest.TestCase):
         self.assertTrue(x_intended-x_offset < x_actual < x_intended+x_offset)
         self.assertTrue(y_intended-y_offset < y_actual < y_intended+y_offset)
 
+    def test_gen_actual_locs(self):
+        """Test NormalErrorDistribution.gen_actual_locs matches gen_actual_loc draws"""
+        x_intended, y_intended = np.array([2, 0]), np.array([-3, 1])
+
+        np.random.seed(0)
+        x_actuals, y_actuals = self.norm_err_dist.gen_actual_locs(
+            x_intended, y_intended, 5)
+        self.assertEqual(x_actuals.shape, (2, 5))
+
+        np.random.seed(0)
+        for i in range(2):
+            for trial in range(5):
+                x_actual, y_actual = self.norm_err_dist.gen_actual_loc(
+                    x_intended[i], y_intended[i])
+                self.assertEqual(x_actuals[i, trial], x_actual[0])
+                self.assertEqual(y_actuals[i, trial], y_actual[0])
+
 
 if __name__ == '__main__':
     unittest.main()
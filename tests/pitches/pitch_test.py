@@ -1,6 +1,8 @@
 """Pitch Test Module"""
 import unittest
 
+import numpy as np
+
 from pitches.pitch import Pitch
 from pitches.pitch_zone_enums import PitchNames
 from pitches.test_config import TEST_ERR_DIST, TEST_ZONES
@@ -20,6 +22,127 @@ class TestPitchClass(unittest.TestCase):
             tot = sum([e for _, e in err.items()])
             self.assertAlmostEqual(1, tot, places=3)
 
+    def test_run_error_simuation_vectorized(self):
+        """Test the vectorized simulation matches the trial by trial simulation"""
+        self.assertEqual(self.pitch.run_error_simuation(trials=200, vectorized=True),
+                         self.pitch.run_error_simuation(trials=200, vectorized=False))
+
+    def test_run_error_simulation_from_pitcher_vectorized(self):
+        """Test the vectorized pitcher simulation matches the trial by trial simulation"""
+        model = ErrorModelStub([[0.8, -0.3], [-0.3, 1.2]])
+        pitcher = np.zeros((5, 5, 12))
+        acc_mat = self.pitch.run_error_simulation_from_pitcher(
+            model, pitcher, trials=200, vectorized=True)
+        self.assertEqual(acc_mat, self.pitch.run_error_simulation_from_pitcher(
+            model, pitcher, trials=200, vectorized=False))
+        for _, err in acc_mat.items():
+            self.assertAlmostEqual(1, sum(err.values()), places=3)
+
+    def test_run_error_simulation_streams(self):
+        """Test the simulation leaves the global random state alone and keys its streams"""
+        cov_matrix = [[0.8, -0.3], [-0.3, 1.2]]
+        np.random.seed(5)
+        state = np.random.get_state()[1].copy()
+        acc_mat = self.pitch.run_error_simulation_from_cov(cov_matrix, 200)
+        np.testing.assert_array_equal(np.random.get_state()[1], state)
+
+        self.assertEqual(acc_mat, self.pitch.run_error_simulation_from_cov(cov_matrix, 200))
+        self.assertNotEqual(acc_mat, self.pitch.run_error_simulation_from_cov(
+            cov_matrix, 200, pitcher_key=1))
+        self.assertNotEqual(acc_mat, self.pitch.run_error_simulation_from_cov(
+            cov_matrix, 200, SEED=1))
+
+    def test_run_error_analytic_from_pitcher(self):
+        """Test the analytic accuracy matrix against a large simulation"""
+        model = ErrorModelStub([[0.8, -0.3], [-0.3, 1.2]])
+        pitcher = np.zeros((5, 5, 12))
+        acc_mat = self.pitch.run_error_analytic_from_pitcher(model, pitcher)
+        sim_acc_mat = self.pitch.run_error_simulation_from_pitcher(
+            model, pitcher, trials=100000)
+
+        for int_zone, err in acc_mat.items():
+            self.assertAlmostEqual(1, sum(err.values()), places=10)
+            for act_zone in set(err) | set(sim_acc_mat[int_zone]):
+                # within ~5 standard errors of the simulation
+                self.assertAlmostEqual(err.get(act_zone, 0),
+                                       sim_acc_mat[int_zone].get(act_zone, 0), delta=0.008)
+
+    def test_run_error_sampling(self):
+        """Test every sampling method against the analytic matrix and its standard errors"""
+        cov_matrix = np.array([[0.8, -0.3], [-0.3, 1.2]])
+        exact = self.pitch.calc_acc_matrix(cov_matrix)
+        for sampling in ["random", "antithetic", "halton"]:
+            acc_mat, std_err = self.pitch.run_error_sampling(cov_matrix, 4000, sampling)
+            self.assertEqual(acc_mat, self.pitch.run_error_sampling(
+                cov_matrix, 4000, sampling)[0])
+            for int_zone, err in acc_mat.items():
+                self.assertAlmostEqual(1, sum(err.values()), places=10)
+                self.assertEqual(set(err), set(std_err[int_zone]))
+                for act_zone, prob in err.items():
+                    # within 6 standard errors, with a floor for cells with few hits
+                    self.assertAlmostEqual(prob, exact[int_zone].get(act_zone, 0),
+                                           delta=6 * std_err[int_zone][act_zone] + 0.003)
+
+        with self.assertRaises(ValueError):
+            self.pitch.run_error_sampling(cov_matrix, 1001, "antithetic")
+        with self.assertRaises(ValueError):
+            self.pitch.run_error_sampling(cov_matrix, 1000, "sobol")
+
+    def test_run_error_adaptive(self):
+        """Test every zone stops once its cells are within the tolerance or at the cap"""
+        cov_matrix = np.array([[0.8, -0.3], [-0.3, 1.2]])
+        exact = self.pitch.calc_acc_matrix(cov_matrix)
+        for sampling in ["halton", "random"]:
+            acc_mat, std_err, trials = self.pitch.run_error_adaptive(
+                cov_matrix, 0.02, sampling, batch=160, max_trials=4000)
+            for int_zone, err in acc_mat.items():
+                self.assertEqual(trials[int_zone] % 160, 0)
+                self.assertLessEqual(trials[int_zone], 4000)
+                self.assertAlmostEqual(1, sum(err.values()), places=10)
+                if trials[int_zone] < 4000:
+                    self.assertLessEqual(max(std_err[int_zone].values()) * 2.365, 0.02)
+                for act_zone, prob in err.items():
+                    self.assertAlmostEqual(prob, exact[int_zone].get(act_zone, 0),
+                                           delta=0.04)
+            # zones next to many others need more draws than the first batch
+            self.assertGreater(max(trials.values()), min(trials.values()))
+
+        _, _, trials = self.pitch.run_error_adaptive(cov_matrix, 1e-6, max_trials=800)
+        self.assertEqual(set(trials.values()), {800})
+        # a cap between batches cuts the last batch, to whole antithetic pairs
+        _, _, trials = self.pitch.run_error_adaptive(cov_matrix, 1e-6, max_trials=1000)
+        self.assertEqual(set(trials.values()), {1000})
+        _, _, trials = self.pitch.run_error_adaptive(cov_matrix, 1e-6, "antithetic",
+                                                     max_trials=1000)
+        self.assertEqual(set(trials.values()), {992})
+        with self.assertRaises(ValueError):
+            self.pitch.run_error_adaptive(cov_matrix, batch=100)
+        with self.assertRaises(ValueError):
+            self.pitch.run_error_adaptive(cov_matrix, max_trials=0)
+
+    def test_run_error_simuation_sampling(self):
+        """Test the error dist simulation with halton sampling against the random one"""
+        random_acc_mat = self.pitch.run_error_simuation(trials=20000)
+        acc_mat = self.pitch.run_error_simuation(trials=2000, sampling="halton")
+        for int_zone, err in acc_mat.items():
+            for act_zone in set(err) | set(random_acc_mat[int_zone]):
+                self.assertAlmostEqual(err.get(act_zone, 0),
+                                       random_acc_mat[int_zone].get(act_zone, 0),
+                                       delta=0.02)
+
+
+class ErrorModelStub:
+    """Stands in for the error model, always predicts the same covariance matrix"""
+
+    def __init__(self, cov_matrix):
+        self.cov_matrix = cov_matrix
+
+    def predict(self, _):
+        """Returns [mu_x, mu_y, var_x, var_y, cov_x_y] like the error model"""
+        return [np.array([[0.0]]), np.array([[0.0]]),
+                np.array([[self.cov_matrix[0][0]]]), np.array([[self.cov_matrix[1][1]]]),
+                np.array([[self.cov_matrix[0][1]]])]
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,87 @@
+"""Sampling Test Module"""
+import unittest
+
+import numpy as np
+
+from pitches.sampling import (ReplicateSampler, box_muller, calc_cov_root, gen_halton,
+                              gen_std_normals, gen_zone_rngs, get_groups)
+
+
+class TestSampling(unittest.TestCase):
+    """Test the draws of the sampling methods"""
+
+    def test_gen_halton(self):
+        """Test the first Halton points and that they fill the square evenly"""
+        np.testing.assert_allclose(gen_halton(4), [[1 / 2, 1 / 3], [1 / 4, 2 / 3],
+                                                   [3 / 4, 1 / 9], [1 / 8, 4 / 9]])
+        points = gen_halton(360)
+        # every cell of a 4 x 9 grid gets its 10 points, give or take the one missing
+        # index 0 and the one extra point 360
+        cells = np.bincount((points[:, 0] * 4).astype(int) * 9
+                            + (points[:, 1] * 9).astype(int))
+        self.assertLessEqual(np.abs(cells - 10).max(), 1)
+
+    def test_box_muller(self):
+        """Test the transform gives standard normal pairs"""
+        normals = box_muller(np.random.default_rng(0).random((100000, 2)))
+        np.testing.assert_allclose(normals.mean(axis=0), 0, atol=0.01)
+        np.testing.assert_allclose(np.cov(normals.T), np.eye(2), atol=0.02)
+        self.assertTrue(np.isfinite(box_muller(np.zeros((1, 2)))).all())
+
+    def test_gen_std_normals(self):
+        """Test the shape, pairing and reproducibility of the draws"""
+        for sampling in ["random", "antithetic", "halton"]:
+            draws = gen_std_normals(sampling, 80, gen_zone_rngs(1, 0, "FF", 3))
+            self.assertEqual(draws.shape, (3, 80, 2))
+            np.testing.assert_array_equal(
+                draws, gen_std_normals(sampling, 80, gen_zone_rngs(1, 0, "FF", 3)))
+
+        draws = gen_std_normals("antithetic", 80, gen_zone_rngs(1, 0, "FF", 1))
+        np.testing.assert_array_equal(draws[0, 0::2], -draws[0, 1::2])
+
+    def test_get_groups(self):
+        """Test the groups of every method and the trials they accept"""
+        self.assertEqual(get_groups("random", 1000), 1000)
+        self.assertEqual(get_groups("antithetic", 1000), 500)
+        self.assertEqual(get_groups("halton", 1000), 8)
+        for sampling, trials in [("antithetic", 999), ("halton", 1001), ("sobol", 1000)]:
+            with self.assertRaises(ValueError):
+                get_groups(sampling, trials)
+
+    def test_replicate_sampler(self):
+        """Test halton batches continue the sequence and finished zones can be left out"""
+        sampler = ReplicateSampler("halton", gen_zone_rngs(2, 0, "FF", 3), 4)
+        first = sampler.draw(5, np.arange(3))
+        second = sampler.draw(7, np.array([0, 2]))
+        whole = ReplicateSampler("halton", gen_zone_rngs(2, 0, "FF", 3), 4).draw(
+            12, np.arange(3))
+        self.assertEqual(first.shape, (3, 4, 5, 2))
+        np.testing.assert_allclose(np.concatenate([first[[0, 2]], second], axis=2),
+                                   whole[[0, 2]])
+
+        sampler = ReplicateSampler("antithetic", gen_zone_rngs(0, 0, "FF", 2), 3)
+        draws = sampler.draw(6, np.arange(2))
+        np.testing.assert_array_equal(draws[:, :, 0::2], -draws[:, :, 1::2])
+        with self.assertRaises(ValueError):
+            sampler.draw(5, np.arange(2))
+        with self.assertRaises(ValueError):
+            ReplicateSampler("random", gen_zone_rngs(0, 0, "FF", 2), 1)
+
+    def test_gen_zone_rngs(self):
+        """Test every seed, pitcher, pitch and zone gets its own reproducible stream"""
+        streams = [rng.random(4).tolist()
+                   for key in [(0, 0, "FF"), (1, 0, "FF"), (0, 7, "FF"), (0, 0, "SL")]
+                   for rng in gen_zone_rngs(*key, 3)]
+        self.assertEqual(len({tuple(stream) for stream in streams}), len(streams))
+        self.assertEqual(streams[:3], [rng.random(4).tolist()
+                                       for rng in gen_zone_rngs(0, 0, "FF", 3)])
+
+    def test_calc_cov_root(self):
+        """Test the root of a regular and a singular covariance matrix"""
+        for cov_matrix in [[[0.8, -0.3], [-0.3, 1.2]], [[1.0, 1.0], [1.0, 1.0]]]:
+            root = calc_cov_root(cov_matrix)
+            np.testing.assert_allclose(root @ root.T, cov_matrix, atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
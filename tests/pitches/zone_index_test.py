@@ -0,0 +1,58 @@
+"""ZoneIndex Test Module"""
+import unittest
+
+import numpy as np
+
+from pitches.test_config import TEST_ZONES
+from pitches.zone_index import ZoneIndex
+from pitch_zone_config import gen_pitches
+
+
+class TestZoneIndexClass(unittest.TestCase):
+    """Test ZoneIndex class"""
+
+    def setUp(self):
+        self.rng = np.random.default_rng(0)
+
+    def assert_matches_return_zone(self, zones, x_coords, y_coords):
+        """Checks ZoneIndex.lookup against Zones.return_zone point by point"""
+        index = ZoneIndex.from_zones(zones)
+        codes = index.lookup(x_coords, y_coords)
+        expected = [zones.return_zone(x, y) for x, y in zip(x_coords, y_coords)]
+        self.assertEqual([index.names[code] for code in codes], expected)
+
+    def test_lookup_test_zones(self):
+        """Test ZoneIndex.lookup on the test zones"""
+        x_coords = self.rng.uniform(-6, 6, 20000)
+        y_coords = self.rng.uniform(-6, 6, 20000)
+        self.assert_matches_return_zone(TEST_ZONES, x_coords, y_coords)
+
+    def test_lookup_pitch_zones(self):
+        """Test ZoneIndex.lookup on every pitch's zones, including points on edges"""
+        for pitch in gen_pitches().values():
+            index = ZoneIndex.from_zones(pitch.zones)
+            x_edges, y_edges = np.meshgrid(index.get_slot_points(index.x_edges),
+                                           index.get_slot_points(index.y_edges))
+            x_coords = np.concatenate([self.rng.normal(0, 1.5, 20000), x_edges.ravel()])
+            y_coords = np.concatenate([self.rng.normal(0, 1.5, 20000), y_edges.ravel()])
+            self.assert_matches_return_zone(pitch.zones, x_coords, y_coords)
+
+    def test_lookup_nan(self):
+        """Test ZoneIndex.lookup returns the error zone for nan"""
+        index = ZoneIndex.from_zones(TEST_ZONES)
+        codes = index.lookup(np.array([np.nan, 0]), np.array([0, np.nan]))
+        self.assertEqual([index.names[code] for code in codes], ["-1", "-1"])
+
+    def test_calc_zone_probs(self):
+        """Test ZoneIndex.calc_zone_probs sums to one and leaves out the error zone"""
+        cov_matrix = np.array([[0.09, -0.03], [-0.03, 0.12]])
+        for pitch in gen_pitches().values():
+            index = pitch.zones.get_zone_index()
+            probs = index.calc_zone_probs(np.array([0, 0.5, -1.2]),
+                                          np.array([0, -0.7, 1.3]), cov_matrix)
+            np.testing.assert_allclose(probs.sum(axis=1), 1, atol=1e-12)
+            self.assertTrue((probs[:, index.error_code] == 0).all())
+
+
+if __name__ == '__main__':
+    unittest.main()
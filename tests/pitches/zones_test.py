@@ -1,6 +1,8 @@
 """ObviousZone Test Module"""
 import unittest
 
+import numpy as np
+
 from pitches.test_config import TEST_ZONES
 
 
@@ -55,6 +57,22 @@ class TestZonesClass(unittest.TestCase):
         self.assertEqual(self.zones.return_zone(0, -5), "15b")
         self.assertEqual(self.zones.return_zone(5, -5), "16b")
 
+    def test_return_zones(self):
+        """Test Zones.return_zones matches Zones.return_zone"""
+        rng = np.random.default_rng(0)
+        x_coords = rng.uniform(-6, 6, 5000)
+        y_coords = rng.uniform(-6, 6, 5000)
+
+        # points exactly on zone edges and cutoff lines
+        edges = np.arange(-5, 6)
+        x_edges, y_edges = np.meshgrid(edges, edges)
+        x_coords = np.concatenate([x_coords, x_edges.ravel()])
+        y_coords = np.concatenate([y_coords, y_edges.ravel()])
+
+        codes, names = self.zones.return_zones(x_coords, y_coords)
+        expected = [self.zones.return_zone(x, y) for x, y in zip(x_coords, y_coords)]
+        self.assertEqual([names[code] for code in codes], expected)
+
 
 if __name__ == '__main__':
     unittest.main()
@@ -0,0 +1,95 @@
+"""Player Cache Test Module"""
+import tempfile
+import threading
+import time
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+
+from pitch_zone_config import calc_take_mat, gen_pitches, gen_take_mat
+from player_cache import PlayerCache
+from sweep import MODEL_PATHS, load_models
+
+
+class TestPlayerCache(unittest.TestCase):
+    """Test PlayerCache with the models in the repository and random player tensors"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.models = load_models({name: MODEL_PATHS[name] for name in ["take", "error"]})
+        cls.pitches = gen_pitches()
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.pitcher = rng.random((5, 5, 12))
+        self.batter = rng.random((5, 5, 12))
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_take_mat(self):
+        """Test the thresholded swing probabilities match gen_take_mat"""
+        cache = PlayerCache(self.models, self.pitches)
+        expected = gen_take_mat(self.models["take"], self.batter, self.pitches, .3)
+        self.assertEqual(cache.get_take_mat(self.batter, .3), expected)
+
+        # another threshold reuses the predictions
+        swing_probs = cache.get_swing_probs(self.batter)
+        self.assertEqual(cache.get_take_mat(self.batter, .5), calc_take_mat(swing_probs, .5))
+        self.assertEqual(cache.misses, 1)
+        self.assertEqual(cache.hits, 2)
+
+    def test_acc_mat(self):
+        """Test the accuracy matrix is computed once per pitcher and method"""
+        cache = PlayerCache(self.models, self.pitches)
+        acc_mat = cache.get_acc_mat(self.pitcher, "analytic")
+        self.assertIs(cache.get_acc_mat(self.pitcher.copy(), "analytic"), acc_mat)
+        cache.get_acc_mat(self.pitcher + 1e-3, "analytic")
+        self.assertEqual(cache.misses, 2)
+
+    def test_disk(self):
+        """Test a new cache over the same directory reads the entries of the first"""
+        cache = PlayerCache(self.models, self.pitches, self.tmp_dir.name)
+        acc_mat = cache.get_acc_mat(self.pitcher, "analytic")
+        swing_probs = cache.get_swing_probs(self.batter)
+
+        disk_cache = PlayerCache(self.models, self.pitches, self.tmp_dir.name)
+        self.assertEqual(disk_cache.get_acc_mat(self.pitcher, "analytic"), acc_mat)
+        self.assertEqual(disk_cache.get_swing_probs(self.batter), swing_probs)
+        self.assertEqual(disk_cache.misses, 0)
+        self.assertEqual(disk_cache.hits, 2)
+
+    def test_disk_backend(self):
+        """Test caches of models run with another backend do not read each other"""
+        cache = PlayerCache(self.models, self.pitches, self.tmp_dir.name)
+        cache.get_swing_probs(self.batter)
+
+        numpy_models = load_models({"take": MODEL_PATHS["take"]}, "numpy")
+        disk_cache = PlayerCache(numpy_models, self.pitches, self.tmp_dir.name)
+        disk_cache.get_swing_probs(self.batter)
+        self.assertEqual((disk_cache.misses, disk_cache.hits), (1, 0))
+
+    def test_threads(self):
+        """Test threads missing the same key compute and write the entry once"""
+        cache = PlayerCache(self.models, self.pitches, self.tmp_dir.name)
+        calls = []
+        lock = threading.Lock()
+
+        def compute():
+            with lock:
+                calls.append(None)
+            time.sleep(.05)
+            return {"entry": len(calls)}
+
+        with ThreadPoolExecutor(4) as pool:
+            entries = list(pool.map(lambda _: cache.lookup("acc", "key", compute), range(8)))
+        self.assertEqual(len(calls), 1)
+        self.assertTrue(all(entry == {"entry": 1} for entry in entries))
+        self.assertEqual((cache.misses, cache.hits), (1, 7))
+        self.assertEqual(len(list(cache.cache_dir.glob("*.tmp"))), 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
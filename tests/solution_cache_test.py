@@ -0,0 +1,112 @@
+"""Solution Cache Test Module"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from game_solution import GameSolution
+from solution_cache import SolutionCache
+from sweep import run_sweep
+
+
+class TestSolutionCache(unittest.TestCase):
+    """Test SolutionCache keys, storage and eviction"""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.cache = SolutionCache(Path(self.tmp_dir.name) / "cache", max_entries=2)
+        self.model_path = Path(self.tmp_dir.name) / "model.h5"
+        self.model_path.write_bytes(b"weights")
+        self.model_paths = {"take": self.model_path}
+        self.pitcher = np.arange(12.0).reshape(3, 4)
+        self.batter = np.ones((3, 4))
+        self.solution = GameSolution(
+            ["0-0", "0-1"], np.array([.3, .2]), {"0-0": {"FF": {"11a": 1.0}}},
+            np.array([.31, .2]), 5
+        )
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_key(self, **params):
+        params = {"theta": 0.001, "max_pitch_pct": 0.7, **params}
+        return self.cache.make_key(self.pitcher, self.batter, self.model_paths, **params)
+
+    def test_round_trip(self):
+        """Test a stored solution comes back with its values and policy"""
+        key = self.make_key()
+        self.assertIsNone(self.cache.get(key))
+        self.cache.put(key, self.solution)
+
+        solution = self.cache.get(key)
+        np.testing.assert_array_equal(solution.values, self.solution.values)
+        np.testing.assert_array_equal(solution.prev_values, self.solution.prev_values)
+        self.assertEqual(solution.iterations, 5)
+        state_vals, policy = solution
+        self.assertEqual(state_vals, self.solution.get_state_vals())
+        self.assertEqual(policy, self.solution.policy)
+        self.assertEqual(self.cache.get_stats()["hits"], 1)
+        self.assertEqual(self.cache.get_stats()["misses"], 1)
+
+        # a new cache over the same directory sees the entry
+        cache = SolutionCache(self.cache.cache_dir)
+        self.assertIsNotNone(cache.get(key))
+
+    def test_key_changes(self):
+        """Test the key changes with every input"""
+        key = self.make_key()
+        self.assertEqual(key, self.make_key())
+        self.assertNotEqual(key, self.make_key(theta=0.0001))
+        self.assertNotEqual(key, self.make_key(max_pitch_pct=0.5))
+        self.assertNotEqual(key, self.make_key(p_take_threshold=.2))
+
+        self.pitcher[0, 0] += 1e-12
+        self.assertNotEqual(key, self.make_key())
+        self.pitcher[0, 0] -= 1e-12
+
+        self.model_path.write_bytes(b"retrained weights")
+        self.assertNotEqual(key, self.make_key())
+
+    def test_lru_eviction(self):
+        """Test the least recently used entry is evicted past max_entries"""
+        keys = [self.make_key(theta=theta) for theta in [.1, .01, .001]]
+        self.cache.put(keys[0], self.solution)
+        self.cache.put(keys[1], self.solution)
+        self.cache.get(keys[0])
+        self.cache.put(keys[2], self.solution)
+
+        self.assertIsNone(self.cache.get(keys[1]))
+        self.assertIsNotNone(self.cache.get(keys[0]))
+        self.assertIsNotNone(self.cache.get(keys[2]))
+        self.assertEqual(self.cache.get_stats()["evictions"], 1)
+        self.assertEqual(len(list(self.cache.cache_dir.glob("*.json"))), 2)
+
+    def test_run_sweep(self):
+        """Test a second sweep of the same matchups is answered from the cache"""
+        rng = np.random.default_rng(0)
+        tensor_paths = {}
+        for name in ["pitcher", "batter"]:
+            tensor_paths[name] = Path(self.tmp_dir.name) / f"{name}_tensors.json"
+            with open(tensor_paths[name], "w") as f:
+                json.dump({str(i): rng.random((5, 5, 12)).tolist() for i in range(2)}, f)
+        pairs = [(1, 0), (0, 1)]
+        cache = SolutionCache(Path(self.tmp_dir.name) / "sweep_cache")
+        kwargs = {"processes": 1, "tensor_paths": tensor_paths, "progress": None,
+                  "cache": cache, "method": "backward_induction", "lp_backend": "breakpoint"}
+
+        solutions = run_sweep(pairs, **kwargs)
+        self.assertEqual(cache.get_stats()["misses"], 2)
+        cached = run_sweep(pairs, **kwargs)
+        self.assertEqual(cache.get_stats()["hits"], 2)
+        for solution, cached_solution in zip(solutions, cached):
+            np.testing.assert_array_equal(solution.values, cached_solution.values)
+            self.assertEqual(solution.policy, cached_solution.policy)
+
+        run_sweep(pairs, theta=0.01, **kwargs)
+        self.assertEqual(cache.get_stats()["misses"], 4)
+
+
+if __name__ == '__main__':
+    unittest.main()
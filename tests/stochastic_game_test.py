@@ -0,0 +1,156 @@
+"""Stochastic Game Test Module"""
+import unittest
+
+import numpy as np
+from ortools.linear_solver import pywraplp
+
+from pitch_zone_config import gen_trans_prob_mat
+from stochastic_game import StochasticGame
+from state_action_enums import BatActs, Outcomes
+from test_config import (
+    TEST_COUNTS, gen_test_acc_mat, gen_test_swing_trans_mat, gen_test_take_mat
+)
+
+
+class TestStochasticGameClass(unittest.TestCase):
+    """Test StochasticGame class"""
+
+    def setUp(self):
+        take_mat = gen_test_take_mat()
+        self.trans_prob_mat = gen_trans_prob_mat(
+            gen_test_swing_trans_mat(take_mat), gen_test_acc_mat(), take_mat)
+        self.game = StochasticGame(TEST_COUNTS, self.trans_prob_mat)
+
+    def get_dict_q_vals(self, state, state_vals: dict) -> dict:
+        """Computes q_vals for one state straight from the trans_prob_mat dict"""
+        q_vals = {}
+        for pitch in self.trans_prob_mat:
+            q_vals[pitch] = {}
+            for zone in self.trans_prob_mat[pitch]:
+                q_vals[pitch][zone] = {}
+                for batact in [BatActs.SWING.value, BatActs.TAKE.value]:
+                    q_val = 0
+                    outcomes = self.trans_prob_mat[pitch][zone][state.state_name][batact]
+                    for res, res_prob in outcomes.items():
+                        nxt_state = state.get_successor(res)
+                        if nxt_state == Outcomes.HIT.value:
+                            q_val += res_prob
+                        elif nxt_state != Outcomes.OUT.value:
+                            q_val += res_prob * state_vals[nxt_state]
+                    q_vals[pitch][zone][batact] = q_val
+        return q_vals
+
+    def test_get_q_vals(self):
+        """Test StochasticGame.get_q_vals matches q_vals computed from the dict"""
+        state_vals = np.random.default_rng(0).uniform(0, 1, len(TEST_COUNTS))
+        names = {state.state_name: val for state, val in zip(TEST_COUNTS, state_vals)}
+        q_vals = self.game.get_q_vals(state_vals)
+
+        for i, state in enumerate(TEST_COUNTS):
+            dict_q_vals = self.get_dict_q_vals(state, names)
+            for j, (pitch, zone) in enumerate(self.game.actions):
+                self.assertAlmostEqual(q_vals[i, j, 0],
+                                       dict_q_vals[pitch][zone][BatActs.SWING.value])
+                self.assertAlmostEqual(q_vals[i, j, 1],
+                                       dict_q_vals[pitch][zone][BatActs.TAKE.value])
+
+    def test_run_val_iter(self):
+        """Test StochasticGame.run_val_iter converges to the fixed point of solve_lp"""
+        state_vals, policy = self.game.run_val_iter(theta=1e-6)
+        final_vals = {name: vals[-1] for name, vals in state_vals.items()}
+
+        for state in TEST_COUNTS:
+            value, _ = self.game.solve_lp(self.get_dict_q_vals(state, final_vals))
+            self.assertAlmostEqual(value, final_vals[state.state_name], places=5)
+            self.assertTrue(0 <= final_vals[state.state_name] <= 1)
+
+            weights = [w for zones in policy[state.state_name].values() for w in zones.values()]
+            self.assertAlmostEqual(sum(weights), 1)
+            self.assertLessEqual(max(weights), self.game.max_pitch_pct + 1e-9)
+
+    def test_lp_stats(self):
+        """Test run_val_iter re-solves one GLOP model per state and records every solve"""
+        state_vals, _ = self.game.run_val_iter()
+        sweeps = len(state_vals[TEST_COUNTS[0].state_name]) - 1
+
+        self.assertEqual(len(self.game.lp_stats), sweeps * len(TEST_COUNTS))
+        self.assertTrue(all(stat["status"] == pywraplp.Solver.OPTIMAL for stat in self.game.lp_stats))
+        for model in self.game.lp_models:
+            self.assertEqual(model.n_solves, sweeps)
+
+    def test_get_solve_order(self):
+        """Test StochasticGame.get_solve_order puts every successor before its state"""
+        order = self.game.get_solve_order(TEST_COUNTS)
+        self.assertEqual(sorted(order), list(range(len(TEST_COUNTS))))
+
+        position = {TEST_COUNTS[i].state_name: pos for pos, i in enumerate(order)}
+        for state in TEST_COUNTS:
+            for res in [o.value for o in Outcomes]:
+                nxt_state = state.get_successor(res)
+                if nxt_state in position and nxt_state != state.state_name:
+                    self.assertLess(position[nxt_state], position[state.state_name])
+
+    def test_run_backward_induction(self):
+        """Test backward induction matches value iteration run to convergence"""
+        state_vals, policy = self.game.run_backward_induction()
+        vi_vals, _ = self.game.run_val_iter(theta=1e-12)
+
+        for state in TEST_COUNTS:
+            self.assertEqual(len(state_vals[state.state_name]), 1)
+            self.assertAlmostEqual(state_vals[state.state_name][-1],
+                                   vi_vals[state.state_name][-1], places=10)
+            weights = [w for zones in policy[state.state_name].values() for w in zones.values()]
+            self.assertAlmostEqual(sum(weights), 1)
+
+    def test_backward_induction_solves(self):
+        """Test states without a self loop are solved with one matrix game"""
+        self.game.run_backward_induction()
+        solves = {state.state_name: 0 for state in TEST_COUNTS}
+        for stat in self.game.lp_stats:
+            solves[stat["state"]] += 1
+
+        for state in TEST_COUNTS:
+            if state.num_strikes < 2:
+                self.assertEqual(solves[state.state_name], 1)
+            else:
+                self.assertLessEqual(solves[state.state_name], 10)
+
+        with self.assertRaises(ValueError):
+            self.game.solve_game(method="policy_iteration")
+
+    def test_run_gauss_seidel(self):
+        """Test Gauss-Seidel value iteration converges to the backward induction values"""
+        exact_vals = self.game.run_backward_induction().values
+        solution = self.game.run_gauss_seidel(theta=1e-10)
+        np.testing.assert_allclose(solution.values, exact_vals, atol=1e-8)
+        self.assertLess(solution.residual, 1e-10)
+        self.assertIsNone(solution.history)
+
+        # only the previous and the final values are kept
+        state_vals, _ = solution
+        for state in TEST_COUNTS:
+            self.assertEqual(len(state_vals[state.state_name]), 2)
+
+        # in place updates need fewer sweeps than run_val_iter
+        vi_sweeps = self.game.run_val_iter(theta=1e-10).iterations
+        self.assertLess(solution.iterations, vi_sweeps)
+
+        solution = self.game.run_gauss_seidel(theta=1e-10, keep_history=True)
+        self.assertEqual(len(solution.history), solution.iterations + 1)
+
+    def test_lp_backends(self):
+        """Test the breakpoint backend gives the same state values as GLOP"""
+        glop_vals, _ = self.game.run_val_iter()
+        game = StochasticGame(TEST_COUNTS, self.trans_prob_mat, lp_backend="breakpoint")
+        state_vals, _ = game.run_val_iter()
+
+        for state in TEST_COUNTS:
+            np.testing.assert_allclose(state_vals[state.state_name],
+                                       glop_vals[state.state_name], atol=1e-9)
+
+        with self.assertRaises(ValueError):
+            StochasticGame(TEST_COUNTS, self.trans_prob_mat, lp_backend="simplex")
+
+
+if __name__ == '__main__':
+    unittest.main()
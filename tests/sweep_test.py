@@ -0,0 +1,102 @@
+"""Sweep Test Module"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from sweep import run_sweep
+
+
+class TestSweep(unittest.TestCase):
+    """Test run_sweep with the models in the repository and random player tensors"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tensor_paths = {}
+        for name in ["pitcher", "batter"]:
+            self.tensor_paths[name] = Path(self.tmp_dir.name) / f"{name}_tensors.json"
+            with open(self.tensor_paths[name], "w") as f:
+                json.dump({str(i): rng.random((5, 5, 12)).tolist() for i in range(2)}, f)
+        self.pairs = [(1, 0), (0, 1), (1, 1)]
+        self.solve_kwargs = {"method": "backward_induction", "lp_backend": "breakpoint"}
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_run_sweep(self):
+        """Test a pool gives the same solutions, in order, as solving in process"""
+        progress = []
+        solutions = run_sweep(self.pairs, processes=2, tensor_paths=self.tensor_paths,
+                              progress=lambda done, total, _: progress.append((done, total)),
+                              **self.solve_kwargs)
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+
+        serial = run_sweep(self.pairs, processes=1, tensor_paths=self.tensor_paths,
+                           progress=None, **self.solve_kwargs)
+        for solution, serial_solution in zip(solutions, serial):
+            np.testing.assert_array_equal(solution.values, serial_solution.values)
+
+    def test_pipeline(self):
+        """Test the stage pipeline gives the same solutions, in order, as solve_pair"""
+        serial = run_sweep(self.pairs, processes=1, tensor_paths=self.tensor_paths,
+                           progress=None, **self.solve_kwargs)
+        progress = []
+        solutions = run_sweep(self.pairs, tensor_paths=self.tensor_paths,
+                              progress=lambda done, total, _: progress.append((done, total)),
+                              stage_workers={"infer": 1, "build": 2, "solve": 2},
+                              queue_size=1, **self.solve_kwargs)
+        self.assertEqual(progress, [(1, 3), (2, 3), (3, 3)])
+        for solution, serial_solution in zip(solutions, serial):
+            np.testing.assert_array_equal(solution.values, serial_solution.values)
+            self.assertEqual(solution.policy, serial_solution.policy)
+
+        with self.assertRaises(ValueError):
+            run_sweep(self.pairs, tensor_paths=self.tensor_paths, progress=None,
+                      stage_workers={"predict": 1})
+
+    def test_pipeline_infer_threads(self):
+        """Test infer threads sharing a player cache on disk agree with solve_pair"""
+        serial = run_sweep(self.pairs, processes=1, tensor_paths=self.tensor_paths,
+                           progress=None, **self.solve_kwargs)
+        # (1, 0) and (1, 1) share a pitcher, so both threads miss it at once
+        for _ in range(2):
+            solutions = run_sweep(self.pairs, tensor_paths=self.tensor_paths, progress=None,
+                                  stage_workers={"infer": 2}, queue_size=1,
+                                  player_cache_dir=self.tmp_dir.name, **self.solve_kwargs)
+            for solution, serial_solution in zip(solutions, serial):
+                np.testing.assert_array_equal(solution.values, serial_solution.values)
+
+    def test_worker_error(self):
+        """Test a worker that cannot load its tensors raises instead of hanging"""
+        tensor_paths = {"pitcher": "missing.json", "batter": "missing.json"}
+        with self.assertRaises(RuntimeError):
+            run_sweep(self.pairs, processes=2, tensor_paths=tensor_paths, progress=None)
+
+    def test_worker_setup_error(self):
+        """Test an error outside of loading the files, a malformed take table, raises"""
+        take_table_path = Path(self.tmp_dir.name) / "take_table.npy"
+        np.save(take_table_path, np.zeros(1))
+        with open(take_table_path.with_suffix(".json"), "w") as f:
+            json.dump({}, f)
+        with self.assertRaises(RuntimeError):
+            run_sweep(self.pairs, processes=2, tensor_paths=self.tensor_paths,
+                      progress=None, take_table_path=take_table_path)
+
+    def test_worker_error_cleared(self):
+        """Test a sweep in process after one that could not load its tensors solves"""
+        tensor_paths = {"pitcher": "missing.json", "batter": "missing.json"}
+        for stage_workers in [None, {"build": 2}]:
+            with self.assertRaises(RuntimeError):
+                run_sweep(self.pairs, processes=1, tensor_paths=tensor_paths,
+                          progress=None, stage_workers=stage_workers)
+            solutions = run_sweep(self.pairs, processes=1, tensor_paths=self.tensor_paths,
+                                  progress=None, stage_workers=stage_workers,
+                                  **self.solve_kwargs)
+            self.assertEqual(len(solutions), len(self.pairs))
+
+
+if __name__ == '__main__':
+    unittest.main()
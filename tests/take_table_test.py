@@ -0,0 +1,115 @@
+"""Take Table Test Module"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from pitch_zone_config import gen_pitches, gen_swing_probs
+from player_cache import PlayerCache
+from solution_cache import SolutionCache
+from sweep import MODEL_PATHS, load_models, run_sweep
+from take_table import TakeTable, load_take_table, save_take_table
+
+
+class TestTakeTable(unittest.TestCase):
+    """Test the take table with the models in the repository and random batter tensors"""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.models = load_models(MODEL_PATHS)
+        cls.pitches = gen_pitches()
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.batters = {str(i): rng.random((5, 5, 12)) for i in [7, 3, 12]}
+        self.path = save_take_table(Path(self.tmp_dir.name) / "take.npy", self.models["take"],
+                                    self.batters, self.pitches, max_rows=1000)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def assert_swing_probs_close(self, actual, expected):
+        self.assertEqual(actual.keys(), expected.keys())
+        for pitch_type, zones in expected.items():
+            for zone, counts in zones.items():
+                self.assertEqual(actual[pitch_type][zone].keys(), counts.keys())
+                np.testing.assert_allclose(list(actual[pitch_type][zone].values()),
+                                           list(counts.values()), atol=1e-6)
+
+    def test_rows(self):
+        """Test every row, built in chunks, matches running the model for the batter"""
+        take_table = TakeTable(self.path)
+        self.assertEqual(take_table.table.shape, (3, len(self.pitches), 8, 12))
+        np.testing.assert_array_equal(take_table.ids, [3, 7, 12])
+        for batter_id, batter in self.batters.items():
+            self.assert_swing_probs_close(
+                take_table.get_swing_probs(batter_id, batter),
+                gen_swing_probs(self.models["take"], batter, self.pitches)
+            )
+
+    def test_stale(self):
+        """Test unknown batters, changed tensors and other models are not read"""
+        take_table = TakeTable(self.path)
+        self.assertIsNone(take_table.get_swing_probs(4, self.batters["7"]))
+        self.assertIsNone(take_table.get_swing_probs(7, self.batters["7"] + 1e-3))
+        self.assertIsNotNone(load_take_table(self.path, self.models["take"], self.pitches))
+        with self.assertWarns(UserWarning):
+            self.assertIsNone(load_take_table(self.path, self.models["error"], self.pitches))
+
+    def test_player_cache(self):
+        """Test a player cache with a take table never runs the take model"""
+        cache = PlayerCache({"take": None}, self.pitches,
+                            take_table=TakeTable(self.path))
+        take_mat = cache.get_take_mat(self.batters["12"], .3, 12)
+        self.assertEqual(len(take_mat), len(self.pitches))
+        cache.get_take_mat(self.batters["12"], .5, 12)
+        self.assertEqual((cache.hits, cache.misses), (2, 0))
+
+    def test_run_sweep(self):
+        """Test a sweep reading the take table solves the matchups as the model does"""
+        rng = np.random.default_rng(1)
+        tensor_paths = {}
+        tensors = {"pitcher": {"1": rng.random((5, 5, 12)).tolist()},
+                   "batter": {key: value.tolist() for key, value in self.batters.items()}}
+        for name, players in tensors.items():
+            tensor_paths[name] = Path(self.tmp_dir.name) / f"{name}_tensors.json"
+            with open(tensor_paths[name], "w") as f:
+                json.dump(players, f)
+        kwargs = {"processes": 1, "progress": None, "tensor_paths": tensor_paths,
+                  "method": "backward_induction", "acc_method": "analytic"}
+        pairs = [(1, 3), (1, 12)]
+
+        expected = run_sweep(pairs, **kwargs)
+        actual = run_sweep(pairs, take_table_path=self.path, **kwargs)
+        for solution, expected_solution in zip(actual, expected):
+            np.testing.assert_allclose(solution.values, expected_solution.values, atol=1e-6)
+
+    def test_solution_cache_key(self):
+        """Test turning the take table on, off or to float16 changes the cached matchup"""
+        rng = np.random.default_rng(1)
+        tensor_paths = {}
+        tensors = {"pitcher": {"1": rng.random((5, 5, 12)).tolist()},
+                   "batter": {key: value.tolist() for key, value in self.batters.items()}}
+        for name, players in tensors.items():
+            tensor_paths[name] = Path(self.tmp_dir.name) / f"{name}_tensors.json"
+            with open(tensor_paths[name], "w") as f:
+                json.dump(players, f)
+        cache = SolutionCache(Path(self.tmp_dir.name) / "solutions")
+        half_path = save_take_table(Path(self.tmp_dir.name) / "take16.npy",
+                                    self.models["take"], self.batters, self.pitches,
+                                    dtype=np.float16)
+        kwargs = {"processes": 1, "progress": None, "tensor_paths": tensor_paths,
+                  "cache": cache, "method": "backward_induction", "acc_method": "analytic"}
+
+        for take_table_path, misses in [(None, 1), (self.path, 2), (half_path, 3),
+                                        (self.path, 3)]:
+            run_sweep([(1, 3)], take_table_path=take_table_path, **kwargs)
+            self.assertEqual(cache.misses, misses)
+        self.assertEqual(cache.hits, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
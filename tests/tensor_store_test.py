@@ -0,0 +1,77 @@
+"""Tensor Store Test Module"""
+import json
+import tempfile
+import unittest
+from pathlib import Path
+
+import numpy as np
+
+from sweep import run_sweep
+from tensor_store import (
+    TensorStore, convert_tensor_json, get_ids_path, load_tensor_file, tensor_digest
+)
+
+
+class TestTensorStore(unittest.TestCase):
+    """Test converting json tensors to a store and reading them back"""
+
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.json_paths = {}
+        self.tensors = {}
+        for name in ["pitcher", "batter"]:
+            self.tensors[name] = {str(i): rng.random((5, 5, 12)).tolist() for i in [30, 4, 100]}
+            self.json_paths[name] = Path(self.tmp_dir.name) / f"{name}_tensors.json"
+            with open(self.json_paths[name], "w") as f:
+                json.dump(self.tensors[name], f)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_convert(self):
+        """Test every player is stored, sorted by id, as float32"""
+        npy_path = convert_tensor_json(self.json_paths["pitcher"])
+        self.assertEqual(npy_path, self.json_paths["pitcher"].with_suffix(".npy"))
+        np.testing.assert_array_equal(np.load(get_ids_path(npy_path)), [4, 30, 100])
+
+        store = load_tensor_file(npy_path)
+        self.assertIsInstance(store, TensorStore)
+        self.assertEqual(store.tensors.dtype, np.float32)
+        self.assertEqual(list(store.keys()), ["4", "30", "100"])
+        for player_id, tensor in self.tensors["pitcher"].items():
+            np.testing.assert_array_equal(store[player_id], np.float32(tensor))
+            np.testing.assert_array_equal(store[int(player_id)], np.float32(tensor))
+
+    def test_lookup(self):
+        """Test a lookup is a view of the memory map and unknown ids raise KeyError"""
+        store = TensorStore(convert_tensor_json(self.json_paths["batter"]))
+        self.assertTrue(np.shares_memory(store["30"], store.tensors))
+        self.assertFalse(store["30"].flags.writeable)
+        self.assertIn("100", store)
+        self.assertNotIn("5", store)
+        self.assertNotIn("id", store)
+        with self.assertRaises(KeyError):
+            store["101"]
+
+    def test_tensor_digest(self):
+        """Test a json tensor and its float32 store view share a digest"""
+        store = TensorStore(convert_tensor_json(self.json_paths["pitcher"]))
+        tensor = self.tensors["pitcher"]["30"]
+        self.assertEqual(tensor_digest(np.asarray(tensor)), tensor_digest(store["30"]))
+        self.assertNotEqual(tensor_digest(store["30"]), tensor_digest(store["4"]))
+
+    def test_run_sweep(self):
+        """Test a sweep over stores solves the same matchups as over the json files"""
+        store_paths = {name: convert_tensor_json(path) for name, path in self.json_paths.items()}
+        kwargs = {"processes": 1, "progress": None, "method": "backward_induction",
+                  "lp_backend": "breakpoint", "acc_method": "analytic"}
+        pairs = [(4, 100), (30, 4)]
+        json_solutions = run_sweep(pairs, tensor_paths=self.json_paths, **kwargs)
+        store_solutions = run_sweep(pairs, tensor_paths=store_paths, **kwargs)
+        for json_solution, store_solution in zip(json_solutions, store_solutions):
+            np.testing.assert_allclose(store_solution.values, json_solution.values, atol=1e-12)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,50 @@
+"""Transition Tensor Test Module"""
+import unittest
+
+import numpy as np
+
+from pitch_zone_config import gen_trans_prob_mat, gen_trans_prob_tensor
+from test_config import gen_test_acc_mat, gen_test_swing_trans_mat, gen_test_take_mat
+from trans_tensor import TransitionTensor
+
+
+class TestTransitionTensorClass(unittest.TestCase):
+    """Test TransitionTensor and gen_trans_prob_tensor"""
+
+    def setUp(self):
+        self.acc_mat = gen_test_acc_mat()
+        self.take_mat = gen_test_take_mat()
+        self.swing_trans_mat = gen_test_swing_trans_mat(self.take_mat)
+        self.trans_prob_mat = gen_trans_prob_mat(
+            self.swing_trans_mat, self.acc_mat, self.take_mat)
+
+    def test_gen_trans_prob_tensor(self):
+        """Test gen_trans_prob_tensor matches gen_trans_prob_mat"""
+        tensor = gen_trans_prob_tensor(self.swing_trans_mat, self.acc_mat)
+        tensor_dict = tensor.to_dict()
+
+        for pitch, zones in self.trans_prob_mat.items():
+            self.assertEqual(set(zones), set(tensor_dict[pitch]))
+            for zone, counts in zones.items():
+                for count, batacts in counts.items():
+                    for batact, outcomes in batacts.items():
+                        for outcome, prob in outcomes.items():
+                            self.assertAlmostEqual(
+                                tensor_dict[pitch][zone][count][batact][outcome], prob,
+                                places=12)
+
+        # every row is a probability distribution
+        np.testing.assert_allclose(tensor.probs[tensor.zone_mask].sum(axis=-1), 1,
+                                   atol=1e-12)
+
+    def test_from_dict(self):
+        """Test TransitionTensor.from_dict round trips with to_dict"""
+        tensor = TransitionTensor.from_dict(self.trans_prob_mat)
+        round_trip = TransitionTensor.from_dict(tensor.to_dict())
+        np.testing.assert_array_equal(tensor.probs, round_trip.probs)
+        np.testing.assert_array_equal(tensor.zone_mask, round_trip.zone_mask)
+        self.assertEqual(len(tensor.get_actions()), tensor.zone_mask.sum())
+
+
+if __name__ == '__main__':
+    unittest.main()